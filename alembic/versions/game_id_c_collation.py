@@ -0,0 +1,48 @@
+"""Compare game_id keys bytewise with the "C" collation
+
+Tables created with create_all already get GAME_ID_TYPE (db.session), a
+string with the "C" collation on PostgreSQL; this brings existing
+databases in line. The ids are hex hashes, so the sort order is the same.
+
+Revision ID: game_id_c_collation
+Revises: mlflow_postgres_migration
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'game_id_c_collation'
+down_revision: Union[str, None] = 'mlflow_postgres_migration'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla, columna) de cada game_id
+GAME_ID_COLUMNS = (
+    ("games", "game_id"),
+    ("features", "game_id"),
+    ("analyzed_tacticals", "game_id"),
+    ("analyzed_errors", "game_id"),
+    ("processed_features", "game_id"),
+    ("tactical_exercises", "source_game_id"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in GAME_ID_COLUMNS:
+        op.alter_column(table, column, schema="public",
+                        existing_type=sa.String(),
+                        type_=sa.String(collation="C"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in GAME_ID_COLUMNS:
+        op.alter_column(table, column, schema="public",
+                        existing_type=sa.String(collation="C"),
+                        type_=sa.String())
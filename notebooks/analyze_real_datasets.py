@@ -300,15 +300,12 @@ class DatasetAnalyzer:
                     # Try to convert to binary error/no-error
                     y = y.notna() & (y != 0) & (y != False) & (y != "no_error")
 
-            # Prepare features
-            X = df[feature_candidates].copy()
-
-            # Handle missing values
-            X = X.fillna(
-                X.median()
-                if len(X.select_dtypes(include=[np.number]).columns) > 0
-                else 0
-            )
+            # Prepare features (column selection already returns a new frame)
+            X = df[feature_candidates]
+
+            # Handle missing values: feature_candidates are the numeric columns
+            # found above, so there is no need to re-scan the dtypes
+            X = X.fillna(X.median())
 
             # Ensure we have enough data
             if len(X) < 50:
@@ -114,9 +114,9 @@ for exp in experiments:
         mlflow.log_param("train_samples", len(X_train))
         mlflow.log_param("test_samples", len(X_test))
         
-        # Prepare data (scaling if needed)
-        X_train_processed = X_train.copy()
-        X_test_processed = X_test.copy()
+        # Prepare data (scaling if needed); no copy, nothing mutates X_train/X_test
+        X_train_processed = X_train
+        X_test_processed = X_test
         
         if exp.get('use_scaling', False):
             scaler = StandardScaler()
@@ -4,10 +4,11 @@ Tactical Analysis Module for Chess Trainer
 This module provides functionality for loading and analyzing chess tactics.
 """
 
+import math
 import os
 import pandas as pd
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 import streamlit as st
 
 
@@ -57,80 +58,151 @@ def load_all_tactics(data_dir: str = "data/tactics") -> List[Dict[str, Any]]:
     return tactics
 
 
+def load_indexed_tactics(data_dir: str = "data/tactics") -> List["IndexedTactic"]:
+    """
+    Load all tactics paired with their normalized lookups (see index_tactics).
+
+    Args:
+        data_dir: Directory containing tactics files
+
+    Returns:
+        List of (tactic, lookup) pairs
+    """
+    return index_tactics(load_all_tactics(data_dir))
+
+
+THEME_FIELDS = ("theme", "themes", "category", "type", "tags")
+DIFFICULTY_FIELDS = ("difficulty", "level", "rating", "elo")
+RATING_FIELDS = ("rating", "elo")
+
+
+class TacticLookup(NamedTuple):
+    """Lowercase themes/difficulties and numeric rating used by the filters."""
+
+    themes: Tuple[str, ...]
+    difficulties: Tuple[str, ...]
+    rating: Optional[float]
+
+
+# Tactic paired with the lookup computed for it at load time
+IndexedTactic = Tuple[Dict[str, Any], TacticLookup]
+
+
+def _is_missing(value: Any) -> bool:
+    """None or NaN (empty CSV cells are read as NaN)."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _rating_to_difficulty(value: float) -> str:
+    """Map a numeric rating to its difficulty bucket."""
+    if value < 1200:
+        return "Easy"
+    elif value < 1800:
+        return "Medium"
+    return "Hard"
+
+
+def _tactic_rating(tactic: Dict[str, Any]) -> Optional[float]:
+    """First numeric, non-NaN rating field of the tactic."""
+    return next(
+        (tactic[field] for field in RATING_FIELDS
+         if isinstance(tactic.get(field), (int, float))
+         and not _is_missing(tactic[field])),
+        None,
+    )
+
+
+def normalize_tactic(tactic: Dict[str, Any]) -> TacticLookup:
+    """
+    Compute the lowercase theme/difficulty lookups used by the filters.
+
+    Missing values (None/NaN) are skipped and numeric ratings are mapped to
+    difficulty buckets. The tactic itself is not modified.
+
+    Args:
+        tactic: Tactic dictionary
+
+    Returns:
+        The tactic's TacticLookup
+    """
+    themes = set()
+    for field in THEME_FIELDS:
+        value = tactic.get(field)
+        if isinstance(value, str):
+            themes.add(value.lower())
+        elif isinstance(value, list):
+            themes.update(str(t).lower() for t in value if not _is_missing(t))
+    themes.discard("")
+
+    difficulties = set()
+    for field in DIFFICULTY_FIELDS:
+        value = tactic.get(field)
+        if isinstance(value, str):
+            difficulties.add(value.lower())
+        elif isinstance(value, (int, float)) and not _is_missing(value):
+            difficulties.add(_rating_to_difficulty(value).lower())
+
+    return TacticLookup(
+        tuple(sorted(themes)), tuple(sorted(difficulties)), _tactic_rating(tactic))
+
+
+def index_tactics(tactics: List[Dict[str, Any]]) -> List[IndexedTactic]:
+    """
+    Pair each tactic with its lookup, computed once per row.
+
+    Args:
+        tactics: List of tactics dictionaries
+
+    Returns:
+        List of (tactic, lookup) pairs, as taken by the filters
+    """
+    return [(tactic, normalize_tactic(tactic)) for tactic in tactics]
+
+
 def filter_tactics_by_theme(
-    tactics: List[Dict[str, Any]], theme: str
-) -> List[Dict[str, Any]]:
+    tactics: List[IndexedTactic], theme: str
+) -> List[IndexedTactic]:
     """
     Filter tactics by theme.
 
     Args:
-        tactics: List of tactics dictionaries
+        tactics: List of (tactic, lookup) pairs from index_tactics
         theme: Theme to filter by
 
     Returns:
-        Filtered list of tactics
+        Filtered list of (tactic, lookup) pairs
     """
     if not theme or theme.lower() == "all":
         return tactics
 
-    filtered = []
-    for tactic in tactics:
-        # Check different possible fields for theme information
-        theme_fields = ["theme", "themes", "category", "type", "tags"]
-        for field in theme_fields:
-            if field in tactic:
-                value = tactic[field]
-                if isinstance(value, str) and theme.lower() in value.lower():
-                    filtered.append(tactic)
-                    break
-                elif isinstance(value, list) and any(
-                    theme.lower() in str(t).lower() for t in value
-                ):
-                    filtered.append(tactic)
-                    break
-
-    return filtered
+    theme = theme.lower()
+    return [
+        (tactic, lookup) for tactic, lookup in tactics
+        if any(theme in t for t in lookup.themes)
+    ]
 
 
 def filter_tactics_by_difficulty(
-    tactics: List[Dict[str, Any]], difficulty: str
-) -> List[Dict[str, Any]]:
+    tactics: List[IndexedTactic], difficulty: str
+) -> List[IndexedTactic]:
     """
     Filter tactics by difficulty level.
 
     Args:
-        tactics: List of tactics dictionaries
+        tactics: List of (tactic, lookup) pairs from index_tactics
         difficulty: Difficulty level to filter by
 
     Returns:
-        Filtered list of tactics
+        Filtered list of (tactic, lookup) pairs
     """
     if not difficulty or difficulty.lower() == "all":
         return tactics
 
-    filtered = []
-    for tactic in tactics:
-        # Check different possible fields for difficulty information
-        difficulty_fields = ["difficulty", "level", "rating", "elo"]
-        for field in difficulty_fields:
-            if field in tactic:
-                value = tactic[field]
-                if isinstance(value, str) and difficulty.lower() in value.lower():
-                    filtered.append(tactic)
-                    break
-                elif isinstance(value, (int, float)):
-                    # Map numeric ratings to difficulty levels
-                    if difficulty.lower() == "easy" and value < 1200:
-                        filtered.append(tactic)
-                        break
-                    elif difficulty.lower() == "medium" and 1200 <= value < 1800:
-                        filtered.append(tactic)
-                        break
-                    elif difficulty.lower() == "hard" and value >= 1800:
-                        filtered.append(tactic)
-                        break
-
-    return filtered
+    difficulty = difficulty.lower()
+    return [
+        (tactic, lookup) for tactic, lookup in tactics
+        if any(difficulty in d for d in lookup.difficulties)
+    ]
 
 
 def get_tactic_themes(tactics: List[Dict[str, Any]]) -> List[str]:
@@ -178,13 +250,7 @@ def get_tactic_difficulties(tactics: List[Dict[str, Any]]) -> List[str]:
                 if isinstance(value, str):
                     difficulties.add(value)
                 elif isinstance(value, (int, float)):
-                    # Convert numeric ratings to difficulty levels
-                    if value < 1200:
-                        difficulties.add("Easy")
-                    elif value < 1800:
-                        difficulties.add("Medium")
-                    else:
-                        difficulties.add("Hard")
+                    difficulties.add(_rating_to_difficulty(value))
 
     return sorted(list(difficulties))
 
@@ -214,12 +280,10 @@ def analyze_tactics_performance(tactics: List[Dict[str, Any]]) -> Dict[str, Any]
     }
 
     # Calculate average rating if available
-    ratings = []
-    for tactic in tactics:
-        for field in ["rating", "elo"]:
-            if field in tactic and isinstance(tactic[field], (int, float)):
-                ratings.append(tactic[field])
-                break
+    ratings = [
+        rating for rating in (_tactic_rating(tactic) for tactic in tactics)
+        if rating is not None
+    ]
 
     analysis["average_rating"] = sum(ratings) / len(ratings) if ratings else 0
 
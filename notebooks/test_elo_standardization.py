@@ -14,6 +14,38 @@ from typing import Dict, List, Tuple
 sys.path.append("/notebooks/src")
 sys.path.append("/app/src")
 
+# Numba is optional: without it the conversion falls back to NumPy
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _convert_batch_py(elo, is_lichess, lichess, chesscom, out):
+    """Per-row platform conversion kernel (compiled with numba when available)."""
+    for i in range(elo.shape[0]):
+        if is_lichess[i]:
+            v = elo[i] * lichess[0] + lichess[1]
+            if v < lichess[2]:
+                v = lichess[2]
+            elif v > lichess[3]:
+                v = lichess[3]
+        else:
+            v = elo[i] * chesscom[0] + chesscom[1]
+            if v < chesscom[2]:
+                v = chesscom[2]
+            elif v > chesscom[3]:
+                v = chesscom[3]
+        out[i] = v
+
+
+# Sin fastmath: con nnan el compilador puede asumir que no hay NaN y las
+# comparaciones del clip dejan de propagar los ELO faltantes
+_convert_batch = (
+    njit(cache=True, nogil=True)(_convert_batch_py)
+    if njit is not None else None
+)
+
 
 def create_basic_elo_preprocessor():
     """Create a basic ELO preprocessor since import is failing."""
@@ -48,34 +80,44 @@ def create_basic_elo_preprocessor():
         def standardize_elo(self, df, source_type="personal"):
             df = df.copy()
 
-            # Apply ELO conversions based on platform
-            for _, row in df.iterrows():
-                site = row.get("site", "")
-                if "lichess" in site.lower():
-                    platform = "lichess"
-                elif "chess.com" in site.lower():
-                    platform = "chesscom"
-                else:
-                    platform = "chesscom"  # default
-
-                # Convert ELO ratings
-                if "white_elo" in df.columns:
-                    df.loc[df.index == row.name, "white_elo"] = (
-                        self._convert_elo_to_fide(
-                            pd.Series([row["white_elo"]]), platform
-                        ).iloc[0]
-                    )
-                if "black_elo" in df.columns:
-                    df.loc[df.index == row.name, "black_elo"] = (
-                        self._convert_elo_to_fide(
-                            pd.Series([row["black_elo"]]), platform
-                        ).iloc[0]
-                    )
+            # Platform per row in one vectorized pass (anything that is not
+            # lichess, chess.com included, uses the chess.com formula)
+            if "site" in df.columns:
+                is_lichess = (
+                    df["site"].astype(str)
+                    .str.contains("lichess", case=False, regex=False, na=False)
+                    .to_numpy()
+                )
+            else:
+                is_lichess = np.zeros(len(df), dtype=bool)
+
+            lichess = self.elo_conversion_params["lichess_to_fide"]
+            chesscom = self.elo_conversion_params["chesscom_to_fide"]
+            keys = ("slope", "intercept", "min_elo", "max_elo")
+
+            # Convert ELO ratings over whole columns
+            if _convert_batch is not None:
+                lichess_params = np.array([lichess[k] for k in keys], dtype=np.float64)
+                chesscom_params = np.array([chesscom[k] for k in keys], dtype=np.float64)
+                for column in ("white_elo", "black_elo"):
+                    if column in df.columns:
+                        elo = df[column].to_numpy(dtype=np.float64)
+                        out = np.empty_like(elo)
+                        _convert_batch(elo, is_lichess, lichess_params, chesscom_params, out)
+                        df[column] = out
+            else:
+                slope, intercept, lo, hi = (
+                    np.where(is_lichess, lichess[k], chesscom[k]) for k in keys
+                )
+                for column in ("white_elo", "black_elo"):
+                    if column in df.columns:
+                        elo = df[column].to_numpy(dtype=np.float64)
+                        df[column] = np.clip(elo * slope + intercept, lo, hi)
 
             # Create standardized_elo field
             if "white_elo" in df.columns and "black_elo" in df.columns:
                 df["standardized_elo"] = (df["white_elo"] + df["black_elo"]) / 2
-                df["elo_difference"] = abs(df["white_elo"] - df["black_elo"])
+                df["elo_difference"] = np.abs(df["white_elo"] - df["black_elo"])
                 df["elo_category"] = pd.cut(
                     df["standardized_elo"],
                     bins=[0, 1200, 1600, 2000, 2400, 3000],
@@ -192,6 +234,38 @@ def test_standardized_elo_creation():
     return len(derived_features) >= 2
 
 
+def test_missing_elo_stays_nan():
+    """Test that missing ratings stay NaN through the conversion."""
+    print("\n🕳️ TESTING MISSING ELO HANDLING")
+    print("=" * 50)
+
+    test_df = pd.DataFrame(
+        {
+            "white_elo": [1500, np.nan, 3500],
+            "black_elo": [np.nan, 1700, 500],
+            "site": ["lichess.org", "chess.com", "lichess.org"],
+        }
+    )
+
+    processed_df = create_basic_elo_preprocessor().standardize_elo(test_df)
+    print(processed_df[["white_elo", "black_elo", "site"]].to_string(index=False))
+
+    white = processed_df["white_elo"].to_numpy()
+    black = processed_df["black_elo"].to_numpy()
+    nan_kept = bool(np.isnan(white[1]) and np.isnan(black[0]))
+    # The present ratings are still converted and clipped
+    converted = bool(
+        np.isclose(white[0], 1500 * 0.92 - 100)
+        and np.isclose(black[1], 1700 * 1.02 + 50)
+        and white[2] == 2800
+        and black[2] == 800
+    )
+
+    status = "✅" if nan_kept and converted else "❌"
+    print(f"\n{status} Missing ratings kept as NaN: {nan_kept}, others converted: {converted}")
+    return nan_kept and converted
+
+
 def validate_against_benchmarks():
     """Validate standardized ratings against known benchmarks."""
     print("\n🎯 VALIDATING AGAINST KNOWN BENCHMARKS")
@@ -307,6 +381,7 @@ def main():
     # Run all tests
     test_results.append(("ELO Conversion Algorithms", test_elo_conversion_algorithms()))
     test_results.append(("Standardized ELO Creation", test_standardized_elo_creation()))
+    test_results.append(("Missing ELO Handling", test_missing_elo_stays_nan()))
     test_results.append(("Benchmark Validation", validate_against_benchmarks()))
 
     # Analyze completion
@@ -1,20 +1,26 @@
-import os
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from dotenv import load_dotenv
 
+from db.session import engine
+
 load_dotenv()
 
-DATABASE_URL = os.environ.get("CHESS_TRAINER_DB_URL")
-engine = create_engine(DATABASE_URL)
 Base = declarative_base()
 
-# Only test connection if not in test environment
-if not os.environ.get("PYTEST_CURRENT_TEST"):
+
+def check_connection() -> bool:
+    """
+    Runs SELECT version() against the configured database and prints it.
+    Called explicitly by scripts that want to fail early, instead of on
+    every import of this module.
+    :return: True if the database answered, False otherwise.
+    """
     try:
         with engine.connect() as conn:
             result = conn.execute(text("SELECT version();"))
             print(result.fetchone())
+        return True
     except Exception as e:
         print(f"Database connection test failed: {e}")
-        # Don't fail on import, just warn
+        return False
@@ -1,33 +1,46 @@
 # db_utils_sqlalchemy.py
 from sqlalchemy.dialects import postgresql
-import hashlib
 import os
 from sqlalchemy import (
-    Engine, Select, create_engine
+    Engine, Select
 )
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 import dotenv
 
+from db.database import Base as ModelsBase
 from db.models.games import Games
 from db.models.processed_features import Processed_features
+from db.models.tactical_exercises import Tactical_exercises
+from db.session import engine
+from modules.pgn_utils import get_game_id
 
 dotenv.load_dotenv()
 
 DB_URL = os.environ.get("CHESS_TRAINER_DB_URL")
-engine = create_engine(DB_URL)
-Session = sessionmaker(bind=engine)
 Base = declarative_base()
 
 
 class DBUtils:
     @staticmethod
     def init_db():
-        Base.metadata.create_all(engine)
+        """
+        Crea las tablas de todos los modelos con una sola conexión y una
+        sola transacción. Processed_features y Tactical_exercises tienen su
+        propio declarative_base, así que su metadata se crea junto a la común.
+        """
+        with engine.begin() as conn:
+            for metadata in (ModelsBase.metadata, Processed_features.metadata,
+                             Tactical_exercises.metadata):
+                metadata.create_all(conn)
 
     @staticmethod
     def compute_game_id(game):
-        return hashlib.md5(str(game).encode('utf-8')).hexdigest()
+        """
+        Same id as pgn_utils.get_game_id, which is what the games table is
+        keyed by (MD5 of str(game) never matched it).
+        """
+        return get_game_id(game)
 
 
     @staticmethod
@@ -1,13 +1,13 @@
 from sqlalchemy import Column, Integer, String, Float, JSON, Boolean
 from db.database import Base
-from db.session import get_schema
+from db.session import GAME_ID_TYPE, get_schema
 
 
 class Features(Base):
     __tablename__ = 'features'
     __table_args__ = {"schema": get_schema()}
 
-    game_id = Column(String, primary_key=True)
+    game_id = Column(GAME_ID_TYPE, primary_key=True)
     move_number = Column(Integer, primary_key=True)
     player_color = Column(Integer, primary_key=True)
 
@@ -1,14 +1,14 @@
 # db/models/games.py
 from sqlalchemy import Column, String
 from db.database import Base
-from db.session import get_schema
+from db.session import GAME_ID_TYPE, get_schema
 
 
 class Games(Base):
     __tablename__ = "games"
     __table_args__ = {"schema": get_schema()}
 
-    game_id = Column(String, primary_key=True)
+    game_id = Column(GAME_ID_TYPE, primary_key=True)
     pgn = Column(String)
     site = Column(String)
     event = Column(String)
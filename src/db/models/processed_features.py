@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, DateTime
 from sqlalchemy.orm import declarative_base
 
-from db.session import get_schema
+from db.session import GAME_ID_TYPE, get_schema
 
 Base = declarative_base()
 
@@ -10,5 +10,5 @@ class Processed_features(Base):
     __tablename__ = 'processed_features'
     __table_args__ = {"schema": get_schema()}
 
-    game_id = Column(String, primary_key=True)
+    game_id = Column(GAME_ID_TYPE, primary_key=True)
     date_processed = Column(DateTime, nullable=False)
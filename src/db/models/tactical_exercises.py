@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 
-from db.session import get_schema
+from db.session import GAME_ID_TYPE, get_schema
 
 Base = declarative_base()
 
@@ -15,4 +15,4 @@ class Tactical_exercises(Base):
     move = Column(String, nullable=False)
     uci = Column(String, nullable=False)
     tags = Column(String, nullable=False)
-    source_game_id = Column(String)
+    source_game_id = Column(GAME_ID_TYPE)
@@ -9,6 +9,13 @@ import pandas as pd
 from dotenv import load_dotenv
 from urllib.parse import urlparse
 
+# connectorx is optional: when installed, parameterless queries are read
+# straight into Arrow instead of row by row through the DBAPI cursor
+try:
+    import connectorx as cx
+except ImportError:
+    cx = None
+
 load_dotenv()
 
 
@@ -58,8 +65,25 @@ class PostgreSQLConnection:
                 conn.commit()
                 return cursor.rowcount
 
+    def iter_query(self, query, params=None, chunksize=1000):
+        """
+        Yields the rows of a SELECT as dicts, streaming them from a named
+        (server-side) cursor chunksize rows at a time instead of fetching the
+        whole result set into memory.
+        """
+        with self.get_connection() as conn:
+            with conn.cursor(name="iter_query", cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.itersize = chunksize
+                cursor.execute(query, params)
+                yield from cursor
+
     def read_sql(self, query, params=None):
         """Read SQL query results into a pandas DataFrame"""
+        # connectorx has no bind parameters: only used for plain queries
+        if cx is not None and params is None:
+            table = cx.read_sql(self.db_url, query, return_type="arrow")
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+
         with self.get_connection() as conn:
             return pd.read_sql(query, conn, params=params)
 
@@ -89,6 +113,11 @@ def execute_postgres_query(query, params=None, fetch=True):
     return pg_conn.execute_query(query, params, fetch)
 
 
+def iter_postgres_query(query, params=None, chunksize=1000):
+    """Stream a PostgreSQL SELECT row by row using the global instance"""
+    return pg_conn.iter_query(query, params, chunksize)
+
+
 def read_postgres_sql(query, params=None):
     """Read PostgreSQL query results into a pandas DataFrame"""
     return pg_conn.read_sql(query, params)
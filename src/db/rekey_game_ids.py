@@ -0,0 +1,116 @@
+# /app/src/db/rekey_game_ids.py
+"""
+Re-keys games stored before game ids were derived from the identifying
+headers (modules.pgn_utils.get_header_game_id).
+
+Games whose headers carry Site, UTCDate and UTCTime used to be keyed by the
+sha256 of their exported PGN and now get a blake2b id of those headers, so
+the processed_features / analyzed_tacticals / features lookups no longer
+match the stored rows and the games would be imported and analyzed again.
+This script recomputes the id of every stored game from its PGN and
+rewrites game_id in every table that references it, in one transaction.
+Games without a full UTC timestamp keep their id.
+
+When several stored rows end up with the same key (the same game imported
+twice under different exports, or already re-imported under the new id),
+the row already keyed by the new id is kept, otherwise the one with the
+smallest old id.
+
+Usage:
+    python -m db.rekey_game_ids --dry-run   # only count the ids to change
+    python -m db.rekey_game_ids
+"""
+import argparse
+from io import StringIO
+
+import chess.pgn
+from psycopg2.extras import execute_values
+
+from db.connection import get_conn
+from modules.pgn_utils import get_header_game_id
+
+# Tablas con game_id en la clave primaria, con el resto de columnas de la clave
+GAME_ID_TABLES = {
+    "games": (),
+    "features": ("move_number", "player_color"),
+    "analyzed_tacticals": (),
+    "analyzed_errors": (),
+    "processed_features": (),
+}
+FETCH_SIZE = 10000
+
+
+def compute_id_map(conn) -> dict:
+    """Returns {old_id: new_id} for the stored games whose id changes."""
+    id_map = {}
+    with conn.cursor(name="rekey_games") as cursor:
+        cursor.itersize = FETCH_SIZE
+        cursor.execute("SELECT game_id, pgn FROM games")
+        for game_id, pgn in cursor:
+            headers = chess.pgn.read_headers(StringIO(pgn or ""))
+            new_id = get_header_game_id(headers) if headers else None
+            if new_id and new_id != game_id:
+                id_map[game_id] = new_id
+    return id_map
+
+
+def rekey_tables(conn, id_map: dict):
+    """Rewrites game_id in every table from id_map, dropping duplicated rows."""
+    with conn.cursor() as cursor:
+        # Mismo tipo e intercolación que games.game_id
+        cursor.execute("""
+            CREATE TEMP TABLE game_id_map ON COMMIT DROP AS
+            SELECT game_id AS old_id, game_id AS new_id FROM games WITH NO DATA
+        """)
+        execute_values(
+            cursor, "INSERT INTO game_id_map (old_id, new_id) VALUES %s",
+            list(id_map.items()), page_size=FETCH_SIZE)
+        cursor.execute("ALTER TABLE game_id_map ADD PRIMARY KEY (old_id)")
+        cursor.execute("CREATE INDEX ON game_id_map (new_id)")
+        cursor.execute("ANALYZE game_id_map")
+
+        for table, other_keys in GAME_ID_TABLES.items():
+            same_key = "".join(f" AND k.{c} = t.{c}" for c in other_keys)
+            # Se descarta la fila si ya hay otra con la clave nueva: una que
+            # ya usa el id nuevo, o una re-keyed con un id viejo menor
+            cursor.execute(f"""
+                DELETE FROM {table} t USING game_id_map m
+                WHERE t.game_id = m.old_id AND (
+                    EXISTS (SELECT 1 FROM {table} k
+                            WHERE k.game_id = m.new_id{same_key})
+                    OR EXISTS (SELECT 1 FROM game_id_map m2
+                               JOIN {table} k ON k.game_id = m2.old_id
+                               WHERE m2.new_id = m.new_id
+                                 AND m2.old_id < t.game_id{same_key}))
+            """)
+            dropped = cursor.rowcount
+            cursor.execute(f"""
+                UPDATE {table} t SET game_id = m.new_id
+                FROM game_id_map m WHERE t.game_id = m.old_id
+            """)
+            print(f"🔑 {table}: {cursor.rowcount} re-keyed, {dropped} duplicates dropped")
+
+        cursor.execute("""
+            UPDATE tactical_exercises t SET source_game_id = m.new_id
+            FROM game_id_map m WHERE t.source_game_id = m.old_id
+        """)
+        print(f"🔑 tactical_exercises: {cursor.rowcount} source_game_id updated")
+
+
+def main(dry_run=False):
+    with get_conn() as conn:
+        id_map = compute_id_map(conn)
+        print(f"🔍 {len(id_map)} games change id")
+        if dry_run or not id_map:
+            return
+        rekey_tables(conn, id_map)
+    print("✅ Game ids re-keyed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-key stored games to the header-based game ids.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only count the games whose id would change")
+    args = parser.parse_args()
+    main(dry_run=args.dry_run)
@@ -1,13 +1,17 @@
 # /app/src/db/repository/Analyzed_tacticals.py
 
 import logging
-from sqlalchemy import insert
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from db.models.analyzed_tacticals import Analyzed_tacticals
 from db.db_utils import DBUtils
 from db.session import get_session
 
 logger = logging.getLogger(__name__)
 
+# Filas por lote al leer los IDs con un cursor del lado del servidor
+HASHES_FETCH_SIZE = 10000
+
 
 class Analyzed_tacticalsRepository:
     def __init__(self, session_factory=get_session):
@@ -18,6 +22,17 @@ class Analyzed_tacticalsRepository:
     def get_all(self):
         return self.session.query(Analyzed_tacticals).all()
 
+    def get_game_ids(self) -> set[str]:
+        """
+        Returns the IDs of the analyzed games as a set. Only the game_id
+        column is selected and the rows are streamed straight into the set,
+        without ORM objects or an intermediate list.
+        """
+        with self.session_factory() as session:
+            stmt = select(Analyzed_tacticals.game_id).execution_options(
+                yield_per=HASHES_FETCH_SIZE)
+            return {game_id for game_id in session.execute(stmt).scalars()}
+
     def get_by_game_id(self, game_id):
         return self.session.query(Analyzed_tacticals).filter(Analyzed_tacticals.game_id == game_id).all()
 
@@ -45,3 +60,31 @@ class Analyzed_tacticalsRepository:
             new_record = Analyzed_tacticals(game_id=game_id)
             session.add(new_record)
             session.commit()
+
+    def save_analyzed_tactical_hashes(self, game_ids: list[str], batch_size: int = 1000) -> int:
+        """
+        Marks many games as analyzed with INSERT ... ON CONFLICT (game_id)
+        DO NOTHING, batch_size rows per statement and a single commit,
+        instead of a SELECT + INSERT + commit per game.
+        :param game_ids: IDs of the analyzed games.
+        :param batch_size: Rows per INSERT statement.
+        :return: Number of new rows (already analyzed games are skipped).
+        """
+        if not game_ids:
+            return 0
+
+        rows = [{"game_id": gid} for gid in dict.fromkeys(game_ids)]
+        inserted = 0
+        with self.session_factory() as session:
+            try:
+                for start in range(0, len(rows), batch_size):
+                    stmt = pg_insert(Analyzed_tacticals).values(
+                        rows[start:start + batch_size])
+                    stmt = stmt.on_conflict_do_nothing(index_elements=["game_id"])
+                    inserted += session.execute(stmt).rowcount
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"❌ Error saving analyzed games in bulk: {e}")
+                raise e
+        return inserted
@@ -4,17 +4,30 @@ import logging
 from typing import Dict, List
 import chess
 import pandas as pd
-from sqlalchemy import and_, join, or_, select, update
-import sqlalchemy
+from sqlalchemy import and_, bindparam, join, or_, select, update
 from sqlalchemy.dialects.postgresql import insert
 from db.models.features import Features
 from db.models.games import Games
-from db.db_utils import DBUtils, Session
+from db.db_utils import DBUtils
 from db.session import get_session
 from modules.pgn_utils import get_game_id
 
 logger = logging.getLogger(__name__)
 
+# Límite de parámetros por sentencia del protocolo de PostgreSQL
+PG_MAX_BIND_PARAMS = 65535
+
+# Consulta de existencia construida una sola vez (forma compilada reutilizada)
+FEATURE_EXISTS_STMT = (
+    select(Features.game_id)
+    .where(
+        Features.game_id == bindparam("game_id"),
+        Features.move_number == bindparam("move_number"),
+        Features.player_color == bindparam("player_color"),
+    )
+    .limit(1)
+)
+
 
 class FeaturesRepository:
     def __init__(self, session_factory=get_session):
@@ -53,19 +66,19 @@ class FeaturesRepository:
         :param player_color: Player color ('white', 'black' or 'none').
         :return: True if the feature already exists, False otherwise.
         """
-        return self.session.query(Features).filter(
-            Features.game_id == game_id,
-            Features.move_number == move_number,
-            Features.player_color == player_color
-        ).first() is not None
+        return self.session.execute(FEATURE_EXISTS_STMT, {
+            "game_id": game_id,
+            "move_number": move_number,
+            "player_color": player_color,
+        }).first() is not None
 
     def get_features_from_games(self, parsed_game: chess.pgn.Game) -> pd.DataFrame:
 
         print(
             f"Processing game from database... {parsed_game.headers.get('White', 'Unknown')} vs {parsed_game.headers.get('Black', 'Unknown')}")
 
-        parsed_game.accept(chess.pgn.StringExporter(
-            headers=True, variations=True, comments=True))
+        # get_game_id exporta la partida solo si hace falta (sin headers
+        # identificativos); no se serializa aparte para descartar el resultado
         game_id = get_game_id(parsed_game)
         features = self._extract_features_from_game(parsed_game, game_id)
         print(f"Extracted features for game {game_id}: {features}")
@@ -134,13 +147,19 @@ class FeaturesRepository:
 
         try:
             with self.session_factory() as session:
-                stmt = insert(self.model).values(unique_rows)
-                stmt = stmt.on_conflict_do_nothing(
-                    index_elements=["game_id", "move_number", "player_color"])
-                result = session.execute(stmt)
+                # Un INSERT multi-fila por lote, con tantas filas como quepan
+                # en el límite de parámetros, y un único commit al final
+                batch_size = max(1, PG_MAX_BIND_PARAMS // len(unique_rows[0]))
+                inserted = 0
+                for start in range(0, len(unique_rows), batch_size):
+                    stmt = insert(self.model).values(
+                        unique_rows[start:start + batch_size])
+                    stmt = stmt.on_conflict_do_nothing(
+                        index_elements=["game_id", "move_number", "player_color"])
+                    inserted += session.execute(stmt).rowcount
                 session.commit()
                 logger.info(
-                    f"✅ Inserted {result.rowcount} rows. Skipped {len(unique_rows) - result.rowcount}.")
+                    f"✅ Inserted {inserted} rows. Skipped {len(unique_rows) - inserted}.")
         except Exception as e:
             session.rollback()
             logger.error(f"❌ Error al insertar features: {e}")
@@ -167,6 +186,13 @@ class FeaturesRepository:
             try:
                 print(
                     f"🔍 Processing tags for game {game_id}...tags_df: {tags_df.head(3)}")
+                # Un único SELECT por partida con las jugadas existentes: la
+                # comprobación por fila se resuelve en memoria, sin un
+                # is_feature_in_db (ida y vuelta a la base) por cada tag
+                existing = set(session.execute(
+                    select(self.model.move_number, self.model.player_color)
+                    .where(self.model.game_id == game_id)
+                ).tuples())
                 for _, row in tags_df.iterrows():
                     move_number = int(row.get("move_number", -1))
                     player_color = row.get("player_color")
@@ -182,20 +208,7 @@ class FeaturesRepository:
                     if isinstance(player_color, bool):
                         player_color = 1 if True else 0
 
-                    print(
-                        f"Checking existence for game {game_id}, move {move_number}, color {player_color}")
-                    try:
-                        exists = self.is_feature_in_db(
-                            game_id=game_id,
-                            move_number=move_number,
-                            player_color=player_color
-                        )
-                    except sqlalchemy.exc.PendingRollbackError as e:
-                        logger.error(f"Sesión en rollback, se resetea: {e}")
-                        self.session.rollback()
-                        raise e  # O seguir de forma controlada
-
-                    if not exists:
+                    if (move_number, player_color) not in existing:
                         print(
                             f"⏭️ Feature for game {game_id}, move {move_number}, color {player_color} does not exist, skipping update.")
                         skipped += 1
@@ -4,12 +4,21 @@ from io import StringIO
 import os
 import chess
 import dotenv
-from sqlalchemy import select, not_
+from sqlalchemy import bindparam, select, not_
+from sqlalchemy.dialects.postgresql import insert
 from db.models.games import Games  # You must have this model defined
 from db.session import get_session  # Function that returns a SQLAlchemy session
 
 dotenv.load_dotenv()
 
+# Consulta de existencia construida una sola vez: SQLAlchemy reutiliza su
+# forma compilada en cada llamada y solo lee la clave, no la fila entera
+GAME_EXISTS_STMT = (
+    select(Games.game_id)
+    .where(Games.game_id == bindparam("game_id"))
+    .limit(1)
+)
+
 
 class GamesRepository:
     def __init__(self, session_factory=get_session):
@@ -102,13 +111,83 @@ class GamesRepository:
             return row
 
     def game_exists(self, game_id: str) -> bool:
-        return self.session.query(Games).filter(Games.game_id == game_id).first() is not None
+        return self.session.execute(
+            GAME_EXISTS_STMT, {"game_id": game_id}).first() is not None
 
     def save_game(self, game_data: dict):
         game = Games(**game_data)
         self.session.add(game)
         self.commit()
 
+    def save_games_bulk(self, rows: list[dict], batch_size: int = 1000) -> int:
+        """
+        Saves games with INSERT ... ON CONFLICT (game_id) DO NOTHING, in
+        batches, so PostgreSQL does the duplicate check instead of one
+        game_exists() query per game.
+        :param rows: List of dicts with the Games columns.
+        :param batch_size: Rows per INSERT statement.
+        :return: Number of games inserted (duplicates are skipped).
+        """
+        if not rows:
+            return 0
+
+        inserted = 0
+        try:
+            for start in range(0, len(rows), batch_size):
+                stmt = (
+                    insert(Games)
+                    .values(rows[start:start + batch_size])
+                    .on_conflict_do_nothing(index_elements=["game_id"])
+                    .returning(Games.game_id)
+                )
+                inserted += len(self.session.execute(stmt).scalars().all())
+            self.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise e
+        return inserted
+
+    def copy_games(self, rows: list[dict]) -> int:
+        """
+        Bulk path for large imports: streams the rows with COPY FROM STDIN
+        into a temporary staging table, then moves them to games with a single
+        INSERT ... SELECT ... ON CONFLICT (game_id) DO NOTHING.
+        :param rows: List of dicts with the Games columns.
+        :return: Number of games inserted (duplicates are skipped).
+        """
+        if not rows:
+            return 0
+
+        columns = [column.name for column in Games.__table__.columns]
+        table = Games.__table__.fullname
+        column_list = ", ".join(columns)
+
+        buffer = StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_text_value(row.get(c)) for c in columns))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        try:
+            cursor = self.session.connection().connection.cursor()
+            try:
+                cursor.execute(
+                    f"CREATE TEMP TABLE games_stage (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+                cursor.copy_expert(
+                    f"COPY games_stage ({column_list}) FROM STDIN", buffer)
+                cursor.execute(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM games_stage "
+                    f"ON CONFLICT (game_id) DO NOTHING")
+                inserted = cursor.rowcount
+            finally:
+                cursor.close()
+            self.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise e
+        return inserted
+
     def commit(self):
         self.session.commit()
 
@@ -135,6 +214,17 @@ class GamesRepository:
         :return: True if the game exists, False otherwise.
         """
         with self.session_factory() as session:
-            stmt = select(Games).where(Games.game_id == game_id)
-            result = session.execute(stmt).first()
+            result = session.execute(
+                GAME_EXISTS_STMT, {"game_id": game_id}).first()
             return result is not None
+
+
+def _copy_text_value(value) -> str:
+    """Formats a value for PostgreSQL COPY text format (\\N is NULL)."""
+    if value is None:
+        return "\\N"
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
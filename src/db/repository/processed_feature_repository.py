@@ -2,7 +2,8 @@
 import datetime
 import logging
 
-from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from db.db_utils import DBUtils
 from db.session import get_session
 from db.models.processed_features import Processed_features
@@ -10,6 +11,9 @@ from db.models.processed_features import Processed_features
 
 logger = logging.getLogger(__name__)
 
+# Filas por lote al leer los IDs con un cursor del lado del servidor
+HASHES_FETCH_SIZE = 10000
+
 
 class ProcessedFeaturesRepository:
     def __init__(self, session_factory=get_session):
@@ -22,6 +26,17 @@ class ProcessedFeaturesRepository:
             rows = session.query(Processed_features).all()
             return [row.game_id for row in rows]
 
+    def get_game_ids(self) -> set[str]:
+        """
+        Returns the IDs of the processed games as a set. Only the game_id
+        column is selected and the rows are streamed straight into the set,
+        without ORM objects or an intermediate list.
+        """
+        with self.session_factory() as session:
+            stmt = select(Processed_features.game_id).execution_options(
+                yield_per=HASHES_FETCH_SIZE)
+            return {game_id for game_id in session.execute(stmt).scalars()}
+
     def get_by_game_id(self, game_id):
         return self.session.query(Processed_features).filter(Processed_features.game_id == game_id).all()
 
@@ -39,21 +54,30 @@ class ProcessedFeaturesRepository:
         self.session.add(new_entry)
         self.session.commit()
 
-    def save_many_processed_features(self, game_ids: list[str]):
+    def save_many_processed_features(self, game_ids: list[str], batch_size: int = 1000):
+        """
+        Marks many games as processed with INSERT ... ON CONFLICT (game_id)
+        DO NOTHING, batch_size rows per statement and a single commit.
+        :param game_ids: IDs of the processed games.
+        :param batch_size: Rows per INSERT statement.
+        """
         if not game_ids:
             return
 
         session = self.session_factory()
         try:
-            rows = [{"game_id": gid} for gid in game_ids]
-
-            stmt = insert(Processed_features).values(rows)
-            stmt = stmt.on_conflict_do_nothing(index_elements=["game_id"])
+            date_processed = datetime.datetime.utcnow()
+            rows = [{"game_id": gid, "date_processed": date_processed}
+                    for gid in game_ids]
 
-            result = session.execute(stmt)
+            inserted = 0
+            for start in range(0, len(rows), batch_size):
+                stmt = insert(Processed_features).values(
+                    rows[start:start + batch_size])
+                stmt = stmt.on_conflict_do_nothing(index_elements=["game_id"])
+                inserted += session.execute(stmt).rowcount
             session.commit()
 
-            inserted = result.rowcount
             skipped = len(rows) - inserted
             logger.info(
                 f"✅ Procesados insertados: {inserted}, ⏭️ Duplicados ignorados: {skipped}")
@@ -1,7 +1,8 @@
 import os
 import dotenv
 import json
-from modules.study_generator import StudyGenerator
+from psycopg2.extras import execute_values
+from modules.study_generator import StudyGenerator, fens_from_moves
 from db.postgres_utils import get_postgres_connection
 
 dotenv.load_dotenv()
@@ -57,12 +58,22 @@ class StudyRepository:
         ))
         cursor.execute(
             "DELETE FROM study_positions WHERE study_id = %s", (study['study_id'],))
-        for pos in study['position_sequence']:
-            cursor.execute(
-                "INSERT INTO study_positions (study_id, fen, comment, is_critical) VALUES (%s, %s, %s, %s)",
-                (study['study_id'], pos['fen'], pos.get(
-                    'comment', ''), pos.get('is_critical', False))
-            )
+        positions = study['position_sequence']
+        # Secuencias compactas (include_fen=False): study_positions guarda el
+        # FEN de cada posicion, se reconstruye desde starting_fen y move_uci
+        if any('fen' not in pos for pos in positions):
+            fens = fens_from_moves(
+                study['starting_fen'], tuple(pos['move_uci'] for pos in positions))
+        else:
+            fens = [pos['fen'] for pos in positions]
+        # Un INSERT ... VALUES por pagina de posiciones, no uno por posicion
+        execute_values(
+            cursor,
+            "INSERT INTO study_positions (study_id, fen, comment, is_critical) VALUES %s",
+            [(study['study_id'], fen, pos.get('comment', ''), pos.get('is_critical', False))
+             for pos, fen in zip(positions, fens)],
+            page_size=1000,
+        )
         self.conn.commit()
 
     def close(self):
@@ -1,17 +1,28 @@
-from sqlalchemy import create_engine
+from sqlalchemy import String, create_engine
 from sqlalchemy.orm import sessionmaker
 import dotenv
 import os
+from db.connection import PG_CONNECT_ARGS
 dotenv.load_dotenv()
 
 
 DATABASE_URL = os.environ.get("CHESS_TRAINER_DB_URL")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 3600))
+# Tamaño de la caché de sentencias compiladas del engine (SQLAlchemy: 500)
+DB_QUERY_CACHE_SIZE = int(os.environ.get("DB_QUERY_CACHE_SIZE", 1200))
 
+# Único engine (y pool de conexiones) del proceso: db_utils y database lo
+# reutilizan en lugar de abrir cada uno su propio pool
 if DATABASE_URL and DATABASE_URL.startswith("sqlite"):
     engine = create_engine(DATABASE_URL, connect_args={
-                           "check_same_thread": False})
+                           "check_same_thread": False},
+                           query_cache_size=DB_QUERY_CACHE_SIZE)
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, pool_size=DB_POOL_SIZE,
+                           pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE,
+                           query_cache_size=DB_QUERY_CACHE_SIZE,
+                           connect_args=PG_CONNECT_ARGS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -20,5 +31,10 @@ def get_schema():
     return "public" if engine.dialect.name == "postgresql" else None
 
 
+# Los game_id son hashes hex: con la intercolación "C" el índice compara bytes
+# (memcmp) en lugar de pasar por las reglas del locale, con el mismo orden
+GAME_ID_TYPE = String().with_variant(String(collation="C"), "postgresql")
+
+
 def get_session():
     return SessionLocal()
@@ -7,6 +7,7 @@ import dotenv
 
 from sqlalchemy import create_engine, Column, String, Integer, Text, JSON, update
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from db.db_utils import DBUtils
 from db.models.tactical_exercises import Tactical_exercises
@@ -14,6 +15,8 @@ dotenv.load_dotenv()
 
 # Debe ser una URL de conexión de PostgreSQL
 DB_URL = os.environ.get("CHESS_TRAINER_DB_URL")
+# Ejercicios acumulados antes de escribirlos en una sola transacción
+TACTICS_FLUSH_SIZE = int(os.environ.get("TACTICS_FLUSH_SIZE", 10000))
 
 engine = create_engine(DB_URL)
 Session = sessionmaker(bind=engine)
@@ -48,8 +51,54 @@ def save_tactic_to_db(tactic, db_url=DB_URL):
         session.close()
 
 
+def _tactic_row(tactic):
+    return {
+        "id": tactic["id"],
+        "fen": tactic["fen"],
+        "move": tactic["move"],
+        "uci": tactic["uci"],
+        "tags": json.dumps(tactic["tags"]),
+        "source_game_id": tactic.get("source_game_id"),
+    }
+
+
+def save_tactics_to_db(tactics: List[Dict], batch_size: int = 1000) -> int:
+    """
+    Saves many tactics with INSERT ... ON CONFLICT (id) DO UPDATE, batch_size
+    rows per statement and a single commit, instead of a merge + commit per
+    tactic. Same upsert semantics as save_tactic_to_db.
+    :param tactics: Tactic dicts as read from the JSON files.
+    :param batch_size: Rows per INSERT statement.
+    :return: Number of tactics written.
+    """
+    if not tactics:
+        return 0
+
+    # Último valor por id: ON CONFLICT no admite el mismo id dos veces en un INSERT
+    rows = list({row["id"]: row for row in map(_tactic_row, tactics)}.values())
+    session = Session()
+    try:
+        for start in range(0, len(rows), batch_size):
+            stmt = insert(Tactical_exercises).values(
+                rows[start:start + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={c: stmt.excluded[c]
+                      for c in ("fen", "move", "uci", "tags", "source_game_id")})
+            session.execute(stmt)
+        session.commit()
+    except SQLAlchemyError as e:
+        print(f"❌ Excepción al guardar tácticas en lote: {e}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    return len(rows)
+
+
 def bulk_import_tactics_from_json(folder_path="data/tactics"):
     files = [f for f in os.listdir(folder_path) if f.endswith(".json")]
+    pending = []
     for filename in files:
         filepath = os.path.join(folder_path, filename)
         with open(filepath, "r", encoding="utf-8") as f:
@@ -58,8 +107,12 @@ def bulk_import_tactics_from_json(folder_path="data/tactics"):
                 for i, tactic in enumerate(data):
                     if "id" not in tactic:
                         tactic["id"] = f"{filename[:-5]}_{i}"
-                    save_tactic_to_db(tactic)
+                    pending.append(tactic)
             elif isinstance(data, dict):
                 if "id" not in data:
                     data["id"] = filename[:-5]
-                save_tactic_to_db(data)
+                pending.append(data)
+        if len(pending) >= TACTICS_FLUSH_SIZE:
+            save_tactics_to_db(pending)
+            pending = []
+    save_tactics_to_db(pending)
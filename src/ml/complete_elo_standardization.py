@@ -87,7 +87,8 @@ def standardize_parquet_datasets(
                 logger.info(f"  📁 Processing file: {parquet_file.name}")
                 
                 # Load dataset
-                df = pd.read_parquet(parquet_file)
+                # Arrow-backed columns: avoids the Arrow -> NumPy/object copy and back on write
+                df = pd.read_parquet(parquet_file, dtype_backend="pyarrow")
                 original_count = len(df)
                 
                 # Apply standardization
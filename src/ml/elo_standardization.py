@@ -254,36 +254,80 @@ class ELOStandardizer:
         Returns:
             DataFrame with added standardized_white_elo and standardized_black_elo columns
         """
-        df = df.copy()
+        # Shallow copy: the new columns don't touch the caller's frame and the
+        # existing column data is not duplicated
+        df = df.copy(deep=False)
+
+        site = self._text_column(df, "site")
+        event = self._text_column(df, "event")
+        time_control = self._text_column(df, "time_control")
+
+        # Platform and time control only depend on (site, event, time_control):
+        # detect them once per distinct combination instead of once per row
+        codes, combos = pd.MultiIndex.from_arrays([site, event, time_control]).factorize()
+        platforms, time_controls = [], []
+        offsets = np.empty(len(combos), dtype=np.float64)
+        multipliers = np.empty(len(combos), dtype=np.float64)
+        for i, (combo_site, combo_event, combo_tc) in enumerate(combos):
+            platform = self.detect_platform(str(combo_site), str(combo_event))
+            tc = self.detect_time_control(str(combo_event), str(combo_tc))
+            platform_factors = self.CONVERSION_FACTORS.get(platform, {})
+            factors = platform_factors.get(
+                tc if tc in platform_factors else "default", {"offset": 0, "multiplier": 1.0})
+            platforms.append(platform)
+            time_controls.append(tc)
+            offsets[i] = factors["offset"]
+            multipliers[i] = factors["multiplier"]
+
+        row_offsets = offsets[codes]
+        row_multipliers = multipliers[codes]
+
+        for column in ("white_elo", "black_elo"):
+            target = f"standardized_{column.split('_')[0]}_elo"
+            if column in df:
+                df[target] = self._standardize_column(
+                    df[column], codes, platforms, time_controls, row_offsets, row_multipliers)
+            else:
+                df[target] = pd.Series(pd.NA, index=df.index, dtype="Int64")
 
-        # Initialize standardized columns
-        df["standardized_white_elo"] = None
-        df["standardized_black_elo"] = None
+        return df
 
-        for idx, row in df.iterrows():
-            # Detect platform
-            platform = self.detect_platform(row.get("site", ""), row.get("event", ""))
+    @staticmethod
+    def _text_column(df: pd.DataFrame, name: str) -> pd.Series:
+        """Column with missing values as "", or all "" if the column is absent"""
+        if name in df:
+            return df[name].fillna("")
+        return pd.Series([""] * len(df), index=df.index, dtype=object)
 
-            # Detect time control
-            time_control = self.detect_time_control(
-                row.get("event", ""), row.get("time_control", "")
-            )
+    def _standardize_column(self, values: pd.Series, codes: np.ndarray, platforms: List[ELOPlatform],
+                            time_controls: List[str], offsets: np.ndarray, multipliers: np.ndarray) -> pd.array:
+        """
+        Vectorized standardize_elo over a rating column. Ratings inside the
+        valid range are converted with array arithmetic; the few outside it
+        go through standardize_elo so anomaly correction and stats still apply.
+        """
+        present = values.notna().to_numpy()
+        ratings = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
 
-            # Standardize white ELO
-            if "white_elo" in row and pd.notna(row["white_elo"]):
-                standardized_white = self.standardize_elo(
-                    row["white_elo"], platform, time_control
-                )
-                df.at[idx, "standardized_white_elo"] = standardized_white
+        # Non-numeric strings: same accounting as standardize_elo
+        unparseable = present & np.isnan(ratings)
+        self.stats["invalid_ratings_found"] += int(unparseable.sum())
 
-            # Standardize black ELO
-            if "black_elo" in row and pd.notna(row["black_elo"]):
-                standardized_black = self.standardize_elo(
-                    row["black_elo"], platform, time_control
-                )
-                df.at[idx, "standardized_black_elo"] = standardized_black
+        out = np.full(len(ratings), np.nan)
+        valid = ~np.isnan(ratings) & (ratings >= self.MIN_VALID_ELO) & (ratings <= self.MAX_VALID_ELO)
+        out[valid] = np.clip(
+            np.round((ratings[valid] + offsets[valid]) * multipliers[valid]),
+            self.MIN_VALID_ELO, self.MAX_VALID_ELO)
+        self.stats["conversions_performed"] += int(valid.sum())
+        for code in np.unique(codes[valid]):
+            self.stats["platforms_processed"].add(platforms[code].value)
 
-        return df
+        for i in np.flatnonzero(~np.isnan(ratings) & ~valid):
+            standardized = self.standardize_elo(ratings[i], platforms[codes[i]], time_controls[codes[i]])
+            if standardized is not None:
+                out[i] = standardized
+
+        return pd.array(out, dtype="Float64").astype("Int64")
 
     def get_statistics(self) -> Dict:
         """Get standardization statistics"""
@@ -402,41 +446,36 @@ class ELOStandardizer:
                 "median": float(black_elos.median()),
             }
 
-        # Platform distribution
-        for idx, row in df.iterrows():
-            platform = self.detect_platform(row.get("site", ""), row.get("event", ""))
-            platform_name = platform.value
-            if platform_name not in validation_results["platform_distribution"]:
-                validation_results["platform_distribution"][platform_name] = 0
-            validation_results["platform_distribution"][platform_name] += 1
-
-        # Rating distribution (by ranges)
-        all_standardized_elos = pd.concat(
+        # Platform distribution: one detect_platform per distinct (site, event),
+        # weighted by how many rows share it
+        site = self._text_column(df, "site")
+        event = self._text_column(df, "event")
+        codes, combos = pd.MultiIndex.from_arrays([site, event]).factorize()
+        combo_counts = np.bincount(codes, minlength=len(combos))
+        for (combo_site, combo_event), count in zip(combos, combo_counts):
+            platform_name = self.detect_platform(str(combo_site), str(combo_event)).value
+            distribution = validation_results["platform_distribution"]
+            distribution[platform_name] = distribution.get(platform_name, 0) + int(count)
+
+        # Rating distribution (by ranges): bucket index per rating, then bincount
+        all_standardized_elos = np.concatenate(
             [
-                df["standardized_white_elo"].dropna(),
-                df["standardized_black_elo"].dropna(),
+                df["standardized_white_elo"].dropna().to_numpy(dtype=np.float64),
+                df["standardized_black_elo"].dropna().to_numpy(dtype=np.float64),
             ]
         )
 
         if len(all_standardized_elos) > 0:
+            buckets = np.bincount(
+                np.searchsorted([1200, 1600, 2000, 2400], all_standardized_elos, side="right"),
+                minlength=5,
+            )
             validation_results["rating_distribution"] = {
-                "beginner (<1200)": int((all_standardized_elos < 1200).sum()),
-                "intermediate (1200-1600)": int(
-                    (
-                        (all_standardized_elos >= 1200) & (all_standardized_elos < 1600)
-                    ).sum()
-                ),
-                "advanced (1600-2000)": int(
-                    (
-                        (all_standardized_elos >= 1600) & (all_standardized_elos < 2000)
-                    ).sum()
-                ),
-                "expert (2000-2400)": int(
-                    (
-                        (all_standardized_elos >= 2000) & (all_standardized_elos < 2400)
-                    ).sum()
-                ),
-                "master (2400+)": int((all_standardized_elos >= 2400).sum()),
+                "beginner (<1200)": int(buckets[0]),
+                "intermediate (1200-1600)": int(buckets[1]),
+                "advanced (1600-2000)": int(buckets[2]),
+                "expert (2000-2400)": int(buckets[3]),
+                "master (2400+)": int(buckets[4]),
             }
 
         return validation_results
@@ -1,9 +1,10 @@
 import mlflow
 import mlflow.sklearn
 import mlflow.xgboost
+import numpy as np
 import pandas as pd
-import os
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
+from sklearn.metrics import (accuracy_score, precision_score, recall_score, f1_score,
+                             precision_recall_fscore_support, classification_report)
 from typing import Dict, List, Any
 import logging
 
@@ -41,6 +42,8 @@ class ChessMLflowTracker:
             
             mlflow.set_tracking_uri(tracking_uri)
             self.client = mlflow.tracking.MlflowClient()
+            # Cache nombre -> Experiment: evita un round-trip por consulta
+            self._exp_cache: Dict[str, Any] = {}
             logger.info(f"✅ Conectado a MLflow: {tracking_uri}")
         except Exception as e:
             logger.error(f"❌ Error conectando a MLflow: {e}")
@@ -91,42 +94,54 @@ class ChessMLflowTracker:
             dataset_name: Nombre descriptivo del dataset
         """
         try:
+            n_rows = len(df)
+            # Un solo conteo de nulos, reutilizado para el total y los porcentajes
+            nulls = df.isnull().sum()
+
             # Información básica del dataset
-            mlflow.log_param("dataset_source", source)
-            mlflow.log_param("dataset_name", dataset_name)
-            mlflow.log_param("dataset_rows", len(df))
-            mlflow.log_param("dataset_columns", len(df.columns))
-            mlflow.log_param("dataset_features", list(df.columns.tolist()))
-            mlflow.log_param("missing_values_total", df.isnull().sum().sum())
-            
+            mlflow.log_params({
+                "dataset_source": source,
+                "dataset_name": dataset_name,
+                "dataset_rows": n_rows,
+                "dataset_columns": len(df.columns),
+                "dataset_features": list(df.columns.tolist()),
+                "missing_values_total": nulls.sum(),
+            })
+
+            metrics = {}
+
             # Información específica de ajedrez
             if 'error_label' in df.columns:
                 error_dist = df['error_label'].value_counts().to_dict()
                 for error_type, count in error_dist.items():
-                    mlflow.log_metric(f"count_{error_type}", count)
-                    mlflow.log_metric(f"pct_{error_type}", count / len(df) * 100)
-            
+                    metrics[f"count_{error_type}"] = count
+                    metrics[f"pct_{error_type}"] = count / n_rows * 100
+
             if 'phase' in df.columns:
                 phase_dist = df['phase'].value_counts().to_dict()
                 for phase, count in phase_dist.items():
-                    mlflow.log_metric(f"count_phase_{phase}", count)
-            
-            if 'score_diff' in df.columns:
-                mlflow.log_metric("score_diff_mean", df['score_diff'].mean())
-                mlflow.log_metric("score_diff_std", df['score_diff'].std())
-                mlflow.log_metric("score_diff_median", df['score_diff'].median())
-            
-            if 'material_balance' in df.columns:
-                mlflow.log_metric("material_balance_mean", df['material_balance'].mean())
-                mlflow.log_metric("material_balance_std", df['material_balance'].std())
-            
+                    metrics[f"count_phase_{phase}"] = count
+
+            # Estadísticas numéricas en una sola pasada
+            stat_columns = [c for c in ('score_diff', 'material_balance') if c in df.columns]
+            if stat_columns:
+                stats = df[stat_columns].agg(['mean', 'std', 'median'])
+                if 'score_diff' in stats:
+                    metrics["score_diff_mean"] = stats.at['mean', 'score_diff']
+                    metrics["score_diff_std"] = stats.at['std', 'score_diff']
+                    metrics["score_diff_median"] = stats.at['median', 'score_diff']
+                if 'material_balance' in stats:
+                    metrics["material_balance_mean"] = stats.at['mean', 'material_balance']
+                    metrics["material_balance_std"] = stats.at['std', 'material_balance']
+
             # Log missing values por columna (solo las importantes)
             chess_columns = ['error_label', 'score_diff', 'material_balance', 'phase', 'elo_standardized']
             for col in chess_columns:
                 if col in df.columns:
-                    missing_pct = df[col].isnull().sum() / len(df) * 100
-                    mlflow.log_metric(f"missing_pct_{col}", missing_pct)
-            
+                    metrics[f"missing_pct_{col}"] = nulls[col] / n_rows * 100
+
+            mlflow.log_metrics(metrics)
+
             logger.info(f"📊 Dataset info logged: {source} ({len(df)} rows, {len(df.columns)} cols)")
             
         except Exception as e:
@@ -145,53 +160,48 @@ class ChessMLflowTracker:
         try:
             # Métricas básicas de clasificación
             accuracy = accuracy_score(y_true, y_pred)
-            mlflow.log_metric("accuracy", accuracy)
             
             # Métricas macro (promedio de todas las clases)
             precision_macro = precision_score(y_true, y_pred, average='macro', zero_division=0)
             recall_macro = recall_score(y_true, y_pred, average='macro', zero_division=0)
             f1_macro = f1_score(y_true, y_pred, average='macro', zero_division=0)
             
-            mlflow.log_metric("precision_macro", precision_macro)
-            mlflow.log_metric("recall_macro", recall_macro)
-            mlflow.log_metric("f1_macro", f1_macro)
-            
             # Métricas weighted (considera desbalance de clases)
             precision_weighted = precision_score(y_true, y_pred, average='weighted', zero_division=0)
             recall_weighted = recall_score(y_true, y_pred, average='weighted', zero_division=0)
             f1_weighted = f1_score(y_true, y_pred, average='weighted', zero_division=0)
             
-            mlflow.log_metric("precision_weighted", precision_weighted)
-            mlflow.log_metric("recall_weighted", recall_weighted)
-            mlflow.log_metric("f1_weighted", f1_weighted)
+            # Todas las métricas se envían en un único log_metrics al final
+            metrics = {
+                "accuracy": accuracy,
+                "precision_macro": precision_macro,
+                "recall_macro": recall_macro,
+                "f1_macro": f1_macro,
+                "precision_weighted": precision_weighted,
+                "recall_weighted": recall_weighted,
+                "f1_weighted": f1_weighted,
+            }
+            
+            # Métricas por clase (importante para error_label), solo clases presentes en y_true.
+            # Una sola matriz de confusión para todas las clases.
+            true_labels = sorted(set(y_true))
+            precision_class, recall_class, f1_class, _ = precision_recall_fscore_support(
+                y_true, y_pred, labels=true_labels, average=None, zero_division=0)
+            for label, p, r, f in zip(true_labels, precision_class, recall_class, f1_class):
+                metrics[f"precision_{label}"] = p
+                metrics[f"recall_{label}"] = r
+                metrics[f"f1_{label}"] = f
             
-            # Métricas por clase (importante para error_label)
-            unique_labels = sorted(set(y_true) | set(y_pred))
-            for label in unique_labels:
-                if label in set(y_true):  # Solo si la clase existe en y_true
-                    y_true_binary = (y_true == label).astype(int)
-                    y_pred_binary = (y_pred == label).astype(int)
-                    
-                    precision_class = precision_score(y_true_binary, y_pred_binary, zero_division=0)
-                    recall_class = recall_score(y_true_binary, y_pred_binary, zero_division=0)
-                    f1_class = f1_score(y_true_binary, y_pred_binary, zero_division=0)
-                    
-                    mlflow.log_metric(f"precision_{label}", precision_class)
-                    mlflow.log_metric(f"recall_{label}", recall_class)
-                    mlflow.log_metric(f"f1_{label}", f1_class)
+            mlflow.log_metrics(metrics)
             
             # Log classification report como artifact
             report_str = classification_report(y_true, y_pred)
             
-            # Guardar reporte como archivo
-            report_path = f"classification_report_{model_name}.txt"
-            with open(report_path, 'w') as f:
-                f.write(f"Classification Report - {model_name}\n")
-                f.write("=" * 50 + "\n")
-                f.write(report_str)
-            
-            mlflow.log_artifact(report_path, "reports")
-            os.remove(report_path)  # Limpiar archivo temporal
+            # Subir el reporte directo desde memoria, sin archivo temporal
+            mlflow.log_text(
+                f"Classification Report - {model_name}\n" + "=" * 50 + "\n" + report_str,
+                f"reports/classification_report_{model_name}.txt"
+            )
             
             logger.info(f"📈 Métricas registradas para {model_name}: Acc={accuracy:.3f}, F1={f1_macro:.3f}")
             
@@ -209,24 +219,35 @@ class ChessMLflowTracker:
         """
         try:
             if hasattr(model, 'feature_importances_'):
-                feature_importance = pd.DataFrame({
-                    'feature': feature_names,
-                    'importance': model.feature_importances_
-                }).sort_values('importance', ascending=False)
+                importances = np.asarray(model.feature_importances_)
                 
-                # Log importancia de cada feature
-                for idx, row in feature_importance.iterrows():
-                    mlflow.log_metric(f"importance_{row['feature']}", row['importance'])
+                # Log importancia de cada feature en un solo request
+                mlflow.log_metrics({
+                    f"importance_{feature}": importance
+                    for feature, importance in zip(feature_names, importances)
+                })
                 
-                # Log top 5 features
-                top_features = feature_importance.head(5)['feature'].tolist()
+                # Log top 5 features: argpartition es O(N), solo se ordenan los 5 elegidos
+                k = min(5, len(importances))
+                top_idx = np.argpartition(-importances, k - 1)[:k] if k else np.array([], dtype=int)
+                top_idx = top_idx[np.argsort(-importances[top_idx])]
+                top_features = [feature_names[i] for i in top_idx]
                 mlflow.log_param("top_5_features", top_features)
                 
-                # Guardar tabla completa como artifact
-                importance_path = f"feature_importance_{model_name}.csv"
-                feature_importance.to_csv(importance_path, index=False)
-                mlflow.log_artifact(importance_path, "feature_analysis")
-                os.remove(importance_path)
+                # Guardar tabla completa como artifact (desde memoria), sin
+                # ordenarla entera: primero el top 5 y luego el resto en el
+                # orden original de las features
+                rest = np.ones(len(importances), dtype=bool)
+                rest[top_idx] = False
+                order = np.concatenate([top_idx, np.flatnonzero(rest)])
+                feature_importance = pd.DataFrame({
+                    'feature': np.asarray(feature_names, dtype=object)[order],
+                    'importance': importances[order]
+                })
+                mlflow.log_text(
+                    feature_importance.to_csv(index=False),
+                    f"feature_analysis/feature_importance_{model_name}.csv"
+                )
                 
                 logger.info(f"🎯 Feature importance logged for {model_name}")
                 logger.info(f"Top 5 features: {top_features}")
@@ -251,7 +272,7 @@ class ChessMLflowTracker:
         """
         try:
             # Log nombre del modelo
-            mlflow.log_param("model_type", model_name)
+            params_to_log = {"model_type": model_name}
             
             # Log parámetros específicos según el tipo de modelo
             if hasattr(model, 'get_params'):
@@ -262,23 +283,38 @@ class ChessMLflowTracker:
                     'n_estimators', 'max_depth', 'min_samples_split', 'min_samples_leaf',
                     'max_features', 'random_state', 'criterion', 'bootstrap',
                     'C', 'penalty', 'solver', 'max_iter', 'tol',
-                    'learning_rate', 'n_components', 'alpha', 'fit_intercept'
+                    'learning_rate', 'n_components', 'alpha', 'fit_intercept',
+                    'max_bins', 'early_stopping'
                 ]
                 
                 for param_name, param_value in params.items():
                     if param_name in relevant_params and param_value is not None:
-                        mlflow.log_param(param_name, param_value)
+                        params_to_log[param_name] = param_value
             
             # Log parámetros personalizados
             if custom_params:
-                for param_name, param_value in custom_params.items():
-                    mlflow.log_param(param_name, param_value)
+                params_to_log.update(custom_params)
+            
+            mlflow.log_params(params_to_log)
             
             logger.info(f"⚙️ Hiperparámetros registrados para {model_name}")
             
         except Exception as e:
             logger.error(f"❌ Error logging hyperparameters: {e}")
     
+    def _get_experiment(self, experiment_name: str):
+        """
+        Obtener un experimento por nombre, cacheado en memoria.
+        Los experimentos no encontrados no se cachean, así se detectan
+        cuando se crean más tarde.
+        """
+        experiment = self._exp_cache.get(experiment_name)
+        if experiment is None:
+            experiment = self.client.get_experiment_by_name(experiment_name)
+            if experiment is not None:
+                self._exp_cache[experiment_name] = experiment
+        return experiment
+    
     def get_best_model(self, experiment_name: str, metric: str = "accuracy"):
         """
         Obtener el mejor modelo de un experimento basado en una métrica.
@@ -291,7 +327,7 @@ class ChessMLflowTracker:
             Información del mejor run
         """
         try:
-            experiment = self.client.get_experiment_by_name(experiment_name)
+            experiment = self._get_experiment(experiment_name)
             if not experiment:
                 logger.error(f"❌ Experimento {experiment_name} no encontrado")
                 return None
@@ -330,7 +366,7 @@ class ChessMLflowTracker:
             if metrics is None:
                 metrics = ["accuracy", "f1_macro", "precision_macro", "recall_macro"]
             
-            experiment = self.client.get_experiment_by_name(experiment_name)
+            experiment = self._get_experiment(experiment_name)
             if not experiment:
                 logger.error(f"❌ Experimento {experiment_name} no encontrado")
                 return None
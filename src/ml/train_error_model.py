@@ -7,12 +7,14 @@ Ejemplo práctico para chess_trainer.
 import sys
 sys.path.append('/chess_trainer/src')
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import logging
 from pathlib import Path
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import cross_val_score
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report
 import mlflow
@@ -27,12 +29,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_chess_dataset(data_path: str = "/chess_trainer/datasets/export/personal/features.parquet"):
+# Features principales disponibles en chess_trainer
+BASE_FEATURES = [
+    'score_diff', 'material_balance', 'branching_factor',
+    'self_mobility', 'opponent_mobility', 'num_pieces'
+]
+
+# Features adicionales si están disponibles
+ADDITIONAL_FEATURES = [
+    'material_total', 'has_castling_rights', 'is_repetition',
+    'is_low_mobility', 'is_center_controlled', 'is_pawn_endgame',
+    'move_number'
+]
+
+FEATURE_COLS = BASE_FEATURES + ADDITIONAL_FEATURES
+
+# Columnas leídas del parquet: features, target y las usadas en el log del dataset
+DATASET_COLS = FEATURE_COLS + ['error_label', 'phase']
+
+def load_chess_dataset(data_path: str = "/chess_trainer/datasets/export/personal/features.parquet",
+                       columns: list = DATASET_COLS):
     """
     Cargar y preparar dataset de chess_trainer.
     
     Args:
         data_path: Ruta al dataset parquet
+        columns: Columnas a leer (None = todas). Solo se leen las que existen
+            en el schema, así fen/move_san y demás strings no se cargan
         
     Returns:
         DataFrame limpio y preparado
@@ -48,7 +71,10 @@ def load_chess_dataset(data_path: str = "/chess_trainer/datasets/export/personal
             print("   - /chess_trainer/datasets/export/novice/features.parquet")
             return None
         
-        df = pd.read_parquet(data_path)
+        if columns is not None:
+            available = set(pq.read_schema(data_path).names)
+            columns = [c for c in columns if c in available]
+        df = pd.read_parquet(data_path, engine="pyarrow", columns=columns)
         print(f"✅ Dataset cargado: {len(df)} filas, {len(df.columns)} columnas")
         
         # Mostrar información básica
@@ -78,22 +104,9 @@ def prepare_features_and_target(df: pd.DataFrame):
     """
     print("🔧 Preparando features y target...")
     
-    # Features principales disponibles en chess_trainer
-    base_features = [
-        'score_diff', 'material_balance', 'branching_factor', 
-        'self_mobility', 'opponent_mobility', 'num_pieces'
-    ]
-    
-    # Features adicionales si están disponibles
-    additional_features = [
-        'material_total', 'has_castling_rights', 'is_repetition',
-        'is_low_mobility', 'is_center_controlled', 'is_pawn_endgame',
-        'move_number'
-    ]
-    
     # Seleccionar features que existen en el dataset
     available_features = []
-    for feature in base_features + additional_features:
+    for feature in FEATURE_COLS:
         if feature in df.columns:
             available_features.append(feature)
         else:
@@ -125,8 +138,8 @@ def prepare_features_and_target(df: pd.DataFrame):
             else:
                 df_clean[feature] = df_clean[feature].fillna(df_clean[feature].mode()[0] if not df_clean[feature].mode().empty else 'unknown')
     
-    # Preparar X e y
-    X = df_clean[available_features]
+    # Preparar X e y (float32: la mitad de memoria para sklearn)
+    X = df_clean[available_features].astype("float32")
     y = df_clean['error_label']
     
     print(f"✅ Dataset final: {len(X)} muestras, {len(available_features)} features")
@@ -134,6 +147,34 @@ def prepare_features_and_target(df: pd.DataFrame):
     
     return X, y, available_features
 
+def split_train_test(X: pd.DataFrame, y: pd.Series, test_size: float = 0.2, seed: int = 42):
+    """
+    Split estratificado por índices: baraja posiciones por clase con NumPy y
+    selecciona con .iloc una sola vez por partición, sin las copias
+    intermedias de train_test_split.
+    
+    Args:
+        X: Features
+        y: Target
+        test_size: Proporción de test en cada clase
+        seed: Semilla del generador
+        
+    Returns:
+        X_train, X_test, y_train, y_test
+    """
+    rng = np.random.default_rng(seed)
+    labels = y.to_numpy()
+    test_mask = np.zeros(len(labels), dtype=bool)
+    
+    for label in np.unique(labels):
+        idx = np.flatnonzero(labels == label)
+        rng.shuffle(idx)
+        test_mask[idx[:int(round(len(idx) * test_size))]] = True
+    
+    train_idx = rng.permutation(np.flatnonzero(~test_mask))
+    test_idx = rng.permutation(np.flatnonzero(test_mask))
+    return X.iloc[train_idx], X.iloc[test_idx], y.iloc[train_idx], y.iloc[test_idx]
+
 def train_chess_error_model():
     """
     Entrenar modelos para predecir error_label con MLflow tracking.
@@ -168,17 +209,20 @@ def train_chess_error_model():
     
     # Split datos
     print("📊 Dividiendo dataset...")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    X_train, X_test, y_train, y_test = split_train_test(X, y, test_size=0.2, seed=42)
     
     print(f"📈 Train: {len(X_train)} muestras")
     print(f"📉 Test: {len(X_test)} muestras")
     
     # Modelos a entrenar
     models = {
-        'RandomForest': {
-            'model': RandomForestClassifier(n_estimators=100, random_state=42),
+        # Boosting por histogramas: busca splits sobre bins, no sobre
+        # todos los valores de cada feature como RandomForest
+        'HistGradientBoosting': {
+            'model': HistGradientBoostingClassifier(
+                max_iter=200, max_depth=5, learning_rate=0.1,
+                early_stopping=True, random_state=42
+            ),
             'scale_features': False
         },
         'LogisticRegression': {
@@ -197,9 +241,10 @@ def train_chess_error_model():
             try:
                 model = model_config['model']
                 
-                # Preparar datos (escalar si es necesario)
-                X_train_processed = X_train.copy()
-                X_test_processed = X_test.copy()
+                # Preparar datos (escalar si es necesario). Sin copia: ni el
+                # escalado ni los modelos modifican X_train/X_test
+                X_train_processed = X_train
+                X_test_processed = X_test
                 
                 scaler = None
                 if model_config['scale_features']:
@@ -318,9 +363,7 @@ def train_with_hyperparameter_tuning():
     if X is None:
         return False
     
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    X_train, X_test, y_train, y_test = split_train_test(X, y, test_size=0.2, seed=42)
     
     # Grid search para RandomForest
     param_grid = {
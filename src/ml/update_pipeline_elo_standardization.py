@@ -14,9 +14,13 @@ import os
 import sys
 import logging
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from pathlib import Path
 from typing import List, Dict, Any
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
 # Add src to path for imports
@@ -34,6 +38,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Parquet output: rows per row group (scan granularity for readers) and zstd level
+PARQUET_ROW_GROUP_SIZE = int(os.environ.get("PARQUET_ROW_GROUP_SIZE", 128_000))
+PARQUET_COMPRESSION_LEVEL = int(os.environ.get("PARQUET_COMPRESSION_LEVEL", 3))
+# Rows standardized at a time; memory use is O(batch), not O(file)
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", 100_000))
+CSV_BLOCK_SIZE = 16 << 20
+# Dataset files updated in parallel (1 = sequential)
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", os.cpu_count() or 1))
+
+
+def open_parquet_writer(path: Path, schema: pa.Schema) -> pq.ParquetWriter:
+    """Parquet writer for zstd-compressed output with per-row-group statistics."""
+    return pq.ParquetWriter(
+        path,
+        schema,
+        compression="zstd",
+        compression_level=PARQUET_COMPRESSION_LEVEL,
+        use_dictionary=True,
+        write_statistics=True,
+    )
+
+
+def prefetch_parquet(file_path: Path):
+    """
+    Opens a Parquet file (footer and metadata read) ahead of time, so it can
+    run in the background while the previous file is being processed.
+    Returns None for other formats or if the file cannot be opened; the
+    error is then reported when the file itself is processed.
+    """
+    if file_path.suffix.lower() != ".parquet":
+        return None
+    try:
+        return pq.ParquetFile(file_path)
+    except Exception:
+        return None
+
+
+def open_batches(file_path: Path, parquet_file: pq.ParquetFile = None):
+    """
+    Opens a dataset file as a stream of RecordBatches.
+
+    Args:
+        file_path: Dataset file (.parquet or .csv)
+        parquet_file: Already opened ParquetFile for file_path (see prefetch_parquet)
+
+    Returns:
+        (schema, batch iterator), or None if the format is not supported
+    """
+    suffix = file_path.suffix.lower()
+    if suffix == ".parquet":
+        parquet_file = parquet_file or pq.ParquetFile(file_path)
+        return parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=STREAM_BATCH_SIZE)
+    if suffix == ".csv":
+        reader = pacsv.open_csv(
+            file_path, read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE))
+        return reader.schema, iter(reader)
+    return None
+
 
 class DataPipelineUpdater:
     """Updates existing data pipeline with ELO standardization"""
@@ -65,32 +127,51 @@ class DataPipelineUpdater:
             if search_path.exists():
                 logger.info(f"🔍 Searching in: {search_path}")
                 
-                # Look for Parquet files
-                parquet_files = list(search_path.glob("**/*.parquet"))
+                # Single walk of the tree, classifying Parquet and CSV files by suffix
+                parquet_files, csv_files = [], []
+                for root, _, names in os.walk(search_path):
+                    for name in names:
+                        if name.endswith(".parquet"):
+                            parquet_files.append(Path(root) / name)
+                        elif name.endswith(".csv"):
+                            csv_files.append(Path(root) / name)
                 dataset_files.extend(parquet_files)
-                
-                # Look for CSV files 
-                csv_files = list(search_path.glob("**/*.csv"))
                 dataset_files.extend(csv_files)
         
         logger.info(f"📁 Found {len(dataset_files)} dataset files")
         return dataset_files
     
     def backup_file(self, file_path: Path) -> Path:
-        """Create backup of original file"""
+        """
+        Create backup of original file
+
+        The backup is a hard link to the original: no bytes are copied, and
+        since the update is written to a temp file and swapped in with
+        os.replace, the link keeps pointing at the old contents. Falls back
+        to a full copy where hard links are not supported.
+        """
         backup_path = file_path.with_suffix(f".backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_path.suffix}")
         
         try:
-            import shutil
-            shutil.copy2(file_path, backup_path)
+            try:
+                os.link(file_path, backup_path)
+            except OSError:
+                import shutil
+                shutil.copy2(file_path, backup_path)
             logger.info(f"💾 Created backup: {backup_path.name}")
             return backup_path
         except Exception as e:
             logger.error(f"❌ Failed to create backup: {e}")
             raise
     
-    def update_dataset_file(self, file_path: Path) -> Dict[str, Any]:
-        """Update a single dataset file with standardized ELO ratings"""
+    def update_dataset_file(self, file_path: Path, parquet_file: pq.ParquetFile = None) -> Dict[str, Any]:
+        """
+        Update a single dataset file with standardized ELO ratings
+
+        Args:
+            file_path: Dataset file to update
+            parquet_file: Optional ParquetFile already opened by prefetch_parquet
+        """
         file_result = {
             "file": str(file_path),
             "original_rows": 0,
@@ -102,21 +183,17 @@ class DataPipelineUpdater:
         try:
             logger.info(f"🔬 Processing: {file_path.name}")
             
-            # Load dataset
-            if file_path.suffix.lower() == '.parquet':
-                df = pd.read_parquet(file_path)
-            elif file_path.suffix.lower() == '.csv':
-                df = pd.read_csv(file_path)
-            else:
+            # Open dataset as a batch stream (only the schema is read here)
+            opened = open_batches(file_path, parquet_file)
+            if opened is None:
                 file_result["errors"].append(f"Unsupported file format: {file_path.suffix}")
                 return file_result
-            
-            file_result["original_rows"] = len(df)
-            logger.info(f"📊 Loaded {len(df)} rows, {len(df.columns)} columns")
+            schema, batches = opened
+            logger.info(f"📊 Opened {file_path.name} with {len(schema.names)} columns")
             
             # Check if standardization is needed
-            has_elo_columns = any(col in df.columns for col in ['white_elo', 'black_elo'])
-            has_standardized = any(col in df.columns for col in ['standardized_white_elo', 'standardized_black_elo'])
+            has_elo_columns = any(col in schema.names for col in ['white_elo', 'black_elo'])
+            has_standardized = any(col in schema.names for col in ['standardized_white_elo', 'standardized_black_elo'])
             
             if not has_elo_columns:
                 logger.info(f"⏭️ Skipping {file_path.name} - no ELO columns found")
@@ -128,32 +205,61 @@ class DataPipelineUpdater:
                 file_result["errors"].append("Already has standardized ELO columns")
                 return file_result
             
-            # Create backup
-            backup_path = self.backup_file(file_path)
+            # CSV inputs are left untouched and written as Parquet next to them
+            output_path = file_path.with_suffix(".parquet")
+            if output_path != file_path and output_path.exists():
+                logger.info(f"⏭️ Skipping {file_path.name} - {output_path.name} already exists")
+                file_result["errors"].append(f"Parquet output already exists: {output_path.name}")
+                return file_result
+
+            # Create backup (only when the original file is overwritten)
+            if output_path == file_path:
+                self.backup_file(file_path)
             
-            # Apply ELO standardization
+            # Apply ELO standardization batch by batch, writing to a temp file
+            # that replaces the output once complete
             logger.info(f"⚙️ Applying ELO standardization...")
-            df_standardized = self.standardizer.standardize_dataframe_elos(df)
-            
-            # Check what was added
-            new_columns = [col for col in df_standardized.columns if col not in df.columns]
-            file_result["new_columns"] = new_columns
-            file_result["updated_rows"] = len(df_standardized)
-            
-            # Save updated dataset
-            if file_path.suffix.lower() == '.parquet':
-                df_standardized.to_parquet(file_path, index=False)
-            else:
-                df_standardized.to_csv(file_path, index=False)
-            
-            logger.info(f"✅ Updated {file_path.name} with {len(new_columns)} new columns")
+            tmp_path = output_path.with_suffix(".parquet.tmp")
+            writer = None
+            try:
+                for batch in batches:
+                    # Arrow-backed columns: no copy into NumPy/object and back
+                    df = batch.to_pandas(types_mapper=pd.ArrowDtype)
+                    df_standardized = self.standardizer.standardize_dataframe_elos(df)
+                    if writer is None:
+                        table = pa.Table.from_pandas(df_standardized, preserve_index=False)
+                        writer = open_parquet_writer(tmp_path, table.schema)
+                        file_result["new_columns"] = [
+                            col for col in df_standardized.columns if col not in df.columns]
+                    else:
+                        table = pa.Table.from_pandas(
+                            df_standardized, schema=writer.schema, preserve_index=False)
+                    writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_SIZE)
+                    file_result["original_rows"] += len(df)
+                    file_result["updated_rows"] += len(df_standardized)
+            except Exception:
+                if writer is not None:
+                    writer.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+            if writer is None:
+                file_result["errors"].append("Empty dataset")
+                return file_result
+            writer.close()
+            os.replace(tmp_path, output_path)
+            file_result["output_file"] = str(output_path)
             
-            # Get statistics
-            standardization_stats = self.standardizer.get_statistics()
-            self.results["elos_standardized"] += standardization_stats["conversions_performed"]
+            new_columns = file_result["new_columns"]
+            logger.info(f"✅ Updated {output_path.name} ({file_result['updated_rows']} rows) "
+                        f"with {len(new_columns)} new columns")
             
-            # Validation
-            validation = self.standardizer.validate_standardization(df_standardized)
+            # Validation: only the columns it looks at are read back
+            validation_columns = [
+                col for col in ('site', 'event', 'standardized_white_elo', 'standardized_black_elo')
+                if col in writer.schema.names]
+            validation = self.standardizer.validate_standardization(
+                pd.read_parquet(output_path, columns=validation_columns))
             file_result["validation"] = validation
             
             return file_result
@@ -164,8 +270,29 @@ class DataPipelineUpdater:
             file_result["errors"].append(error_msg)
             return file_result
     
-    def update_all_datasets(self) -> Dict[str, Any]:
-        """Update all found datasets with ELO standardization"""
+    def _update_and_count(self, file_path: Path, parquet_file: pq.ParquetFile = None):
+        """update_dataset_file plus the ELO conversions it performed"""
+        conversions_before = self.standardizer.stats["conversions_performed"]
+        file_result = self.update_dataset_file(file_path, parquet_file)
+        return file_result, self.standardizer.stats["conversions_performed"] - conversions_before
+
+    def _merge_standardizer_stats(self, stats: Dict[str, Any]):
+        """Adds the stats of a worker's standardizer to this one's"""
+        for key, value in stats.items():
+            if key == "platforms_processed":
+                self.standardizer.stats[key] |= value
+            elif key == "rating_corrections":
+                self.standardizer.stats[key].update(value)
+            else:
+                self.standardizer.stats[key] += value
+
+    def update_all_datasets(self, max_workers: int = MAX_WORKERS) -> Dict[str, Any]:
+        """
+        Update all found datasets with ELO standardization
+
+        Args:
+            max_workers: Processes used to update files in parallel (1 = sequential)
+        """
         logger.info("🚀 Starting data pipeline ELO standardization update...")
         
         dataset_files = self.find_dataset_files()
@@ -174,10 +301,29 @@ class DataPipelineUpdater:
             logger.warning("⚠️ No dataset files found")
             return self.results
         
-        # Process each file
-        for file_path in dataset_files:
-            file_result = self.update_dataset_file(file_path)
+        # Process each file (files are independent: one process per file)
+        if max_workers > 1 and len(dataset_files) > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(dataset_files))) as executor:
+                updates = []
+                for file_result, elos_standardized, stats in executor.map(
+                        _update_one, dataset_files, [self.data_base_path] * len(dataset_files)):
+                    self._merge_standardizer_stats(stats)
+                    updates.append((file_result, elos_standardized))
+        else:
+            # Sequential: a one-thread prefetch lane opens the next file's
+            # Parquet footer while the current one is being standardized
+            updates = []
+            with ThreadPoolExecutor(max_workers=1) as prefetch:
+                next_file = prefetch.submit(prefetch_parquet, dataset_files[0])
+                for i, file_path in enumerate(dataset_files):
+                    parquet_file = next_file.result()
+                    if i + 1 < len(dataset_files):
+                        next_file = prefetch.submit(prefetch_parquet, dataset_files[i + 1])
+                    updates.append(self._update_and_count(file_path, parquet_file))
+
+        for file_result, elos_standardized in updates:
             self.results["processing_log"].append(file_result)
+            self.results["elos_standardized"] += elos_standardized
             
             if not file_result["errors"]:
                 self.results["files_processed"] += 1
@@ -244,6 +390,13 @@ class DataPipelineUpdater:
         return "\n".join(report)
 
 
+def _update_one(file_path: Path, data_base_path: Path):
+    """Process pool entry point: updates one file with its own standardizer"""
+    updater = DataPipelineUpdater(str(data_base_path))
+    file_result, elos_standardized = updater._update_and_count(file_path)
+    return file_result, elos_standardized, updater.standardizer.stats
+
+
 def main():
     """Main execution function"""
     print("🚀 Starting ELO Standardization Pipeline Update...")
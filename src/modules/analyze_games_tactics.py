@@ -24,7 +24,7 @@ analyzed_tacticals_repo = Analyzed_tacticalsRepository()
 
 # Detecta patrones tácticos en una partida de ajedrez. Bajo depth=15 a 10 para acelerar el análisis
 @auto_logger_execution_time
-def detect_tactics_from_game(game, depth=10):
+def detect_tactics_from_game(game, depth=10, engine=None):
     """
     Analyzes a chess game to detect tactical motifs and errors for each move beyond the opening phase.
 
@@ -36,6 +36,8 @@ def detect_tactics_from_game(game, depth=10):
     Args:
         game: A chess.pgn.Game object representing the chess game to analyze.
         depth (int, optional): The default engine search depth for evaluation. May be dynamically adjusted per move.
+        engine (chess.engine.SimpleEngine, optional): Already running engine to use (e.g. one per pool worker).
+            When omitted, one is started for this game and quit at the end.
 
     Returns:
         list[dict]: A list of dictionaries, each containing information about detected tactical tags, error labels,
@@ -54,29 +56,41 @@ def detect_tactics_from_game(game, depth=10):
         - Designed for use in tactical analysis modules for chess applications.
     """
     tags = []
+    owns_engine = engine is None
 
     try:
         print("Init detect_tactics_from_game")
         eval_cache = {}
+        # Un solo proceso de Stockfish para toda la partida: sin arranque por
+        # evaluación y con la tabla de transposiciones viva entre jugadas
+        if owns_engine:
+            engine = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
+        game_key = id(game)
 
         node = game
         board = chess.Board()
+        opening_move_threshold = TACTICAL_ANALYSIS_SETTINGS.get(
+            "opening_move_threshold", 6)
+        min_branching_for_analysis = TACTICAL_ANALYSIS_SETTINGS.get(
+            "min_branching_for_analysis", 4)
 
         for i, move in enumerate(game.mainline_moves()):
-            if i + 1 <= TACTICAL_ANALYSIS_SETTINGS.get("opening_move_threshold", 6):
+            if i + 1 <= opening_move_threshold:
                 print(f"⏭️ Skiping opening move #{i+1}")
                 board.push(move)
                 continue
 
             # ➤ Clasificación previa rápida
             pre_tag = classify_simple_pattern(board.copy(), move)
+            # Una sola generación de jugadas legales por ply (antes se
+            # materializaba la lista dos veces)
+            branching = board.legal_moves.count()
 
             if pre_tag:
                 multipv = 1
                 depth = 6  # más rápido
             else:
                 # ➤ Fase del juego y profundidad dinámica
-                branching = len(list(board.legal_moves))
                 # ➤ Branching factor para decidir uso de MultiPV
                 multipv = 3 if branching > 10 else 1
                 phase = get_game_phase(board)
@@ -85,10 +99,7 @@ def detect_tactics_from_game(game, depth=10):
             fen_before = board.fen()
             print(f"🔢 Move #{i+1}")
 
-            min_branching_for_analysis = TACTICAL_ANALYSIS_SETTINGS.get(
-                "min_branching_for_analysis", 4)
-
-            if len(list(board.legal_moves)) <= min_branching_for_analysis:
+            if branching <= min_branching_for_analysis:
                 print(
                     f"⏭️ Move #{i+1} skipped due to low complexity (branching < {min_branching_for_analysis})")
                 board.push(move)
@@ -100,7 +111,7 @@ def detect_tactics_from_game(game, depth=10):
             else:
                 print(f"Evaluating FEN before move: {fen_before}")
                 eval_before = get_evaluation(
-                    fen_before, depth, multipv=multipv)
+                    fen_before, depth, multipv=multipv, engine=engine, game=game_key)
                 eval_cache[fen_before] = eval_before
 
                 best_move = eval_before.get("best", None)
@@ -119,17 +130,11 @@ def detect_tactics_from_game(game, depth=10):
             if fen_after in eval_cache:
                 eval_after = eval_cache[fen_after]
             else:
-                eval_after = get_evaluation(fen_after, depth, multipv=multipv)
+                eval_after = get_evaluation(
+                    fen_after, depth, multipv=multipv, engine=engine, game=game_key)
                 eval_cache[fen_after] = eval_after
 
            # ➤ Extraer evaluaciones numéricas seguras
-            def safe_extract_value(eval_data):
-                if isinstance(eval_data, dict):
-                    if "best" in eval_data:
-                        return eval_data["best"].get("value", 0)
-                    return eval_data.get("value", 0)
-                return 0
-
             score_before = safe_extract_value(eval_before)
             score_after = safe_extract_value(eval_after)
 
@@ -171,9 +176,6 @@ def detect_tactics_from_game(game, depth=10):
                     "move_number": i + 1
                 })
 
-            fen_after = board.fen()
-            print(f"Evaluating FEN after move: {fen_after}")
-            eval_after = get_evaluation(fen_after, depth, multipv=multipv)
             print(f"Evaluation after move: {eval_after}")
             print(
                 f"Full evaluation for move {board.turn}:{i+1} : {move.uci()}")
@@ -191,6 +193,18 @@ def detect_tactics_from_game(game, depth=10):
         print(
             f"Returning already processed {len(tags) if tags else None} tags before detect_tactics_from_game crashed.")
         return tags if tags else None
+    finally:
+        if owns_engine and engine is not None:
+            engine.quit()
+
+
+def safe_extract_value(eval_data):
+    """Valor numérico de una evaluación de get_evaluation (0 si no lo hay)."""
+    if isinstance(eval_data, dict):
+        if "best" in eval_data:
+            return eval_data["best"].get("value", 0)
+        return eval_data.get("value", 0)
+    return 0
 
 
 def extract_score(evaluation):
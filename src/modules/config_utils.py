@@ -1,5 +1,9 @@
 import os
 
+# Rutas ya encontradas: solo se cachean los positivos, una ruta que aún no
+# existe se vuelve a comprobar en la siguiente llamada
+_existing_abs_paths = set()
+
 def is_valid_path(path):
     if not path or not isinstance(path, str):
         return False
@@ -7,22 +11,32 @@ def is_valid_path(path):
         return False
     return True
 
+def _is_existing_abs_path(path):
+    """isabs + exists check; the stat syscall runs once per existing path."""
+    if path in _existing_abs_paths:
+        return True
+    if os.path.isabs(path) and os.path.exists(path):
+        _existing_abs_paths.add(path)
+        return True
+    return False
+
 def get_valid_paths_from_env(env_var_names):
     """
     Given a list of environment variable names, retrieves their values as paths,
     validates them, and returns the valid paths. Prints an error for any invalid path.
+    Existing paths are memoized for the life of the process.
     """
+    env = os.environ
     valid_paths = []
     for var_name in env_var_names:
-        path = os.environ.get(var_name)
+        path = env.get(var_name)
         if not path:
             print(f"Error: Environment variable '{var_name}' is not set.")
             continue
-        if not is_valid_path(path):
+        if _is_existing_abs_path(path):
+            valid_paths.append(path)
+        elif not is_valid_path(path):
             print(f"Error: Path '{path}' from '{var_name}' is invalid.")
-            continue
-        if not os.path.exists(path):
+        else:
             print(f"Error: Path '{path}' from '{var_name}' does not exist.")
-            continue
-        valid_paths.append(path)
     return valid_paths
@@ -1,21 +1,27 @@
 # src/modules/feature_engineering.py
 
 import chess
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MultiLabelBinarizer
 
 
+CENTER_SQUARES = (chess.D4, chess.D5, chess.E4, chess.E5)
+
+
 def is_center_controlled(board, color):
-    central_squares = [chess.D4, chess.D5, chess.E4, chess.E5]
     control = 0
-    for square in central_squares:
-        if board.is_attacked_by(color, square):
+    for square in CENTER_SQUARES:
+        if board.attackers_mask(color, square):
             control += 1
-    return control >= 2  # Se considera control si al menos 2 están bajo ataque
+            if control >= 2:  # Se considera control si al menos 2 están bajo ataque
+                return True
+    return False
 
 
 def is_pawn_endgame(board):
-    return int(all(piece.piece_type in [chess.KING, chess.PAWN] for piece in board.piece_map().values()))
+    # Solo reyes y peones: ningún bit en los bitboards de piezas mayores/menores
+    return int(not (board.knights | board.bishops | board.rooks | board.queens))
 
 
 def binarize_tags(df: pd.DataFrame) -> pd.DataFrame:
@@ -40,6 +46,11 @@ def add_error_flags(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# Límites de score_to_label, de menor a mayor, y la etiqueta de cada tramo
+SCORE_LABEL_BOUNDS = np.array([-200, -100, -50])
+SCORE_LABELS = np.array(['blunder', 'mistake', 'inaccuracy', 'ok'])
+
+
 def score_to_label(score: float) -> str:
     """Clasifica la diferencia de evaluación en etiquetas."""
     if score < -200:
@@ -53,8 +64,14 @@ def score_to_label(score: float) -> str:
 
 
 def add_score_labels(df: pd.DataFrame) -> pd.DataFrame:
-    """Agrega la columna 'score_label' basada en score_diff."""
-    df['score_label'] = df['score_diff'].apply(score_to_label)
+    """
+    Agrega la columna 'score_label' basada en score_diff. Mismas etiquetas que
+    score_to_label, pero con un único searchsorted sobre toda la columna.
+    NaN cae en el último tramo ('ok'), igual que en la versión escalar.
+    """
+    scores = df['score_diff'].to_numpy(dtype=float)
+    buckets = np.searchsorted(SCORE_LABEL_BOUNDS, scores, side='right')
+    df['score_label'] = SCORE_LABELS[buckets]
     return df
 
 
@@ -1,70 +1,127 @@
+import io
+import os
+from collections import Counter, OrderedDict
+from multiprocessing import Pool
+
 import chess
+import chess.pgn
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 from modules.feature_engineering import is_center_controlled, is_pawn_endgame
 from modules.pgn_utils import get_game_id
 
+# Polars es opcional: si esta instalado, el resumen por partida de un parquet
+# se ejecuta como un plan lazy (scan + group_by en streaming)
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", 4))
+BATCH_CHUNKSIZE = 16
+# Posiciones cacheadas por proceso: cada worker de generate_features_batch
+# tiene su propia caché, así que el tamaño se multiplica por MAX_WORKERS
+POSITION_CACHE_SIZE = int(os.environ.get("POSITION_CACHE_SIZE", 20_000))
 
-def extract_features_from_position(board, move):
-    values = {
-        chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3,
-        chess.ROOK: 5, chess.QUEEN: 9
-    }
 
-    fen = board.fen()
-    move_san = board.san(move)
-    move_uci = move.uci()
+def _material(board, mask):
+    """Material value (P=1, N=B=3, R=5, Q=9) of the pieces in mask, via bitboard popcounts."""
+    return (chess.popcount(board.pawns & mask)
+            + 3 * chess.popcount((board.knights | board.bishops) & mask)
+            + 5 * chess.popcount(board.rooks & mask)
+            + 9 * chess.popcount(board.queens & mask))
+
+
+def _compute_position_features(board):
+    """Features that depend only on the position, not on the move or history."""
     player_color = int(chess.WHITE) if board.turn else int(chess.BLACK)
-    move_number = board.fullmove_number
-    has_castling_rights = int(board.has_castling_rights(player_color))
-    is_repetition = int(board.is_repetition())
+    self_mobility = board.legal_moves.count()
 
-    legal_before = list(board.legal_moves)
-    self_mobility = len(legal_before)
+    white_material = _material(board, board.occupied_co[chess.WHITE])
+    black_material = _material(board, board.occupied_co[chess.BLACK])
 
-    material = sum(
-        values.get(piece.piece_type, 0) * (1 if piece.color else -1)
-        for piece in board.piece_map().values()
-    )
-    material_total = sum(values.get(p.piece_type, 0)
-                         for p in board.piece_map().values())
-    num_pieces = sum(1 for p in board.piece_map().values()
-                     if p.piece_type not in [chess.KING, chess.PAWN])
-
-    # No hacemos board.push(move) aquí
-    board_push_sim = board.copy()
-    board_push_sim.push(move)
-    opponent_mobility = len(list(board_push_sim.legal_moves))
-    branching_factor = self_mobility + opponent_mobility
-
-    piece_count = len(board.piece_map())
+    piece_count = chess.popcount(board.occupied)
     phase = (
         "opening" if piece_count >= 24 else
         "middlegame" if piece_count >= 12 else
         "endgame"
     )
-    is_low_mobility = int(self_mobility <= 5)
 
     return {
-        "fen": fen,
-        "move_san": move_san,
-        "move_uci": move_uci,
-        "material_balance": material,
-        "material_total": material_total,
-        "num_pieces": num_pieces,
-        "branching_factor": branching_factor,
+        "material_balance": white_material - black_material,
+        "material_total": white_material + black_material,
+        "num_pieces": chess.popcount(
+            board.knights | board.bishops | board.rooks | board.queens),
         "self_mobility": self_mobility,
-        "opponent_mobility": opponent_mobility,
         "phase": phase,
         "player_color": player_color,
-        "has_castling_rights": has_castling_rights,
-        "move_number": move_number,
-        "is_repetition": is_repetition,
-        "is_low_mobility": is_low_mobility,
+        "has_castling_rights": int(board.has_castling_rights(player_color)),
+        "is_low_mobility": int(self_mobility <= 5),
         "is_center_controlled": int(is_center_controlled(board, player_color)),
         "is_pawn_endgame": is_pawn_endgame(board),
     }
 
 
+# LRU de features de posición por clave de transposición (piezas, turno,
+# enroques y al paso): solo guarda claves y dicts, nunca el tablero
+_position_cache = OrderedDict()
+
+
+def _position_features(board):
+    """
+    Position features memoized by transposition key: the opening plies shared
+    by thousands of games are computed once. Returns a fresh dict per call.
+    """
+    key = board._transposition_key()
+    features = _position_cache.get(key)
+    if features is None:
+        features = _compute_position_features(board)
+        _position_cache[key] = features
+        if len(_position_cache) > POSITION_CACHE_SIZE:
+            _position_cache.popitem(last=False)
+    else:
+        _position_cache.move_to_end(key)
+    return dict(features)
+
+
+def _move_features(board, move, compute_san=True, rep_count=None):
+    """
+    Features that depend on the move played or on the game history.
+    rep_count is how many times the current position has occurred so far;
+    when None, is_repetition falls back to scanning the move stack.
+    """
+    # board.san() genera todas las jugadas legales para desambiguar: es de lo
+    # más caro por jugada, así que se puede omitir cuando solo se usa move_uci
+    move_san = board.san(move) if compute_san else None
+
+    # Simular la jugada sobre el mismo tablero y deshacerla (sin board.copy())
+    board.push(move)
+    try:
+        opponent_mobility = board.legal_moves.count()
+    finally:
+        board.pop()
+
+    return {
+        "fen": board.fen(),
+        "move_san": move_san,
+        "move_uci": move.uci(),
+        "opponent_mobility": opponent_mobility,
+        "move_number": board.fullmove_number,
+        "is_repetition": int(board.is_repetition() if rep_count is None else rep_count >= 3),
+    }
+
+
+def extract_features_from_position(board, move, compute_san=True, rep_count=None):
+    row = _move_features(board, move, compute_san, rep_count)
+    row.update(_position_features(board))
+    row["branching_factor"] = row["self_mobility"] + row["opponent_mobility"]
+    return row
+
+
 def create_metadata_feature_row(game_id: str, meta: dict) -> dict:
     """
     Creates a feature row with move_number = 0 and player_color = 'none' that contains general game metadata.
@@ -107,9 +164,12 @@ def create_metadata_feature_row(game_id: str, meta: dict) -> dict:
     }
 
 
-def generate_features_from_game(game, game_id=None, is_stockfish_test=False):
-    rows = []
-
+def _prepare_game(game, game_id=None, is_stockfish_test=False):
+    """
+    Builds the starting board, the per-game metadata shared by every row and
+    the number of mainline plies. Returns (None, None, 0) if the FEN header
+    is invalid.
+    """
     # Inicializar el tablero
     setup = game.headers.get("SetUp", "0")
     fen = game.headers.get("FEN")
@@ -119,37 +179,279 @@ def generate_features_from_game(game, game_id=None, is_stockfish_test=False):
             board = chess.Board(fen)
         except Exception as e:
             print(f"⚠️ FEN inválido en headers: {fen} -> {e}")
-            return []
+            return None, None, 0
     else:
         board = chess.Board()
 
     if game_id is None:
         game_id = get_game_id(game)
 
+    # Datos constantes por partida: se calculan una sola vez, no en cada jugada.
+    # num_moves sale del número de medias jugadas, sin re-jugar la partida
+    # (game.end().board() reconstruye el tablero empujando cada jugada)
+    num_plies = sum(1 for _ in game.mainline_moves())
+    num_moves = board.fullmove_number + (num_plies + (board.turn == chess.BLACK)) // 2
+    headers = game.headers
+    game_meta = {
+        "game_id": game_id,
+        "site": headers.get("Site"),
+        "event": headers.get("Event"),
+        "date": headers.get("Date"),
+        "white_player": headers.get("White"),
+        "black_player": headers.get("Black"),
+        "result": headers.get("Result"),
+        "num_moves": num_moves,
+        "is_stockfish_test": is_stockfish_test
+    }
+    return board, game_meta, num_plies
+
+
+def _iter_position_features(game, board, compute_san=True, validate=False):
+    """
+    Yields the position features of every mainline ply, pushing each move
+    onto board after its row is produced. move_san is None when compute_san
+    is False.
+    chess.pgn.read_game already checks every move while parsing, so the
+    extra board.is_legal() per ply (a legal-move generation) only runs when
+    validate is True.
+    Raises ValueError when a move is illegal or cannot be processed.
+    """
+    # Repeticiones contadas de forma incremental por clave de transposición:
+    # O(1) por jugada, en vez de board.is_repetition() que recorre el historial
+    seen = Counter()
+    key = board._transposition_key()
+    seen[key] += 1
+
     for move in game.mainline_moves():
-        if not board.is_legal(move):
-            print(f"⚠️ Movimiento ilegal: {move} en {board.fen()}")
-            return []
+        if validate and not board.is_legal(move):
+            raise ValueError(f"Movimiento ilegal: {move} en {board.fen()}")
 
         try:
-            row = extract_features_from_position(board, move)
-
-            row.update({
-                "game_id": game_id,
-                "site": game.headers.get("Site"),
-                "event": game.headers.get("Event"),
-                "date": game.headers.get("Date"),
-                "white_player": game.headers.get("White"),
-                "black_player": game.headers.get("Black"),
-                "result": game.headers.get("Result"),
-                "num_moves": game.end().board().fullmove_number,
-                "is_stockfish_test": is_stockfish_test
-            })
+            row = extract_features_from_position(board, move, compute_san, seen[key])
+        except Exception as e:
+            raise ValueError(f"Error inesperado con {move}: {e}") from e
+
+        yield row
+        board.push(move)
+        key = board._transposition_key()
+        seen[key] += 1
+
+
+def generate_features_from_game(game, game_id=None, is_stockfish_test=False, compute_san=True,
+                                validate=False):
+    board, game_meta, _ = _prepare_game(game, game_id, is_stockfish_test)
+    if board is None:
+        return []
 
+    rows = []
+    try:
+        for row in _iter_position_features(game, board, compute_san, validate):
+            row.update(game_meta)
             rows.append(row)
-            board.push(move)
-        except Exception as e:
-            print(f"⚠️ Error inesperado con {move}: {e}")
-            return []
+    except ValueError as e:
+        print(f"⚠️ {e}")
+        return []
 
     return rows
+
+
+# Columnas numéricas por jugada y su dtype compacto para el formato columnar
+NUMERIC_FEATURE_DTYPES = {
+    "material_balance": np.int16,
+    "material_total": np.int16,
+    "num_pieces": np.int16,
+    "branching_factor": np.int16,
+    "self_mobility": np.int16,
+    "opponent_mobility": np.int16,
+    "move_number": np.int16,
+    "player_color": np.uint8,
+    "has_castling_rights": np.uint8,
+    "is_repetition": np.uint8,
+    "is_low_mobility": np.uint8,
+    "is_center_controlled": np.uint8,
+    "is_pawn_endgame": np.uint8,
+}
+TEXT_FEATURE_COLUMNS = ("fen", "move_san", "move_uci", "phase")
+
+# Schema fijo del parquet de features: mismo orden de columnas que generate_features_frame
+FEATURES_SCHEMA = pa.schema(
+    [(name, pa.string()) for name in TEXT_FEATURE_COLUMNS]
+    + [(name, pa.from_numpy_dtype(dtype)) for name, dtype in NUMERIC_FEATURE_DTYPES.items()]
+    + [(name, pa.string()) for name in (
+        "game_id", "site", "event", "date", "white_player", "black_player", "result")]
+    + [("num_moves", pa.int32()), ("is_stockfish_test", pa.bool_())]
+)
+
+
+def generate_features_frame(game, game_id=None, is_stockfish_test=False,
+                            compute_san=True, validate=False) -> pd.DataFrame:
+    """
+    Columnar (SoA) version of generate_features_from_game: each numeric
+    feature goes into a preallocated typed NumPy array and the per-game
+    metadata is broadcast as scalar columns, so no dict is kept per ply.
+
+    :param game: Parsed chess.pgn.Game.
+    :param game_id: Game ID (computed from the game when None).
+    :param is_stockfish_test: Value for the is_stockfish_test column.
+    :param compute_san: Fill move_san (costs a legal-move generation per ply).
+    :param validate: Re-check each move with board.is_legal (debug only).
+    :return: DataFrame with one row per mainline ply (empty on error).
+    """
+    board, game_meta, num_plies = _prepare_game(game, game_id, is_stockfish_test)
+    if board is None:
+        return pd.DataFrame()
+
+    numeric = {name: np.empty(num_plies, dtype=dtype)
+               for name, dtype in NUMERIC_FEATURE_DTYPES.items()}
+    text = {name: [] for name in TEXT_FEATURE_COLUMNS}
+
+    try:
+        for i, row in enumerate(_iter_position_features(game, board, compute_san, validate)):
+            for name, values in numeric.items():
+                values[i] = row[name]
+            for name, values in text.items():
+                values.append(row[name])
+    except ValueError as e:
+        print(f"⚠️ {e}")
+        return pd.DataFrame()
+
+    df = pd.DataFrame({**text, **numeric})
+    for name, value in game_meta.items():
+        df[name] = value
+    return df
+
+
+def _features_frame_from_pgn(pgn_text: str) -> pd.DataFrame:
+    """Pool worker: parses one PGN game and returns its features frame."""
+    game = chess.pgn.read_game(io.StringIO(pgn_text))
+    if game is None:
+        return pd.DataFrame()
+    return generate_features_frame(game)
+
+
+def generate_features_batch(pgn_texts, workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Generates the features of many games in parallel. Games are sent to the
+    workers as PGN strings and each worker parses and processes them on its
+    own, so every core runs python-chess outside the parent's GIL.
+    Row order across games is not preserved.
+    Callers must run it under `if __name__ == "__main__":`.
+
+    :param pgn_texts: Iterable of PGN strings, one game each.
+    :param workers: Number of worker processes.
+    :return: DataFrame with the rows of every valid game.
+    """
+    with Pool(processes=workers) as pool:
+        frames = [
+            frame for frame in pool.imap_unordered(
+                _features_frame_from_pgn, pgn_texts, chunksize=BATCH_CHUNKSIZE)
+            if not frame.empty
+        ]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def generate_features_to_parquet(pgn_texts, out_path, batch_size: int = 8192,
+                                 compute_san=True) -> int:
+    """
+    Streams the features of many games to a Parquet file: rows are buffered
+    per game and written as one row group every batch_size rows, so memory
+    stays bounded whatever the size of the corpus.
+
+    :param pgn_texts: Iterable of PGN strings, one game each.
+    :param out_path: Destination .parquet file.
+    :param batch_size: Rows per written batch.
+    :param compute_san: Fill move_san (costs a legal-move generation per ply).
+    :return: Number of rows written.
+    """
+    written = 0
+    pending = []
+    pending_rows = 0
+
+    def flush():
+        nonlocal written, pending, pending_rows
+        df = pd.concat(pending, ignore_index=True)
+        # Table, not RecordBatch: Arrow-backed string columns (the pandas 3
+        # default) convert to chunked arrays
+        writer.write_table(pa.Table.from_pandas(
+            df, schema=FEATURES_SCHEMA, preserve_index=False))
+        written += len(df)
+        pending = []
+        pending_rows = 0
+
+    with pq.ParquetWriter(out_path, FEATURES_SCHEMA, compression="zstd") as writer:
+        for pgn_text in pgn_texts:
+            game = chess.pgn.read_game(io.StringIO(pgn_text))
+            if game is None:
+                continue
+            frame = generate_features_frame(game, compute_san=compute_san)
+            if frame.empty:
+                continue
+            pending.append(frame)
+            pending_rows += len(frame)
+            if pending_rows >= batch_size:
+                flush()
+        if pending:
+            flush()
+
+    return written
+
+
+# Resumen por partida: (columna, agregacion) en el orden de las columnas de salida
+GAME_SUMMARY_AGGREGATIONS = (
+    ("material_balance", "mean"),
+    ("material_balance", "stddev"),
+    ("material_balance", "min"),
+    ("material_balance", "max"),
+    ("material_total", "mean"),
+    ("material_total", "min"),
+    ("material_total", "max"),
+    ("num_pieces", "mean"),
+    ("num_pieces", "min"),
+    ("branching_factor", "mean"),
+    ("branching_factor", "max"),
+    ("move_number", "max"),
+)
+
+
+def summarize_features_by_game(features) -> pa.Table:
+    """
+    Rolls the per-ply features up to one row per game_id with Arrow's hash
+    aggregate (Table.group_by), which runs in C++ without building a pandas
+    MultiIndex. Output columns are named <feature>_<aggregation>.
+
+    When features is a parquet path and Polars is installed, the scan and the
+    aggregation run as a single lazy Polars query instead.
+
+    :param features: DataFrame, pyarrow Table or path to a features parquet.
+    :return: pyarrow Table with game_id plus one column per aggregation.
+    """
+    output_columns = ["game_id"] + [f"{name}_{func}" for name, func in GAME_SUMMARY_AGGREGATIONS]
+    columns = ["game_id"] + sorted({name for name, _ in GAME_SUMMARY_AGGREGATIONS})
+
+    if pl is not None and isinstance(features, (str, os.PathLike)):
+        polars_aggs = {"mean": "mean", "stddev": "std", "min": "min", "max": "max"}
+        summary = (
+            pl.scan_parquet(features)
+            .group_by("game_id", maintain_order=True)
+            .agg([getattr(pl.col(name), polars_aggs[func])().alias(f"{name}_{func}")
+                  for name, func in GAME_SUMMARY_AGGREGATIONS])
+            .collect()
+        )
+        return summary.select(output_columns).to_arrow()
+
+    if isinstance(features, pd.DataFrame):
+        table = pa.Table.from_pandas(features[columns], preserve_index=False)
+    elif isinstance(features, pa.Table):
+        table = features.select(columns)
+    else:
+        table = pq.read_table(features, columns=columns)
+
+    # ddof=1 para que stddev coincida con pandas .std()
+    aggregations = [
+        (name, func, pc.VarianceOptions(ddof=1)) if func == "stddev" else (name, func)
+        for name, func in GAME_SUMMARY_AGGREGATIONS
+    ]
+    summary = table.group_by("game_id").aggregate(aggregations)
+    return summary.select(output_columns)
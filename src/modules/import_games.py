@@ -2,10 +2,14 @@ from pathlib import Path
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 import os
+import re
 import sys
 import traceback
-import chess.pgn
 import argparse
+import itertools
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from db.db_utils import DBUtils
 from modules.utils import show_spinner_message
 from modules.pgn_batch_loader import extract_features_from_game, extract_pgn_files
@@ -14,8 +18,84 @@ from db.repository.games_repository import GamesRepository
 load_dotenv()
 DB_PATH_URL = os.environ.get("CHESS_TRAINER_DB_URL")
 PATH_PGN = os.environ.get("PATH_PGN")
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", 4))
+PARSE_CHUNKSIZE = 64
+# Games read from a file and submitted to the pool at a time
+PARSE_BATCH_SIZE = 5_000
+# Batches parsed and queued ahead of the DB writer
+MAX_BATCHES_IN_FLIGHT = 2
+# Parsed games buffered before each COPY into the games table
+COPY_BATCH_SIZE = 10_000
 db_utils = DBUtils()
 
+# Each game starts with its [Event ...] tag; split right before it.
+GAME_SPLIT_RE = re.compile(r"\n(?=\[Event )")
+
+
+def split_pgn_games(pgn_text):
+    """Splits the text of a PGN file into one string per game."""
+    return [chunk for chunk in GAME_SPLIT_RE.split(pgn_text) if chunk.strip()]
+
+
+def iter_pgn_games(fileobj, chunk_size=1 << 20):
+    """
+    Yields one string per game from an open PGN text stream, reading it in
+    blocks so a whole file or archive member is never held in memory. The
+    last (possibly incomplete) game of each block is carried to the next.
+    """
+    carry = ""
+    while True:
+        block = fileobj.read(chunk_size)
+        if not block:
+            break
+        games = GAME_SPLIT_RE.split(carry + block)
+        carry = games.pop()
+        for game in games:
+            if game.strip():
+                yield game
+    if carry.strip():
+        yield carry
+
+
+def _parse_game_chunk(pgn_text):
+    """Worker: parses a single game's PGN text into a games row."""
+    return extract_features_from_game(pgn_text)
+
+
+def _save_parsed_files(repo, parsed_files, stats):
+    """
+    DB writer thread: takes (filename, rows iterator) batches from the queue
+    until it gets None, buffers the parsed rows and COPYs them into the
+    games table every COPY_BATCH_SIZE games.
+    """
+    pending = []
+
+    def flush():
+        imported = repo.copy_games(pending)
+        stats["imported"] += imported
+        print(
+            f"📖 {imported} games saved, {len(pending) - imported} already existed")
+        pending.clear()
+
+    finished = False
+    try:
+        while True:
+            item = parsed_files.get()
+            if item is None:
+                finished = True
+                break
+            filename, parsed_rows = item
+            pending.extend(row for row in parsed_rows if row)
+            print(f"🧩 Parsed {filename} ({len(pending)} games buffered)")
+            if len(pending) >= COPY_BATCH_SIZE:
+                flush()
+        flush()
+    except Exception as e:
+        stats["error"] = e
+        # Keep draining so the producer never blocks on a full queue
+        while not finished and parsed_files.get() is not None:
+            pass
+
 
 def parse_and_save_pgn(pgn_path, db_url=DB_PATH_URL, max_games=None):
     try:
@@ -31,45 +111,57 @@ def parse_and_save_pgn(pgn_path, db_url=DB_PATH_URL, max_games=None):
         Session = sessionmaker(bind=engine)
         session = Session()
         repo = GamesRepository(session_factory=lambda: session)
-        count = 0
+        submitted = 0
         pgn_files = extract_pgn_files(pgn_path)
 
-        for filename, fileobj in pgn_files:
-            print(f"📂 Processing file: {filename}")
-            if hasattr(fileobj, "mode") and "b" in getattr(fileobj, "mode", ""):
-                import io
-                fileobj = io.TextIOWrapper(fileobj, encoding="utf-8")
-            with fileobj:
-                while True:
-                    game = chess.pgn.read_game(fileobj)
-                    if game is None:
-                        break
-
-                    headers = game.headers
-                    pgn_string = str(game)
-                    # game_id = db_utils.compute_game_id(game)
-                    show_spinner_message(
-                        f"Processing game: {headers.get('White', 'Unknown')} vs {headers.get('Black', 'Unknown')}")
+        # Pipeline: this thread streams the files and submits their games to
+        # the process pool in batches, while a writer thread saves the parsed
+        # rows of previous batches. The bounded queue keeps memory flat.
+        parsed_files = queue.Queue(maxsize=MAX_BATCHES_IN_FLIGHT)
+        stats = {"imported": 0, "error": None}
+        writer = threading.Thread(
+            target=_save_parsed_files, args=(repo, parsed_files, stats))
+        writer.start()
 
-                    game_features = extract_features_from_game(pgn_string)
-
-                    if repo.game_exists(game_features['game_id']):
-                        print("⏭️ Already exists, skipping...")
-                        continue
-
-                    print(f"📖 Saving game data: {game_features}")
-                    repo.save_game(game_features)
-
-                    count += 1
-                    print(
-                        f"Importing game #{count}: {headers.get('White', 'Unknown')} vs {headers.get('Black', 'Unknown')}")
+        try:
+            with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                for filename, fileobj in pgn_files:
+                    if stats["error"]:
+                        break
+                    print(f"📂 Processing file: {filename}")
+                    if hasattr(fileobj, "mode") and "b" in getattr(fileobj, "mode", ""):
+                        import io
+                        fileobj = io.TextIOWrapper(fileobj, encoding="utf-8")
+                    with fileobj:
+                        games = iter_pgn_games(fileobj)
+                        if max_games:
+                            games = itertools.islice(games, max_games - submitted)
+                        # executor.map submits everything it is given at once:
+                        # feed it bounded batches so the file is never all in memory
+                        while not stats["error"]:
+                            batch = list(itertools.islice(games, PARSE_BATCH_SIZE))
+                            if not batch:
+                                break
+                            submitted += len(batch)
+                            show_spinner_message(
+                                f"Parsing {len(batch)} games from {filename}")
+                            parsed_files.put((filename, executor.map(
+                                _parse_game_chunk, batch, chunksize=PARSE_CHUNKSIZE)))
 
-                    if max_games and count >= max_games:
+                    if max_games and submitted >= max_games:
                         print(f"⏹ Limit reached: {max_games}")
                         break
-        repo.commit()
+                parsed_files.put(None)
+                writer.join()
+        finally:
+            if writer.is_alive():
+                parsed_files.put(None)
+                writer.join()
+
+        if stats["error"]:
+            raise stats["error"]
         repo.close()
-        print(f"✅ {count} games imported.")
+        print(f"✅ {stats['imported']} games imported.")
     except Exception as e:
         print(f"❌ Error processing PGN: {e}\n{traceback.format_exc()}")
         if e.__cause__:
@@ -7,9 +7,7 @@ import chess.pgn
 import bz2
 import gzip
 import os
-import shutil
 import tarfile
-import tempfile
 from typing import IO, Generator, Iterable, Tuple
 import zipfile
 
@@ -17,7 +15,18 @@ from modules.pgn_utils import get_game_id
 from modules.utils import safe_int
 
 
+# Read buffer for PGN streams coming out of archives
+STREAM_BUFFER_SIZE = 1 << 20
+
+
 def extract_pgn_files(input_path):
+    """
+    Yields (name, text stream) for every PGN found in input_path, which can be
+    a folder, a .pgn file, a .zip/.tar archive or a single .gz/.bz2 file.
+
+    Archive members are decompressed on the fly, without writing them to disk,
+    so each stream is only valid until the next item is requested.
+    """
     def is_pgn_file(name):
         return name.endswith(".pgn")
 
@@ -25,23 +34,14 @@ def extract_pgn_files(input_path):
         # Detect inner compressed formats
         if name.endswith(".bz2"):
             with bz2.open(byte_stream, "rt", encoding="utf-8") as f:
-                with tempfile.NamedTemporaryFile("w+", delete=False, suffix=".pgn", encoding="utf-8") as tmp:
-                    shutil.copyfileobj(f, tmp)
-                    tmp.flush()
-                    tmp.seek(0)
-                    yield name.replace(".bz2", ""), open(tmp.name, encoding="utf-8")
+                yield name.replace(".bz2", ""), f
         elif name.endswith(".gz"):
             with gzip.open(byte_stream, "rt", encoding="utf-8") as f:
-                with tempfile.NamedTemporaryFile("w+", delete=False, suffix=".pgn", encoding="utf-8") as tmp:
-                    shutil.copyfileobj(f, tmp)
-                    tmp.flush()
-                    tmp.seek(0)
-                    yield name.replace(".gz", ""), open(tmp.name, encoding="utf-8")
+                yield name.replace(".gz", ""), f
         elif name.endswith(".pgn"):
-            with tempfile.NamedTemporaryFile("w+b", delete=False) as tmp:
-                tmp.write(byte_stream.read())
-                tmp.flush()
-                yield name, open(tmp.name, encoding="utf-8")
+            buffered = io.BufferedReader(byte_stream, STREAM_BUFFER_SIZE)
+            with io.TextIOWrapper(buffered, encoding="utf-8") as f:
+                yield name, f
 
     if os.path.isdir(input_path):
         for filename in os.listdir(input_path):
@@ -63,7 +63,8 @@ def extract_pgn_files(input_path):
 
     elif input_path.endswith(".gz") or input_path.endswith(".bz2"):
         # Single compressed file on disk
-        yield from extract_from_nested_compressed(input_path, open(input_path, "rb"))
+        with open(input_path, "rb") as raw:
+            yield from extract_from_nested_compressed(input_path, raw)
 
     elif is_pgn_file(input_path):
         yield input_path, open(input_path, encoding="utf-8")
@@ -126,21 +127,38 @@ def extract_features_from_game(game_text: str) -> dict:
             print("❌ No se pudo leer el juego o no tiene encabezados.")
             return None
 
-        # Verificar si tiene encabezado FEN
+        return extract_features_from_game_obj(game, game_text)
+    except Exception as e:
+        print(f"❌ Error al procesar el juego: {e} - {traceback.format_exc()}")
+        if e.__cause__:
+            print(f"🔍 Causa del error: {e.__cause__}")
+        return None
+
+
+def extract_features_from_game_obj(game: chess.pgn.Game, game_text: str = None) -> dict:
+    """
+    Builds the games row from an already parsed game, without serializing it
+    and parsing it again. `game_text` is stored as the pgn column when the
+    caller still has the original text; otherwise the game is exported once.
+    """
+    try:
+        if game is None or not game.headers:
+            print("❌ No se pudo leer el juego o no tiene encabezados.")
+            return None
+
+        # Verificar si tiene encabezado FEN (un FEN inválido lanza ValueError)
         if "FEN" not in game.headers:
             print("⚠️ No se encontró FEN en los encabezados, usando posición inicial.")
-            board = chess.Board()  # posición inicial
         else:
-            board = chess.Board(game.headers["FEN"])
+            chess.Board(game.headers["FEN"])
 
         headers = game.headers
         game_id = get_game_id(game)
 
-        # Intentar validar al menos la primera jugada
-        moves = list(game.mainline_moves())
-        board_copy = board.copy()
-        for move in moves:
-            board_copy.push(move)
+        # read_game ya valida cada jugada contra el tablero mientras parsea y
+        # deja los problemas en game.errors: no hace falta re-jugar la partida
+        for error in game.errors:
+            print(f"⚠️ Jugada inválida en el PGN: {error}")
 
         print(f"HEADERS: {headers}")
 
@@ -156,7 +174,7 @@ def extract_features_from_game(game_text: str) -> dict:
             "date": headers.get("Date", ""),
             "eco": headers.get("ECO", ""),
             "opening": headers.get("Opening", ""),
-            "pgn": game_text,
+            "pgn": game_text if game_text is not None else str(game),
             "source": headers.get("Source", "unknown"),
         }
     except Exception as e:
@@ -10,6 +10,7 @@ import gzip
 import chess.pgn
 import io
 from modules.utils import show_spinner_message
+from modules.pgn_utils import find_pgn_files
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 
@@ -25,8 +26,37 @@ def estimate_processing_time(num_games, avg_time_per_game=0.05, avg_tactical_ana
     return import_time, tactics_time, total_time
 
 
-def count_games_in_pgn(file_like):
-    """Cuenta la cantidad de partidas PGN en un archivo ya abierto (modo texto)."""
+# Cada partida empieza con su tag [Event ...] al inicio de una línea
+GAME_START = b'\n[Event "'
+
+
+def count_game_starts(stream, chunk_size=1 << 20):
+    """
+    Cuenta partidas buscando el tag [Event al inicio de línea, leyendo el
+    stream por bloques (bytes o texto) sin parsear jugadas.
+    """
+    count = 0
+    tail = b"\n"  # el inicio del stream cuenta como inicio de línea
+    while True:
+        block = stream.read(chunk_size)
+        if not block:
+            break
+        if isinstance(block, str):
+            block = block.encode("utf-8")
+        data = tail + block
+        count += data.count(GAME_START)
+        tail = data[-(len(GAME_START) - 1):]
+    return count
+
+
+def count_games_in_pgn(file_like, deep=False):
+    """
+    Cuenta la cantidad de partidas PGN en un archivo ya abierto.
+    Por defecto cuenta los tags [Event; con deep=True parsea cada partida.
+    """
+    if not deep:
+        return count_game_starts(file_like)
+
     count = 0
     while True:
         show_spinner_message("🔍 Counting games in pgn files...")
@@ -108,10 +138,16 @@ def inspect_pgn_zip_files(folder_path):
     return total_games
 
 
-def _count_games_in_file(file_path):
+def _count_games_in_file(file_path, deep=False):
     import chess.pgn
     count = 0
     try:
+        if not deep:
+            if Path(file_path).stat().st_size == 0:
+                return str(file_path), 0
+            with open(file_path, "rb") as f:
+                return str(file_path), count_game_starts(f)
+
         with open(file_path, "r", encoding="utf-8") as f:
             while True:
                 game = chess.pgn.read_game(f)
@@ -137,7 +173,7 @@ def inspect_pgn_sources_from_folder(path):
 
     pgn_files = []
     if path.is_dir():
-        pgn_files = list(path.rglob("*.pgn"))
+        pgn_files = find_pgn_files(path)
     elif path.suffix == ".pgn":
         pgn_files = [path]
     else:
@@ -184,10 +220,7 @@ def inspect_pgn_sources_from_zip(path):
         total_pgn_files += 1
         try:
             if isinstance(fileobj, (bytes, bytearray)):
-                fileobj = io.TextIOWrapper(
-                    io.BytesIO(fileobj), encoding="utf-8")
-            elif not isinstance(fileobj, io.TextIOBase):
-                fileobj = io.TextIOWrapper(fileobj, encoding="utf-8")
+                fileobj = io.BytesIO(fileobj)
             total_games += count_games_in_pgn(fileobj)
         except Exception:
             pass
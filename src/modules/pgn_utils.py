@@ -1,8 +1,11 @@
 from typing import Dict, List
 import chess.pgn
 from chess.pgn import StringExporter
+import hashlib
 import io
-from pathlib import Path
+import mmap
+import os
+import re
 from typing import Tuple
 
 from nbconvert import ScriptExporter
@@ -48,15 +51,33 @@ def load_pgn_from_file(path):
 # 📄📄 Load all games from a file
 
 
-def load_multiple_games_from_file(path):
-    games = []
+def iter_games(path, keep=None):
+    """
+    Yields the games of a PGN file one at a time instead of building a list.
+    If keep is given, it is called with the headers of each game and only
+    the games it accepts get their moves parsed; the others are skipped by
+    chess.pgn.read_headers without building a move tree.
+    """
     with open(path, "r", encoding="utf-8") as f:
         while True:
-            game = chess.pgn.read_game(f)
-            if game is None:
-                break
-            games.append(game)
-    return games
+            if keep is None:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    return
+                yield game
+                continue
+
+            offset = f.tell()
+            headers = chess.pgn.read_headers(f)
+            if headers is None:
+                return
+            if keep(headers):
+                f.seek(offset)
+                yield chess.pgn.read_game(f)
+
+
+def load_multiple_games_from_file(path, keep=None):
+    return list(iter_games(path, keep))
 
 
 def split_pgn_file_by_games(pgn_text: str, games_per_chunk: int = 10):
@@ -75,12 +96,10 @@ def split_pgn_file_by_games(pgn_text: str, games_per_chunk: int = 10):
     """
     Split a PGN string (or Game object) into chunks of N games.
     """
-    import io
     import chess.pgn
 
     # Convierte si es objeto Game
     if isinstance(pgn_text, chess.pgn.Game):
-        output = io.StringIO()
         pgn_text = pgn_text.accept(StringExporter(
             headers=True, variations=True, comments=True))
 
@@ -146,14 +165,35 @@ def pgn_str_to_game(pgn_str: str) -> chess.pgn.Game:
         print(f"⚠️ Error parsing PGN string: {e}")
         return None
 
+# Headers that identify a game on its own (Lichess/Chess.com exports carry all of them)
+GAME_KEY_HEADERS = ("Site", "UTCDate", "UTCTime", "White", "Black", "Result")
+
+
+def get_header_game_id(headers):
+    """
+    Returns the game id derived from the identifying headers alone, or None
+    when they are missing and the whole game has to be hashed instead.
+    Works on the headers returned by chess.pgn.read_headers, so the move
+    text does not need to be parsed to know a game's id.
+    """
+    # Games exported with a full UTC timestamp are identified by their
+    # headers alone (~100 bytes to hash instead of the whole PGN)
+    if all(headers.get(h) and "?" not in headers[h] for h in GAME_KEY_HEADERS[:3]):
+        key = "|".join(headers.get(h, "") for h in GAME_KEY_HEADERS)
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=32).hexdigest()
+    return None
+
+
 def get_game_id(game):
     try:
-        # Logic to generate a unique hash or game identifier
-        # Usually based on PGN or key metadata
+        game_id = get_header_game_id(game.headers)
+        if game_id:
+            return game_id
+
+        # Fallback for games without a reliable key: hash the exported PGN
         exporter = chess.pgn.StringExporter(
             headers=True, variations=False, comments=False)
         pgn_str = game.accept(exporter)
-        import hashlib
         return hashlib.sha256(pgn_str.encode("utf-8")).hexdigest()
     except Exception as e:
         print(f"⚠️ Error getting game ID: {e}")
@@ -162,13 +202,69 @@ def get_game_id(game):
         return None
 
 
+def find_pgn_files(root) -> List[str]:
+    """
+    Recursively lists the .pgn files under root with os.scandir, which reuses
+    the file type returned by the directory read instead of a stat per entry.
+    Returns plain str paths.
+    """
+    pgn_files = []
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".pgn") and entry.is_file():
+                    pgn_files.append(entry.path)
+    return pgn_files
+
+
+# Header-only parsing: a tag pair per line, e.g. [White "Carlsen, Magnus"]
+HEADER_RE = re.compile(rb'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+BLANK_LINE_RE = re.compile(rb'\r?\n[ \t]*\r?\n')
+GAME_BOUNDARY = b'\n[Event '
+
+
+def iter_header_blocks(data):
+    """
+    Yields a dict of PGN headers per game found in data (bytes or mmap),
+    splitting on [Event tags and tokenizing only the tag section with a
+    regex. Move text is never parsed, unlike chess.pgn.read_game.
+    """
+    size = len(data)
+    pos = 0
+    while pos < size:
+        next_game = data.find(GAME_BOUNDARY, pos + 1)
+        end = size if next_game == -1 else next_game
+        block = data[pos:end]
+        blank = BLANK_LINE_RE.search(block)
+        tag_section = block[:blank.start()] if blank else block
+        headers = {
+            name.decode("ascii"): value.decode("utf-8", errors="replace")
+            .replace('\\"', '"').replace("\\\\", "\\")
+            for name, value in HEADER_RE.findall(tag_section)
+        }
+        if headers:
+            yield headers
+        pos = end
+
+
+def read_pgn_headers(path):
+    """Yields the headers of every game in a PGN file, reading it through mmap."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter_header_blocks(mm)
+
+
 # 📁📄📄 Load all games from all .pgn files in a folder
 def load_all_games_from_dir(directory):
     all_games = []
-    pgn_files = Path(directory).rglob("*.pgn")
+    pgn_files = find_pgn_files(directory)
     for pgn_path in sorted(pgn_files):
-        games = load_multiple_games_from_file(pgn_path)
-        all_games.extend(games)
+        all_games.extend(iter_games(pgn_path))
 
     print(f"🔍 Loaded {len(all_games)} games from {directory}")
     return all_games
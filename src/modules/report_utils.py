@@ -1,7 +1,6 @@
 import os
-import chess
 from modules.feature_engineering import is_center_controlled, is_pawn_endgame
-from pgn_utils import get_game_id
+from pgn_utils import get_game_id, read_pgn_headers
 
 
 def check_pgn_headers(directory):
@@ -9,16 +8,13 @@ def check_pgn_headers(directory):
     for filename in os.listdir(directory):
         if filename.endswith(".pgn"):
             path = os.path.join(directory, filename)
-            with open(path, "r", encoding="utf-8") as f:
-                while True:
-                    game = chess.pgn.read_game(f)
-                    if game is None:
-                        break
-                    setup = game.headers.get("SetUp", "0")
-                    fen = game.headers.get("FEN", None)
-                    if setup == "1" and fen:
-                        results.append(
-                            (filename, game.headers.get("Event", ""), fen))
+            # Only headers are needed: skip the move-tree parse
+            for headers in read_pgn_headers(path):
+                setup = headers.get("SetUp", "0")
+                fen = headers.get("FEN", None)
+                if setup == "1" and fen:
+                    results.append(
+                        (filename, headers.get("Event", ""), fen))
     return results
 
 # Usalo así:
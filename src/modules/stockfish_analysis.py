@@ -3,10 +3,15 @@
 import os
 import traceback
 import chess
+import chess.engine
 import dotenv
 env = dotenv.load_dotenv()
 
 STOCKFISH_PATH = os.environ.get("STOCKFISH_PATH")
+# Corte temprano de la búsqueda: a partir de EARLY_STOP_MIN_DEPTH se para
+# cuando la evaluación varía menos de EARLY_STOP_CP en dos iteraciones seguidas
+EARLY_STOP_MIN_DEPTH = int(os.environ.get("EARLY_STOP_MIN_DEPTH", 6))
+EARLY_STOP_CP = int(os.environ.get("EARLY_STOP_CP", 10))
 
 # MIGRATED-TODO: Analizar donde usar este analisis, si en el juego o en el ejercicio
 
@@ -52,21 +57,24 @@ def get_engine(depth=15):
     return chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH), depth
 
 
-def get_evaluation(fen, depth=10, multipv=1):
+def get_evaluation(fen, depth=10, multipv=1, engine=None, game=None):
+    """
+    Evalúa una posición con Stockfish.
+
+    :param fen: Posición a evaluar.
+    :param depth: Profundidad de búsqueda.
+    :param multipv: Número de líneas principales.
+    :param engine: Motor UCI ya abierto. Sin él se lanza un proceso por llamada;
+        pasando el mismo motor en todas las jugadas de una partida se evita el
+        arranque y la tabla de transposiciones se reutiliza entre jugadas.
+    :param game: Identificador de la partida; el motor recibe ucinewgame solo
+        cuando cambia.
+    """
     try:
-        with chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH) as engine:
-            board = chess.Board(fen)
-            info = engine.analyse(board, chess.engine.Limit(
-                depth=depth), multipv=multipv)
-            turn = board.turn
-            if multipv == 1:
-                print("Multipv is set to 1, returning single evaluation.")
-                return parse_info(info, turn=board.turn)
-            else:
-                return {
-                    "best": parse_info(info[0], turn),
-                    "alternatives": [parse_info(i, turn) for i in info[1:]]
-                } if multipv > 1 else {"best": parse_info(info, turn), "alternatives": []}
+        if engine is None:
+            with chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH) as engine:
+                return _analyse_fen(engine, fen, depth, multipv, game)
+        return _analyse_fen(engine, fen, depth, multipv, game)
     except Exception as e:
         print(f"❌ Error al obtener evaluación: {e} - {traceback.format_exc()}")
         if e.__cause__:
@@ -74,6 +82,46 @@ def get_evaluation(fen, depth=10, multipv=1):
         return {"best": {"type": "error", "value": None, "mate_in": None}, "alternatives": []}
 
 
+def _analyse_until_stable(engine, board, depth, game=None):
+    """
+    Búsqueda de una sola línea con depth como techo, que se detiene antes si
+    la evaluación ya es estable (ver EARLY_STOP_MIN_DEPTH / EARLY_STOP_CP).
+    En posiciones tranquilas el score apenas cambia en las últimas
+    iteraciones y no hace falta llegar a la profundidad máxima.
+
+    :return: El mismo dict de info que devolvería engine.analyse.
+    """
+    with engine.analysis(board, chess.engine.Limit(depth=depth), game=game) as analysis:
+        last_depth, last_cp, stable = 0, None, 0
+        for info in analysis:
+            # Solo líneas con score exacto de una iteración nueva
+            if ("score" not in info or info.get("depth", 0) <= last_depth
+                    or info.get("lowerbound") or info.get("upperbound")):
+                continue
+            last_depth = info["depth"]
+            cp = info["score"].relative.score(mate_score=100000)
+            stable = stable + 1 if last_cp is not None and abs(cp - last_cp) < EARLY_STOP_CP else 0
+            last_cp = cp
+            if stable >= 2 and last_depth >= EARLY_STOP_MIN_DEPTH:
+                analysis.stop()
+                break
+        return analysis.info
+
+
+def _analyse_fen(engine, fen, depth, multipv, game=None):
+    board = chess.Board(fen)
+    turn = board.turn
+    if multipv == 1:
+        print("Multipv is set to 1, returning single evaluation.")
+        return parse_info(_analyse_until_stable(engine, board, depth, game), turn=turn)
+    info = engine.analyse(board, chess.engine.Limit(
+        depth=depth), multipv=multipv, game=game)
+    return {
+        "best": parse_info(info[0], turn),
+        "alternatives": [parse_info(i, turn) for i in info[1:]]
+    } if multipv > 1 else {"best": parse_info(info, turn), "alternatives": []}
+
+
 def evaluate(board, engine, depth=10, multipv=1):
     info = engine.analyse(board, chess.engine.Limit(
         depth=depth), multipv=multipv)
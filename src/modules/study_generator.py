@@ -1,31 +1,58 @@
 import chess
 import chess.pgn
+from functools import lru_cache
 from io import StringIO
 
+
+@lru_cache(maxsize=256)
+def fens_from_moves(starting_fen: str, moves_uci: tuple) -> tuple:
+    """
+    Rebuilds the FEN after each move of a compact sequence, once per line.
+    Used to materialize positions lazily when the sequence was generated
+    without FENs.
+    """
+    board = chess.Board(starting_fen)
+    fens = []
+    for uci in moves_uci:
+        board.push(chess.Move.from_uci(uci))
+        fens.append(board.fen())
+    return tuple(fens)
+
+
 class StudyGenerator:
     def __init__(self, repo):
         self.repo = repo
 
-    def generate_positions_from_pgn(self, study_id: str, pgn: str):
+    def generate_positions_from_pgn(self, study_id: str, pgn: str, include_fen: bool = True):
+        """
+        Builds the position sequence of a study from its PGN.
+        Every entry carries the move in UCI; with include_fen=False the full
+        FEN is not serialized on every ply and the study keeps starting_fen
+        so positions can be rebuilt on demand with fens_from_moves
+        (StudyRepository.save_study does so for study_positions).
+        """
         game = chess.pgn.read_game(StringIO(pgn))
         if not game:
             raise ValueError("No se pudo parsear la partida PGN")
 
         board = game.board()
+        starting_fen = board.fen()
         sequence = []
 
         for move in game.mainline_moves():
             board.push(move)
-            fen = board.fen()
             position_data = {
-                "fen": fen,
+                "move_uci": move.uci(),
                 "comment": "",
                 "is_critical": False
             }
+            if include_fen:
+                position_data["fen"] = board.fen()
             sequence.append(position_data)
 
         # Guardar en base de datos
         study = self.repo.get_study_by_id(study_id)
+        study['starting_fen'] = starting_fen
         study['position_sequence'] = sequence
         self.repo.save_study(study)
 
@@ -4,6 +4,20 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+
+@st.cache_data
+def load_history(path: str, mtime: float):
+    """
+    Lee el CSV y calcula los agregados una sola vez por versión del archivo:
+    el mtime forma parte de la clave, así una nueva predicción invalida el cache.
+    """
+    df = pd.read_csv(path)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    label_order = df["predicted_label"].value_counts().index
+    etiquetas_por_fecha = df.groupby(df["timestamp"].dt.date)["predicted_label"].value_counts().unstack().fillna(0)
+    return df, label_order, etiquetas_por_fecha
+
+
 st.title("Historial de predicciones tácticas")
 
 csv_path = Path("data/predicciones.csv")
@@ -11,19 +25,17 @@ csv_path = Path("data/predicciones.csv")
 if not csv_path.exists():
     st.info("Todavía no hay predicciones registradas.")
 else:
-    df = pd.read_csv(csv_path)
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df, label_order, etiquetas_por_fecha = load_history(str(csv_path), csv_path.stat().st_mtime)
 
     st.subheader("Vista previa")
     st.dataframe(df.tail(20))
 
     st.subheader("Distribución global de etiquetas")
-    sns.countplot(data=df, x="predicted_label", order=df["predicted_label"].value_counts().index)
+    sns.countplot(data=df, x="predicted_label", order=label_order)
     st.pyplot(plt.gcf())
     plt.clf()
 
     st.subheader("Evolución diaria")
-    etiquetas_por_fecha = df.groupby(df["timestamp"].dt.date)["predicted_label"].value_counts().unstack().fillna(0)
     etiquetas_por_fecha.plot(kind="bar", stacked=True, figsize=(10, 5))
     st.pyplot(plt.gcf())
     plt.clf()
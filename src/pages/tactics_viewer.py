@@ -1,3 +1,6 @@
+import asyncio
+import atexit
+
 import streamlit as st
 import chess
 import chess.svg
@@ -5,12 +8,79 @@ import streamlit.components.v1 as components
 from chess.svg import Arrow
 import chess.engine
 
+@st.cache_resource
+def _engine(engine_path="engines/stockfish"):
+    # Un único proceso de Stockfish por ruta, reutilizado entre reruns:
+    # evita el arranque del subproceso y el handshake UCI en cada evaluación
+    engine = chess.engine.SimpleEngine.popen_uci(engine_path)
+    atexit.register(engine.quit)
+    return engine
+
+
 def evaluate_position_with_stockfish(board, engine_path="engines/stockfish", depth=15,multipv=1):
-    with chess.engine.SimpleEngine.popen_uci(engine_path) as engine:
-        info = engine.analyse(board, chess.engine.Limit(depth=depth),multipv=multipv)
-        score = info["score"].white() if board.turn == chess.WHITE else info["score"].black()
-        best_move = info.get("pv", [None])[0]
-        return score, best_move
+    engine = _engine(engine_path)
+    info = engine.analyse(board, chess.engine.Limit(depth=depth),multipv=multipv)
+    score = info["score"].white() if board.turn == chess.WHITE else info["score"].black()
+    best_move = info.get("pv", [None])[0]
+    return score, best_move
+
+
+def _score_and_best_move(board, info):
+    score = info["score"].white() if board.turn == chess.WHITE else info["score"].black()
+    return score, info.get("pv", [None])[0]
+
+
+async def _evaluate_positions(boards, engine_path, depth, concurrency):
+    engines = await asyncio.gather(
+        *(chess.engine.popen_uci(engine_path) for _ in range(concurrency)))
+    results = [None] * len(boards)
+    pending = iter(enumerate(boards))
+
+    async def worker(engine):
+        # Cada motor toma la siguiente posición libre hasta agotar la lista
+        for i, board in pending:
+            info = await engine.analyse(board, chess.engine.Limit(depth=depth))
+            results[i] = _score_and_best_move(board, info)
+
+    try:
+        await asyncio.gather(*(worker(engine) for _, engine in engines))
+    finally:
+        for _, engine in engines:
+            await engine.quit()
+    return results
+
+
+def evaluate_positions(boards, engine_path="engines/stockfish", depth=15, concurrency=2):
+    """
+    Evalúa varias posiciones en paralelo con `concurrency` procesos de
+    Stockfish sobre la API asyncio de python-chess, en vez de una llamada
+    bloqueante por posición.
+    Devuelve una lista de (score, best_move) en el mismo orden que boards.
+    """
+    if not boards:
+        return []
+    concurrency = max(1, min(concurrency, len(boards)))
+    return asyncio.run(_evaluate_positions(boards, engine_path, depth, concurrency))
+
+@st.cache_data
+def _precompute_line(fen, moves):
+    """
+    FEN and last move (from, to) of every position in the line, computed once
+    per (fen, moves) so navigating only indexes the lists. Stops at the first
+    move that cannot be played, like the old replay did.
+    """
+    board = chess.Board(fen)
+    fens = [board.fen()]
+    last_moves = [None]
+    for san in moves:
+        try:
+            move = board.push_san(san)
+        except Exception:
+            break
+        fens.append(board.fen())
+        last_moves.append((move.from_square, move.to_square))
+    return fens, last_moves
+
 
 def show_interactive_line_viewer(fen, lines, tactic_id="default", feedback_mode=False):
     if not lines:
@@ -25,18 +95,14 @@ def show_interactive_line_viewer(fen, lines, tactic_id="default", feedback_mode=
         st.session_state[key_index] = 0
 
     current_index = st.session_state[key_index]
-    board = chess.Board(fen)
-    last_move = None
-
-    for i in range(current_index):
-        try:
-            last_move = board.push_san(selected_line[i])
-        except Exception:
-            break
+    fens, last_moves = _precompute_line(fen, tuple(selected_line))
+    position = min(current_index, len(fens) - 1)
+    board = chess.Board(fens[position])
+    last_move = last_moves[position]
 
     arrows = []
     if last_move:
-        arrows = [Arrow(last_move.from_square, last_move.to_square)]
+        arrows = [Arrow(*last_move)]
 
     svg = chess.svg.board(board, arrows=arrows, size=600)
     components.html(svg, height=400)
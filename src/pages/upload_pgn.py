@@ -1,4 +1,5 @@
 import os
+import shutil
 import streamlit as st
 from pathlib import Path
 
@@ -15,5 +16,6 @@ uploaded_file = st.file_uploader("Subí un archivo PGN", type="pgn")
 if uploaded_file:
     Path(PGN_PATH).mkdir(parents=True, exist_ok=True)
     with open(f"{PGN_PATH}/{uploaded_file.name}", "wb") as f:
-        f.write(uploaded_file.read())
+        # Copia por bloques de 1 MB: no carga el upload completo en memoria
+        shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
     st.success(f"Archivo guardado como data/games/{uploaded_file.name}")
@@ -6,6 +6,7 @@ import pandas as pd
 import io
 import dotenv
 import psutil
+import chess.engine
 import chess.pgn
 import argparse
 from concurrent.futures import ProcessPoolExecutor, as_completed
@@ -16,6 +17,7 @@ from db.repository.analyzed_tacticals_repository import Analyzed_tacticalsReposi
 from db.repository.features_repository import FeaturesRepository
 from db.repository.games_repository import GamesRepository
 from config.tactical_analysis_config import TACTICAL_ANALYSIS_SETTINGS
+from db.session import engine as db_engine
 from modules.pgn_utils import get_game_id, pgn_str_to_game
 
 # Config Logging
@@ -41,6 +43,24 @@ LIMIT_FOR_DEBUG = int(os.environ.get("LIMIT_FOR_DEBUG", 0))
 ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", 2))
 ANALYZED_PER_CHUNK = int(os.environ.get("ANALYZED_PER_CHUNK", 10))
 GAMES_SOURCE = os.environ.get("GAMES_SOURCE", None)
+STOCKFISH_PATH = os.environ.get("STOCKFISH_PATH")
+
+# Stockfish de cada worker del pool (uno por proceso, creado en el initializer)
+_worker_engine = None
+
+
+def _init_worker():
+    """
+    Pool initializer: starts one single-threaded Stockfish per worker process,
+    reused for every game that worker analyzes. Stockfish exits by itself
+    when the worker process ends and its stdin pipe is closed.
+    The connections inherited from the parent's pool are dropped (without
+    closing them) so the worker opens its own.
+    """
+    global _worker_engine
+    db_engine.dispose(close=False)
+    _worker_engine = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
+    _worker_engine.configure({"Threads": 1})
 
 
 def run_parallel_analysis_from_db(source=None, max_games=1000000, offset=0):
@@ -61,34 +81,40 @@ def run_parallel_analysis_from_db(source=None, max_games=1000000, offset=0):
     features_repo = FeaturesRepository()
     games_repo_local = GamesRepository()
 
-    analyzed = set(row.game_id for row in analyzed_tacticals_repo.get_all())
+    analyzed = analyzed_tacticals_repo.get_game_ids()
 
     current_offset = offset
     total_processed = 0
 
-    while total_processed < max_games:
-        try:
-            remaining_games = max_games - total_processed
-            current_chunk_size = min(ANALYZED_PER_CHUNK, remaining_games)
-
-            print(
-                f"🔄 Fetching games to analyze by source {source if source is not None else 'All'} (processed: {total_processed}/{max_games})")
-            chunk = games_repo_local.get_games_by_pagination_not_analyzed(
-                analyzed, current_offset, current_chunk_size, source=source)
-            if not chunk:
-                logging.info("✅ No more games to process.")
-                break
-
-            pending_ids = [get_game_id(pgn_str_to_game(pgn)) for pgn in chunk]
+    # Pool (y sus motores) vivo durante toda la ejecución, no uno por chunk
+    with ProcessPoolExecutor(
+            max_workers=ANALYSIS_WORKERS, initializer=_init_worker) as executor:
+        while total_processed < max_games:
+            try:
+                remaining_games = max_games - total_processed
+                current_chunk_size = min(ANALYZED_PER_CHUNK, remaining_games)
+
+                print(
+                    f"🔄 Fetching games to analyze by source {source if source is not None else 'All'} (processed: {total_processed}/{max_games})")
+                chunk = games_repo_local.get_games_by_pagination_not_analyzed(
+                    analyzed, current_offset, current_chunk_size, source=source)
+                if not chunk:
+                    logging.info("✅ No more games to process.")
+                    break
+
+                # El chunk ya trae el PGN: se envía el texto a los workers en
+                # lugar de que cada uno lo vuelva a pedir a la base
+                pending = [(get_game_id(pgn_str_to_game(pgn)), pgn) for pgn in chunk]
+
+                logging.info(f"🚀 Processing chunk: {len(pending)} games")
+                process = psutil.Process()
+                logging.info(
+                    f"🧠 RAM Before: {process.memory_info().rss / 1024**2:.2f} MB")
 
-            logging.info(f"🚀 Processing chunk: {len(pending_ids)} games")
-            process = psutil.Process()
-            logging.info(
-                f"🧠 RAM Before: {process.memory_info().rss / 1024**2:.2f} MB")
-
-            with ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS) as executor:
                 futures = [executor.submit(
-                    analyze_game_parallel, game_id) for game_id in pending_ids]
+                    analyze_game_parallel, game_id, pgn_text) for game_id, pgn_text in pending]
+                # Los juegos analizados se marcan con un único insert por chunk
+                analyzed_ids = []
                 for future in as_completed(futures):
                     try:
                         game_id, tags_df = future.result(timeout=300)
@@ -100,8 +126,7 @@ def run_parallel_analysis_from_db(source=None, max_games=1000000, offset=0):
                         if tags_df is None:
                             logging.warning(
                                 f"⚠️ Game {game_id} returned no tags.")
-                            analyzed_tacticals_repo.save_analyzed_tactical_hash(
-                                game_id)
+                            analyzed_ids.append(game_id)
                             continue
                         try:
                             features_repo.update_features_tags_and_score_diff(
@@ -111,47 +136,45 @@ def run_parallel_analysis_from_db(source=None, max_games=1000000, offset=0):
                                 f"Sesión rota en juego {game_id}, se hace rollback")
                             features_repo.session.rollback()
 
-                        analyzed_tacticals_repo.save_analyzed_tactical_hash(
-                            game_id)
+                        analyzed_ids.append(game_id)
                         logging.info(
                             f"✅ Game {game_id} analyzed with {len(tags_df)} tags")
                     except Exception as e:
                         logging.error(
                             f"❌ Error saving analysis for game {game_id}: {e}\n{traceback.format_exc()}")
-            current_offset += current_chunk_size
-            total_processed += len(chunk)
+                analyzed_tacticals_repo.save_analyzed_tactical_hashes(analyzed_ids)
+                current_offset += current_chunk_size
+                total_processed += len(chunk)
 
-            if total_processed >= max_games:
-                logging.info(f"✅ Reached max games limit: {max_games}")
-                break
+                if total_processed >= max_games:
+                    logging.info(f"✅ Reached max games limit: {max_games}")
+                    break
 
-        except Exception as e:
-            logging.error(
-                f"⚠️ Error in main loop: {e}\n{traceback.format_exc()}")
-            break
+            except Exception as e:
+                logging.error(
+                    f"⚠️ Error in main loop: {e}\n{traceback.format_exc()}")
+                break
 
 
-def analyze_game_parallel(game_id):
+def analyze_game_parallel(game_id, pgn_text=None):
     try:
-        games_repo = GamesRepository()
-        analyzed_tacticals_repo = Analyzed_tacticalsRepository()
-
         process = psutil.Process()
         logging.info(
             f"🔍 Analyzing game {game_id} - RAM: {process.memory_info().rss / 1024**2:.2f} MB")
 
-        pgn_text = games_repo.get_pgn_text_by_id(game_id)
+        if pgn_text is None:
+            pgn_text = GamesRepository().get_pgn_text_by_id(game_id)
         if not pgn_text or len(pgn_text.strip()) == 0:
-            analyzed_tacticals_repo.save_analyzed_tactical_hash(game_id)
+            Analyzed_tacticalsRepository().save_analyzed_tactical_hash(game_id)
             raise ValueError(f"Game {game_id} has empty or invalid PGN")
 
         pgn_game = chess.pgn.read_game(io.StringIO(pgn_text))
         if not pgn_game:
-            analyzed_tacticals_repo.save_analyzed_tactical_hash(game_id)
+            Analyzed_tacticalsRepository().save_analyzed_tactical_hash(game_id)
             raise ValueError(f"Game {game_id} could not be parsed as PGN")
 
         depth = TACTICAL_ANALYSIS_SETTINGS.get("depth", 8)
-        tags = detect_tactics_from_game(pgn_game, depth)
+        tags = detect_tactics_from_game(pgn_game, depth, engine=_worker_engine)
 
         tags_df = pd.DataFrame(tags)
         if tags_df.empty:
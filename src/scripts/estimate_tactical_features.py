@@ -57,6 +57,9 @@ DB_URL = os.environ.get("CHESS_TRAINER_DB_URL")
 MAX_WORKERS = int(os.environ.get("MAX_WORKERS", 6))
 ESTIMATION_PER_CHUNK = int(os.environ.get("ESTIMATION_PER_CHUNK", 200))
 
+# Piece values indexed by piece_type (PAWN=1 ... KING=6; index 0 unused)
+PIECE_VALUES = (0, 1, 3, 3, 5, 9, 0)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -98,11 +101,8 @@ def estimate_tactical_motifs(game):
                 captured = board.piece_at(move.to_square)
                 
                 if piece and captured:
-                    piece_values = {chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3, 
-                                  chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0}
-                    
-                    piece_value = piece_values.get(piece.piece_type, 0)
-                    captured_value = piece_values.get(captured.piece_type, 0)
+                    piece_value = PIECE_VALUES[piece.piece_type]
+                    captured_value = PIECE_VALUES[captured.piece_type]
                     
                     # Potential sacrifice if losing material
                     if piece_value > captured_value:
@@ -1,34 +1,109 @@
-import pandas as pd
+import os
 from pathlib import Path
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
 # --- Paths ---
 BASE_DIR = Path("data/processed")
 OUTPUT_FILE = "training_dataset.parquet"
+OUTPUT_BY_SOURCE_DIR = "training_dataset_by_source"
+
+# Filas por batch al escanear cada parquet y tope opcional de filas por origen
+SCAN_BATCH_SIZE = int(os.environ.get("SCAN_BATCH_SIZE", 65536))
+SAMPLE_PER_SOURCE = int(os.environ.get("SAMPLE_PER_SOURCE", 0))
+# Escribir tambien una copia particionada por origen (source=<label>/...)
+WRITE_BY_SOURCE = os.environ.get("WRITE_BY_SOURCE", "0") == "1"
+
+# Columnas de texto de baja cardinalidad que se guardan como diccionario
+CATEGORY_COLUMNS = ("source", "platform", "phase", "player_color", "color",
+                    "time_control", "opening_category", "result")
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
 
 # --- Cargar datasets por origen ---
-sources = {
-    "personal": BASE_DIR / "personal_games.parquet",
-    "novice": BASE_DIR / "novice_games.parquet",
-    "elite": BASE_DIR / "elite_games.parquet",
-    "stockfish": BASE_DIR / "stockfish_games.parquet"
-}
-
-dfs = []
-for label, path in sources.items():
-    if path.exists():
-        df = pd.read_parquet(path)
-        df["source"] = label
-        dfs.append(df)
-    else:
-        print(f"⚠️ Archivo no encontrado: {path}")
+# Cada origen <label> se lee de BASE_DIR/<label>_games.parquet
+SOURCES = ("personal", "novice", "elite", "stockfish")
+
+
+def load_source(path, label, columns=None, sample=0, seed=42):
+    """
+    Reads a source parquet with pyarrow.dataset, batch by batch and only the
+    requested columns, without going through pandas. With sample > 0 only
+    the sampled rows are kept (sampling happens on the Arrow table).
+    """
+    dataset = ds.dataset(path, format="parquet")
+    scanner = dataset.scanner(columns=columns, batch_size=SCAN_BATCH_SIZE)
+    table = pa.Table.from_batches(scanner.to_batches(), schema=scanner.projected_schema)
+
+    if 0 < sample < table.num_rows:
+        rng = np.random.default_rng(seed)
+        table = table.take(np.sort(rng.choice(table.num_rows, sample, replace=False)))
 
-# --- Concatenar y balancear ---
-df_all = pd.concat(dfs, ignore_index=True)
+    return table.append_column("source", pa.array([label] * table.num_rows, pa.string()))
 
-# (Opcional) Balanceo manual
-# df_all = df_all.groupby("source").apply(lambda g: g.sample(n=min(50000, len(g)), random_state=42)).reset_index(drop=True)
+
+def downcast(table):
+    """
+    Narrows the column types before writing: float64 -> float32, int64 ->
+    int32 when every value fits, and the low-cardinality text columns in
+    CATEGORY_COLUMNS -> dictionary (pandas category on read).
+    """
+    fields = []
+    for field in table.schema:
+        column = table[field.name]
+        if pa.types.is_float64(field.type):
+            field = field.with_type(pa.float32())
+        elif pa.types.is_int64(field.type):
+            bounds = pc.min_max(column).as_py()
+            if bounds["min"] is None or (INT32_MIN <= bounds["min"] and bounds["max"] <= INT32_MAX):
+                field = field.with_type(pa.int32())
+        elif field.name in CATEGORY_COLUMNS and pa.types.is_string(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), pa.string()))
+        fields.append(field)
+    # Sin la metadata pandas original: describia los dtypes previos
+    return table.cast(pa.schema(fields))
+
+
+# Un solo listado del directorio en lugar de un exists() por origen
+with os.scandir(BASE_DIR) as entries:
+    available = {entry.name for entry in entries if entry.is_file()}
+
+tables = []
+# Filas por origen: se conocen al cargar, sin value_counts() sobre el combinado
+records_by_source = {}
+for label in SOURCES:
+    file_name = f"{label}_games.parquet"
+    if file_name in available:
+        table = load_source(BASE_DIR / file_name, label, sample=SAMPLE_PER_SOURCE)
+        tables.append(table)
+        records_by_source[label] = table.num_rows
+    else:
+        print(f"⚠️ Archivo no encontrado: {BASE_DIR / file_name}")
+
+# --- Concatenar (el balanceo opcional es SAMPLE_PER_SOURCE) ---
+combined = downcast(pa.concat_tables(tables, promote_options="default"))
 
 # --- Guardar dataset combinado ---
-df_all.to_parquet(BASE_DIR / OUTPUT_FILE, index=False)
+pq.write_table(combined, BASE_DIR / OUTPUT_FILE)
 print(
-    f"✅ Dataset final guardado como {OUTPUT_FILE} con {len(df_all)} partidas.")
+    f"✅ Dataset final guardado como {OUTPUT_FILE} con {combined.num_rows} partidas.")
+for label, count in records_by_source.items():
+    print(f"   - {label}: {count}")
+
+# --- Copia por origen ---
+# Desde la tabla en memoria y en una sola pasada (sin releer el parquet ni
+# filtrar origen por origen); el particionado hive permite leer un origen
+# con filtro source == "<label>" sin escanear el resto
+if WRITE_BY_SOURCE:
+    ds.write_dataset(
+        combined,
+        BASE_DIR / OUTPUT_BY_SOURCE_DIR,
+        format="parquet",
+        partitioning=["source"],
+        partitioning_flavor="hive",
+        existing_data_behavior="delete_matching",
+    )
+    print(f"✅ Copia por origen guardada en {OUTPUT_BY_SOURCE_DIR}/")
@@ -6,7 +6,7 @@ import chess.pgn
 import json
 import io
 from db.tactical_db import save_tactic_to_db
-from db.postgres_utils import execute_postgres_query
+from db.postgres_utils import iter_postgres_query
 import dotenv
 dotenv.load_dotenv()
 
@@ -32,8 +32,10 @@ def generate_elite_exercises(depth=10, multipv=3):
 
     engine = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
 
-    # Get games from PostgreSQL (tags are now in features table)
-    games = execute_postgres_query("SELECT game_id, pgn FROM games")
+    # Get games from PostgreSQL (tags are now in features table).
+    # Streamed with a server-side cursor: we stop after MAX_EXERCISES, so
+    # most of the table never has to leave the server
+    games = iter_postgres_query("SELECT game_id, pgn FROM games", chunksize=100)
 
     exercise_id = 0
     for row in games:
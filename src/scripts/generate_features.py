@@ -6,7 +6,9 @@
 import argparse
 import bz2
 import gzip
+import io
 from importlib import metadata
+import json
 import os
 from pathlib import Path
 import shutil
@@ -16,7 +18,7 @@ import zipfile
 
 from altair import Column
 import pandas as pd
-from sqlalchemy import String, Table, insert, select
+from sqlalchemy import JSON, Integer, String, Table, insert, select
 from modules.pgn_utils import get_game_hash, parse_games_from_orm
 from repository.games_repository import GameRepository
 from sqlalchemy import create_engine, MetaData
@@ -160,6 +162,39 @@ def find_pgn_files(path):
     return pgn_files, temp_dirs
 
 
+def copy_dataframe(conn, df, table_name):
+    """
+    Appends df to table_name with COPY FROM STDIN (CSV) on the raw psycopg2
+    connection behind conn, inside its transaction. Much faster than
+    to_sql(method="multi"), which builds one huge parameterized INSERT.
+    Values are first adapted to the column types of the table: JSON columns
+    (tags) are serialized with json.dumps and integer columns are cast to
+    the nullable Int64 dtype, since a NaN turns them into floats ("12.0")
+    that COPY rejects.
+    """
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    df = df.copy()
+    for column in df.columns:
+        column_type = table.c[column].type
+        if isinstance(column_type, JSON):
+            df[column] = df[column].map(
+                lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v)
+        elif isinstance(column_type, Integer):
+            df[column] = df[column].astype("Int64")
+
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--max-games', required=False, default=100,
@@ -199,43 +234,46 @@ def main():
 
         all_dfs.append(processed_df)
         print(f"🔍 Total games processed: {len(all_dfs)}")
-        print("📊 all_dfs:", all_dfs)
 
-        if all_dfs:
-            final_df = pd.concat(all_dfs, ignore_index=True)
-            print(
-                f"📊 Generated {len(final_df)} rows with {len(final_df.columns)} columns.")
+    if not all_dfs:
+        print("⚠️ No data generated.")
+        return
 
-        # Save to DB (only)
-        with engine.begin() as conn:
-            # Read the IDs of games already processed in the 'features' table
-            features_table = Table(
-                "features", MetaData(), autoload_with=engine)
-            stmt = select(features_table.c.game_id).distinct()
-            result = conn.execute(stmt)
-            existing_ids = set(row[0] for row in result)
+    # A single concat and a single save after the loop: doing both per game
+    # rebuilt the frame with every previous game each time
+    final_df = pd.concat(all_dfs, ignore_index=True)
+    print(
+        f"📊 Generated {len(final_df)} rows with {len(final_df.columns)} columns.")
 
-            print(
-                f"🔍 Loading IDs of already processed games: {len(existing_ids)} IDs found.")
-            print(
-                f"🔍 Filtering already processed games: {len(existing_ids)} games already processed.")
+    # Save to DB (only)
+    with engine.begin() as conn:
+        # Read the IDs of games already processed in the 'features' table
+        features_table = Table(
+            "features", MetaData(), autoload_with=engine)
+        stmt = select(features_table.c.game_id).distinct()
+        result = conn.execute(stmt)
+        existing_ids = set(row[0] for row in result)
+
+        print(
+            f"🔍 Loading IDs of already processed games: {len(existing_ids)} IDs found.")
+        print(
+            f"🔍 Filtering already processed games: {len(existing_ids)} games already processed.")
+
+        print("Columns in final_df:", final_df.columns.tolist())
+        print("First rows:", final_df.head())
 
-            print("Columns in final_df:", final_df.columns.tolist())
-            print("First rows:", final_df.head())
+        new_rows = final_df[~final_df["game_id"].isin(existing_ids)]
 
-            new_rows = final_df[~final_df["game_id"].isin(existing_ids)]
+        print(
+            f"🔍 Filtering already existing rows: {len(new_rows)} new rows to insert. {new_rows}")
 
+        if not new_rows.empty:
+            # Insert the new data with COPY in the same transaction
+            copy_dataframe(conn, new_rows, "features")
             print(
-                f"🔍 Filtering already existing rows: {len(new_rows)} new rows to insert. {new_rows}")
-
-            if not new_rows.empty:
-                # Insert the new data using SQLAlchemy
-                new_rows.to_sql("features", con=engine,
-                                if_exists="append", index=False, method="multi")
-                print(
-                    f"✅ Saved {len(new_rows)} in 'features' table of the database")
-            else:
-                print("⚠️ No data generated. All games are already processed")
+                f"✅ Saved {len(new_rows)} in 'features' table of the database")
+        else:
+            print("⚠️ No data generated. All games are already processed")
 
 
 if __name__ == "__main__":
@@ -21,6 +21,10 @@ Usage Examples:
     # Generate features only for elite games
     python generate_features_parallel.py --source elite_games --max-games 100
 
+    # Write the features to a Parquet file instead of the database
+    # (plus a per-game summary in features_by_game.parquet)
+    python generate_features_parallel.py --max-games 5000 --parquet-out features.parquet
+
 Environment Variables:
     CHESS_TRAINER_DB_URL: PostgreSQL connection URL
     MAX_WORKERS: Number of parallel workers (default: 4)
@@ -35,18 +39,18 @@ Features:
 """
 
 import argparse
-from concurrent.futures import ProcessPoolExecutor
 from importlib import metadata
 from io import StringIO
 import os
 import sys
 import traceback
-import chess
 import chess.pgn
+import pyarrow.parquet as pq
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy.orm import sessionmaker
-from modules.pgn_utils import get_game_id, is_valid_pgn
-from modules.features_generator import generate_features_from_game
+from modules.pgn_utils import get_header_game_id
+from modules.features_generator import (
+    generate_features_batch, generate_features_to_parquet, summarize_features_by_game)
 from db.repository.features_repository import FeaturesRepository
 from db.repository.games_repository import GamesRepository
 from db.repository.processed_feature_repository import ProcessedFeaturesRepository
@@ -70,14 +74,13 @@ def load_processed_hashes():
     try:
         processed_repo = ProcessedFeaturesRepository(
             session_factory=lambda: sessionmaker(bind=engine)())
-        processed_hashes = processed_repo.get_all()
-        return set(processed_hashes)
+        return processed_repo.get_game_ids()
     except Exception as e:
         print(f"❌ Error loading processed hashes: {e}")
         return set()
 
 
-def process_chunk(pgn_list: list[str], max_to_process=None):
+def process_chunk(pgn_list: list[str], max_to_process=None, processed_hashes=None):
     Session = sessionmaker(bind=engine)
     session = Session()
     processed_count = 0
@@ -95,66 +98,59 @@ def process_chunk(pgn_list: list[str], max_to_process=None):
             print("🔍 No games to process in this chunk.")
             return processed_count
 
-        # Load processed hashes at chunk level to reduce database calls
-        processed_hashes = load_processed_hashes()
-
-        for i, pgn_text in enumerate(pgn_list):
+        # main() loads the processed hashes once and passes the same set to
+        # every chunk; they are only read from the database when called alone
+        if processed_hashes is None:
+            processed_hashes = load_processed_hashes()
+        # Games are marked as processed in one bulk insert per chunk;
+        # features inserts ignore duplicates, so a crash mid-chunk only
+        # means those games get processed again
+        processed_ids = []
+
+        # Dedup on the header-only id first: already processed games are
+        # skipped without parsing their moves
+        pending_pgns = []
+        for pgn_text in pgn_list:
             # Stop if we've reached the max limit
-            if max_to_process and processed_count >= max_to_process:
+            if max_to_process and len(pending_pgns) >= max_to_process:
                 print(
                     f"🛑 Reached processing limit of {max_to_process} games in this chunk.")
                 break
 
-            try:
-                valid, parsed_game = is_valid_pgn(pgn_text)
-
-                if not valid:
-                    print(f"❌ Invalid PGN format: {pgn_text[:100]}...")
-                    error_count += 1
-                    continue
-
-                game_id = get_game_id(parsed_game)
-                if game_id in processed_hashes:
-                    print(f"⚠️ Game already processed: {game_id}, skipping.")
-                    skipped_count += 1
-                    continue
-
-                parsed_game = chess.pgn.read_game(StringIO(pgn_text))
-
-                print(
-                    f"🎯 Processing game ID: {game_id} ({processed_count + 1})")
-                white_player = parsed_game.headers.get('White', 'Unknown')
-                black_player = parsed_game.headers.get('Black', 'Unknown')
-                print(f"   {white_player} vs {black_player}")
-
-                features = generate_features_from_game(
-                    parsed_game, game_id=game_id)
-
-                if not isinstance(features, list) or not all(isinstance(f, dict) for f in features):
-                    print(
-                        f"❌ ERROR: generate_features_from_game returned invalid format for {game_id}")
-                    error_count += 1
-                    continue
-
-                if len(features) == 0:
-                    print(f"⚠️ No features generated for game {game_id}")
-                    skipped_count += 1
-                    continue
-
-                print(f"📊 Game {game_id} generated {len(features)} features")
-
-                features_repo.save_many_features(features)
-                processed_features_repo.save_processed_hash(game_id)
-
-                processed_count += 1
-                print(f"✅ Game {game_id} processed and features saved.")
-
-            except Exception as e:
+            headers = chess.pgn.read_headers(StringIO(pgn_text))
+            if headers is None:
+                print(f"❌ Invalid PGN format: {pgn_text[:100]}...")
                 error_count += 1
-                print(f"❌ Error processing game:\n{pgn_text[:100]}...")
-                print(f"🔍 Error details: {e} - {traceback.format_exc()}")
                 continue
 
+            game_id = get_header_game_id(headers)
+            if game_id in processed_hashes:
+                print(f"⚠️ Game already processed: {game_id}, skipping.")
+                skipped_count += 1
+                continue
+            pending_pgns.append(pgn_text)
+
+        if pending_pgns:
+            # The workers parse each PGN and build its features frame
+            print(
+                f"🎯 Generating features for {len(pending_pgns)} games with {MAX_WORKERS} workers...")
+            features_df = generate_features_batch(pending_pgns, workers=MAX_WORKERS)
+            game_ids = features_df["game_id"].unique().tolist() if not features_df.empty else []
+
+            # Games without a header id are only known once parsed
+            processed_ids = [g for g in game_ids if g not in processed_hashes]
+            skipped_count += len(game_ids) - len(processed_ids)
+            # Invalid PGNs and games without features produce no rows
+            error_count += len(pending_pgns) - len(game_ids)
+
+            if processed_ids:
+                features = features_df[features_df["game_id"].isin(processed_ids)]
+                print(f"📊 {len(processed_ids)} games generated {len(features)} features")
+                features_repo.save_many_features(features.to_dict("records"))
+                processed_count = len(processed_ids)
+
+        processed_features_repo.save_many_processed_features(processed_ids)
+        processed_hashes.update(processed_ids)
         session.commit()
         print(
             f"📈 Chunk completed - Processed: {processed_count}, Skipped: {skipped_count}, Errors: {error_count}")
@@ -175,7 +171,7 @@ def chunkify(lst, chunk_size):
         yield lst[i:i + chunk_size]
 
 
-def main(max_games, source=None, start_offset=0):
+def main(max_games, source=None, start_offset=0, parquet_out=None):
     games_repo = GamesRepository()
 
     all_games = []
@@ -232,11 +228,26 @@ def main(max_games, source=None, start_offset=0):
     print(
         f"📊 Total games to process (limited to max_games): {len(all_game_pgns)}")
 
+    if parquet_out:
+        # Export only: rows are streamed to the file in bounded batches and
+        # the games are not marked as processed
+        print(f"💾 Writing features to {parquet_out}...")
+        written = generate_features_to_parquet(all_game_pgns, parquet_out)
+        print(f"✅ Wrote {written} features to {parquet_out}")
+        if written:
+            # Per-game rollup next to the features (lazy Polars scan when installed)
+            summary_out = os.path.splitext(parquet_out)[0] + "_by_game.parquet"
+            summary = summarize_features_by_game(parquet_out)
+            pq.write_table(summary, summary_out, compression="zstd")
+            print(f"✅ Wrote the summary of {summary.num_rows} games to {summary_out}")
+        return
+
     # For precise control with small numbers, always process sequentially
     if max_games <= 50:
         print("🔄 Processing games sequentially for precise control...")
         actual_processed = process_chunk(
-            all_game_pgns, max_to_process=max_games)
+            all_game_pgns, max_to_process=max_games,
+            processed_hashes=processed_hashes)
         print(f"📊 Actually processed: {actual_processed} games")
     else:
         chunks = list(chunkify(all_game_pgns, FEATURES_PER_CHUNK))
@@ -251,7 +262,8 @@ def main(max_games, source=None, start_offset=0):
 
             print(f"⏳ Processing chunk {i}/{len(chunks)}...")
             chunk_processed = process_chunk(
-                chunk, max_to_process=remaining_to_process)
+                chunk, max_to_process=remaining_to_process,
+                processed_hashes=processed_hashes)
             total_processed += chunk_processed
             print(
                 f"✅ Completed chunk {i}/{len(chunks)} - Processed: {chunk_processed} (Total: {total_processed})")
@@ -325,6 +337,8 @@ if __name__ == "__main__":
                         help='Starting offset for game pagination (optional, for batch processing)')
     parser.add_argument('--all-sources', action='store_true',
                         help='Process all sources sequentially in batches of 10,000 games each')
+    parser.add_argument('--parquet-out', required=False, default=None, type=str,
+                        help='Write the features to this Parquet file instead of the database (optional)')
     args = parser.parse_args()
 
     try:
@@ -345,7 +359,8 @@ if __name__ == "__main__":
             print(f"   - Features per chunk: {FEATURES_PER_CHUNK}")
 
             main(max_games=args.max_games,
-                 source=args.source, start_offset=args.offset)
+                 source=args.source, start_offset=args.offset,
+                 parquet_out=args.parquet_out)
     except Exception as e:
         print(f"❌ Error during import: {e}")
         if e.__cause__:
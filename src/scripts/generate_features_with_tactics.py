@@ -37,8 +37,6 @@ import time
 import traceback
 import logging
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -46,6 +44,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from modules.features_generator import generate_features_from_game
 from modules.analyze_games_tactics import detect_tactics_from_game
 from modules.pgn_utils import get_game_id, pgn_str_to_game
+from db.session import SessionLocal
 from db.repository.features_repository import FeaturesRepository
 from db.repository.games_repository import GamesRepository
 from db.repository.analyzed_tacticals_repository import Analyzed_tacticalsRepository
@@ -103,8 +102,9 @@ def process_game_with_tactics(game_data):
 
 def process_chunk(games_chunk):
     """Process a chunk of games in parallel."""
-    Session = sessionmaker(bind=create_engine(DB_URL))
-    session = Session()
+    # Sesión del engine compartido del proceso: sin crear un engine
+    # (y su pool de conexiones) nuevo en cada llamada
+    session = SessionLocal()
     
     processed_count = 0
     error_count = 0
@@ -175,15 +175,16 @@ def process_chunk(games_chunk):
 
 def get_games_to_process(source=None, max_games=1000, offset=0):
     """Get games from database that need processing."""
-    Session = sessionmaker(bind=create_engine(DB_URL))
-    session = Session()
+    # Sesión del engine compartido del proceso: sin crear un engine
+    # (y su pool de conexiones) nuevo en cada llamada
+    session = SessionLocal()
     
     try:
         games_repo = GamesRepository(session_factory=lambda: session)
         processed_repo = ProcessedFeaturesRepository(session_factory=lambda: session)
         
         # Get processed game IDs to skip
-        processed_ids = set(processed_repo.get_all())
+        processed_ids = processed_repo.get_game_ids()
         logger.info(f"📊 Found {len(processed_ids)} already processed games")
         
         # Get games from database
@@ -3,7 +3,7 @@ import traceback
 from pathlib import Path
 import chess
 from dotenv import load_dotenv
-from modules.pgn_batch_loader import extract_pgn_files, extract_features_from_game
+from modules.pgn_batch_loader import extract_pgn_files, extract_features_from_game_obj
 from db.repository.games_repository import GamesRepository
 from sqlalchemy.orm import sessionmaker
 
@@ -12,6 +12,7 @@ DB_PATH_URL = os.environ.get("CHESS_TRAINER_DB_URL")
 BASE_DIR = Path(os.environ.get("PGN_PATH"))
 SOURCES = ["personal", "novice", "elite", "stockfish", "fide"]
 BLOCK_SIZE = 1000
+INSERT_BATCH_SIZE = 1000
 
 # Recoge todos los archivos válidos por fuente
 
@@ -63,36 +64,41 @@ def import_balanced_games():
             print(f"📦 Procesando archivo {file_path.name} de fuente {source}")
 
             imported = 0
+            pending = []
             try:
                 for filename, pgn_io in extract_pgn_files(str(file_path)):
-                    while True:
+                    while imported < BLOCK_SIZE:
                         game = chess.pgn.read_game(pgn_io)
                         if game is None:
                             break
 
-                        pgn_str = str(game)
-                        game_data = extract_features_from_game(pgn_str)
+                        game_data = extract_features_from_game_obj(game)
                         game_data["source"] = source
 
                         print(
                             f"🔍 Procesando partida: {game_data['game_id']}, source: {game_data['source']}, pgn: {game_data['pgn'][:50]}...")
 
-                        if not repo.game_exists(game_data["game_id"]):
-                            repo.save_game(game_data)
-                            imported += 1
-                            total_imported += 1
-                        else:
-                            print(
-                                f"⚠️ Partida ya existe: {game_data['game_id']} - {game_data['pgn'][:50]}...")
-
-                        if imported >= BLOCK_SIZE:
-                            break
+                        pending.append(game_data)
+                        # Nunca más pendientes que lo que falta para la cuota
+                        # del bloque: con duplicados, imported no la supera
+                        if len(pending) >= min(INSERT_BATCH_SIZE, BLOCK_SIZE - imported):
+                            imported += repo.save_games_bulk(pending)
+                            pending = []
                     pgn_io.close()
                     if imported >= BLOCK_SIZE:
                         break
             except Exception as e:
                 print(
                     f"❌ Error procesando {file_path}: {e}\n{traceback.format_exc()}")
+            finally:
+                # Las partidas ya parseadas se guardan aunque el archivo falle
+                if pending:
+                    try:
+                        imported += repo.save_games_bulk(pending)
+                    except Exception as e:
+                        print(
+                            f"❌ Error guardando partidas pendientes de {file_path}: {e}")
+            total_imported += imported
 
             print(
                 f"✅ {imported} partidas importadas de {source} (archivo {file_path.name})")
@@ -2,10 +2,13 @@ import sqlite3
 import os
 from dotenv import load_dotenv
 
+from db.database import check_connection
 from db.db_utils import DBUtils
 
 
 def main():
+    if not check_connection():
+        exit(1)
     try:
         db = DBUtils()
         load_dotenv()
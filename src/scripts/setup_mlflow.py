@@ -8,6 +8,16 @@ import sys
 sys.path.append('/chess_trainer/src')
 
 import logging
+
+# Backend Go opcional para el tracking server (pip install mlflow-go-backend).
+# Requiere un tracking URI de base de datos (sqlite:///mlflow.db o postgresql://...);
+# debe habilitarse antes de construir ChessMLflowTracker.
+try:
+    import mlflow_go_backend
+    mlflow_go_backend.enable_go()
+except ImportError:
+    mlflow_go_backend = None
+
 from ml.mlflow_utils import ChessMLflowTracker
 
 # Configurar logging
@@ -147,6 +157,8 @@ if __name__ == "__main__":
     try:
         import mlflow
         print(f"✅ MLflow instalado: versión {mlflow.__version__}")
+        if mlflow_go_backend is not None:
+            print("✅ Backend Go de MLflow habilitado")
     except ImportError:
         print("❌ MLflow no está instalado")
         print("💡 Instalar con: pip install mlflow[extras]")
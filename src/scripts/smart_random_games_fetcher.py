@@ -48,10 +48,11 @@ from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, asdict
 import logging
-import hashlib
 import chess.pgn
 from io import StringIO
 
+from modules.pgn_utils import get_game_id
+
 # Import our smart user helper
 from smart_user_helper import SmartUserDiscovery, Platform, SkillLevel, GameType, UserProfile
 
@@ -135,9 +136,12 @@ class SmartGamesFetcher:
             logger.warning(
                 f"⚠️ Could not load existing games from database: {e}")
 
-    def _generate_game_id(self, pgn_text: str) -> str:
-        """Generate a unique game ID from PGN content."""
-        return hashlib.sha256(pgn_text.encode('utf-8')).hexdigest()
+    def _generate_game_id(self, game: chess.pgn.Game) -> str:
+        """
+        Generate the game ID the same way the import pipeline does, so it can
+        be checked against the IDs already stored in the games table.
+        """
+        return get_game_id(game)
 
     def _make_request_with_retry(self, url: str, params: Dict = None, max_retries: int = 3) -> Optional[requests.Response]:
         """Make HTTP request with retry logic and rate limiting."""
@@ -189,6 +193,12 @@ class SmartGamesFetcher:
 
             headers = game.headers
 
+            # Generate game ID (from the headers when they identify the game,
+            # without hashing the whole PGN) and skip known games early
+            game_id = self._generate_game_id(game)
+            if game_id in self.known_game_ids:
+                return None
+
             # Count moves
             moves_count = len(list(game.mainline_moves()))
             if moves_count < MIN_MOVES:
@@ -214,13 +224,6 @@ class SmartGamesFetcher:
             game_type, formatted_time_control = self._parse_time_control(
                 time_control)
 
-            # Generate game ID
-            game_id = self._generate_game_id(pgn_text)
-
-            # Skip if already known
-            if game_id in self.known_game_ids:
-                return None
-
             # Create metadata
             metadata = GameMetadata(
                 game_id=game_id,
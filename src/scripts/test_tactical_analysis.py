@@ -36,12 +36,11 @@ import json
 import csv
 from datetime import datetime
 import logging
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from db.session import SessionLocal
 from db.repository.games_repository import GamesRepository
 from db.repository.analyzed_tacticals_repository import Analyzed_tacticalsRepository
 from db.repository.features_repository import FeaturesRepository
@@ -66,8 +65,9 @@ logger = logging.getLogger(__name__)
 
 def get_analysis_coverage(source=None):
     """Get tactical analysis coverage statistics."""
-    Session = sessionmaker(bind=create_engine(DB_URL))
-    session = Session()
+    # Sesión del engine compartido del proceso: sin crear un engine
+    # (y su pool de conexiones) nuevo en cada llamada
+    session = SessionLocal()
     
     try:
         games_repo = GamesRepository(session_factory=lambda: session)
@@ -104,8 +104,9 @@ def get_analysis_coverage(source=None):
 
 def get_tactical_patterns_breakdown(source=None):
     """Get breakdown of tactical patterns found."""
-    Session = sessionmaker(bind=create_engine(DB_URL))
-    session = Session()
+    # Sesión del engine compartido del proceso: sin crear un engine
+    # (y su pool de conexiones) nuevo en cada llamada
+    session = SessionLocal()
     
     try:
         tactics_repo = Analyzed_tacticalsRepository(session_factory=lambda: session)
@@ -145,8 +146,9 @@ def get_tactical_patterns_breakdown(source=None):
 
 def test_analysis_quality(source=None, sample_size=100):
     """Test the quality of tactical analysis on a sample of games."""
-    Session = sessionmaker(bind=create_engine(DB_URL))
-    session = Session()
+    # Sesión del engine compartido del proceso: sin crear un engine
+    # (y su pool de conexiones) nuevo en cada llamada
+    session = SessionLocal()
     
     try:
         games_repo = GamesRepository(session_factory=lambda: session)
@@ -1,9 +1,13 @@
 
+import hashlib
+import os
+
+import joblib
 import pandas as pd
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
@@ -45,34 +49,82 @@ class TacticPhaseModel(tf.keras.Model):
         x = self.dense2(x)
         return self.output_layer(x)
 
+# --- Cache de preprocesamiento ---
+DATASET_PATH = "training_dataset.parquet"
+PREPROC_CACHE_DIR = ".cache"
+# Subir al cambiar lo que se guarda en la caché: v2 = (le_phase, le_color, (X_mean, X_std))
+PREPROC_CACHE_VERSION = 2
+
+features = ["branching_factor", "self_mobility", "opponent_mobility",
+            "is_low_mobility", "material_total", "num_pieces",
+            "has_castling_rights", "is_center_controlled", "is_pawn_endgame",
+            "is_repetition", "threatens_mate", "is_forced_move",
+            "is_tactical_sequence", "standardized_elo", "color_id"]
+
+
+def dataset_cache_key(path, head_bytes=1 << 20):
+    """
+    Cheap dataset fingerprint: hash of the first MB, the Parquet footer
+    (schema and row-group statistics, so it changes whenever the data past
+    the first MB does), the file size and its mtime.
+    """
+    h = hashlib.sha256()
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        h.update(f.read(head_bytes))
+        # Un Parquet termina en <metadatos><longitud: 4 bytes LE>"PAR1"
+        if stat.st_size >= 8:
+            f.seek(-8, os.SEEK_END)
+            tail = f.read(8)
+            footer_len = int.from_bytes(tail[:4], "little")
+            if tail[4:] == b"PAR1" and footer_len + 8 <= stat.st_size:
+                f.seek(-(footer_len + 8), os.SEEK_END)
+                h.update(f.read(footer_len))
+    h.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
 # --- Carga y preprocesamiento ---
-df = pd.read_parquet("training_dataset.parquet")
+df = pd.read_parquet(DATASET_PATH)
 df = df.dropna(subset=["error_label", "phase", "player_color", "standardized_elo"])
 
-le_phase = LabelEncoder()
-df["phase_id"] = le_phase.fit_transform(df["phase"])
+features_key = hashlib.sha256(",".join(features).encode()).hexdigest()[:16]
+preproc_path = os.path.join(
+    PREPROC_CACHE_DIR,
+    f"preproc_v{PREPROC_CACHE_VERSION}_{dataset_cache_key(DATASET_PATH)}_{features_key}.joblib")
+preproc_cached = os.path.exists(preproc_path)
 
-le_color = LabelEncoder()
-df["color_id"] = le_color.fit_transform(df["player_color"])
+if preproc_cached:
+    # Encoders y estadisticas ya ajustados para este dataset: solo transform
+    le_phase, le_color, (X_mean, X_std) = joblib.load(preproc_path)
+    df["phase_id"] = le_phase.transform(df["phase"])
+    df["color_id"] = le_color.transform(df["player_color"])
+else:
+    le_phase = LabelEncoder()
+    df["phase_id"] = le_phase.fit_transform(df["phase"])
+
+    le_color = LabelEncoder()
+    df["color_id"] = le_color.fit_transform(df["player_color"])
 
 elo_bins = [0, 1200, 1400, 1600, 1800, 2000, 2200, 2400, 3000]
 df["elo_bin_id"] = pd.cut(df["standardized_elo"], bins=elo_bins, labels=False)
 df = df.dropna(subset=["elo_bin_id"])
 df["elo_bin_id"] = df["elo_bin_id"].astype(int)
 
-features = ["branching_factor", "self_mobility", "opponent_mobility",
-            "is_low_mobility", "material_total", "num_pieces",
-            "has_castling_rights", "is_center_controlled", "is_pawn_endgame",
-            "is_repetition", "threatens_mate", "is_forced_move",
-            "is_tactical_sequence", "standardized_elo", "color_id"]
-
-X = df[features]
+# float32 desde el inicio: evita la copia float64 -> float32 al entrar en TF
+X = df[features].to_numpy(dtype=np.float32)
 y = df["error_label"]
 phase_ids = df["phase_id"]
 elo_ids = df["elo_bin_id"]
 
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+if not preproc_cached:
+    X_mean = X.mean(axis=0)
+    X_std = X.std(axis=0)
+    X_std[X_std == 0] = 1
+    os.makedirs(PREPROC_CACHE_DIR, exist_ok=True)
+    joblib.dump((le_phase, le_color, (X_mean, X_std)), preproc_path)
+
+X_scaled = (X - X_mean) / X_std
 
 X_train, X_test, y_train, y_test, phase_train, phase_test, elo_train, elo_test = train_test_split(
     X_scaled, y, phase_ids, elo_ids, test_size=0.2, random_state=42
@@ -95,7 +147,24 @@ model.fit(
 )
 
 # --- Evaluación ---
-y_pred = model.predict((X_test, phase_test, elo_test))
+# Inferencia compilada con firma fija: evita el overhead por batch de Model.predict
+@tf.function(
+    input_signature=[(
+        tf.TensorSpec([None, len(features)], tf.float32),
+        tf.TensorSpec([None], tf.int32),
+        tf.TensorSpec([None], tf.int32),
+    )],
+    jit_compile=True,
+)
+def predict_compiled(inputs):
+    return model(inputs, training=False)
+
+
+y_pred = predict_compiled((
+    X_test,
+    phase_test.to_numpy(dtype=np.int32),
+    elo_test.to_numpy(dtype=np.int32),
+)).numpy()
 y_pred_bin = (y_pred > 0.5).astype(int)
 print(classification_report(y_test, y_pred_bin))
 sns.heatmap(confusion_matrix(y_test, y_pred_bin), annot=True)
@@ -7,39 +7,55 @@ import pandas as pd
 import numpy as np
 import mlflow
 import mlflow.sklearn
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import os
 
+# "hist_gb" (default) or "random_forest" to compare against the old model
+MODEL_TYPE = os.environ.get("SIMPLE_ML_MODEL", "hist_gb")
+
+FEATURE_COLS = [
+    'move_number', 'material_balance', 'material_total', 'branching_factor',
+    'self_mobility', 'opponent_mobility', 'score_diff', 'num_pieces',
+    'white_elo', 'black_elo',
+    # TACTICAL FEATURES (las que probamos)
+    'depth_score_diff', 'threatens_mate', 'is_forced_move',
+]
+ERROR_LABELS = ['good', 'inaccuracy', 'mistake', 'blunder']
+
+
 def create_test_data():
-    """Create sample chess data for testing"""
-    np.random.seed(42)
+    """
+    Create sample chess data for testing: one contiguous float32 matrix with
+    a column per FEATURE_COLS entry, plus the error_label target.
+    """
+    rng = np.random.default_rng(42)
     n_samples = 1000
-    
-    # Base features including tactical ones
-    data = {
-        'move_number': np.random.randint(1, 40, n_samples),
-        'material_balance': np.random.normal(0, 200, n_samples),
-        'material_total': np.random.normal(2000, 500, n_samples),
-        'branching_factor': np.random.randint(5, 50, n_samples),
-        'self_mobility': np.random.randint(0, 40, n_samples),
-        'opponent_mobility': np.random.randint(0, 40, n_samples),
-        'score_diff': np.random.normal(0, 100, n_samples),
-        'num_pieces': np.random.randint(8, 32, n_samples),
-        'white_elo': np.random.normal(1600, 300, n_samples),
-        'black_elo': np.random.normal(1600, 300, n_samples),
-        
-        # TACTICAL FEATURES (las que probamos)
-        'depth_score_diff': np.random.normal(0, 150, n_samples),
-        'threatens_mate': np.random.choice([0, 1], n_samples, p=[0.9, 0.1]),
-        'is_forced_move': np.random.choice([0, 1], n_samples, p=[0.85, 0.15]),
-        
-        # Target variable
-        'error_label': np.random.choice(['good', 'inaccuracy', 'mistake', 'blunder'], n_samples)
-    }
-    
-    return pd.DataFrame(data)
+    col = {name: i for i, name in enumerate(FEATURE_COLS)}
+
+    X = rng.standard_normal((n_samples, len(FEATURE_COLS)), dtype=np.float32)
+    # Normal columns: scale and shift in place
+    for name, mean, std in [('material_balance', 0, 200), ('material_total', 2000, 500),
+                            ('score_diff', 0, 100), ('white_elo', 1600, 300),
+                            ('black_elo', 1600, 300), ('depth_score_diff', 0, 150)]:
+        X[:, col[name]] *= std
+        X[:, col[name]] += mean
+    # Integer columns
+    for name, low, high in [('move_number', 1, 40), ('branching_factor', 5, 50),
+                            ('self_mobility', 0, 40), ('opponent_mobility', 0, 40),
+                            ('num_pieces', 8, 32)]:
+        X[:, col[name]] = rng.integers(low, high, n_samples)
+    # Binary columns
+    X[:, col['threatens_mate']] = rng.random(n_samples) < 0.1
+    X[:, col['is_forced_move']] = rng.random(n_samples) < 0.15
+
+    # Target variable
+    y = pd.Categorical.from_codes(
+        rng.integers(0, len(ERROR_LABELS), n_samples), categories=ERROR_LABELS)
+
+    return X, y
 
 def main():
     print("🚀 Simple ML Test with MLflow")
@@ -59,18 +75,14 @@ def main():
     
     mlflow.set_experiment(experiment_name)
     
-    # Create test data
-    df = create_test_data()
-    print(f"📊 Created test data: {len(df)} rows, {len(df.columns)} columns")
+    # Create test data (features already come as a single float32 matrix)
+    X, y = create_test_data()
+    feature_cols = FEATURE_COLS
+    print(f"📊 Created test data: {len(X)} rows, {len(feature_cols) + 1} columns")
     
     # Check tactical features
     tactical_features = ['depth_score_diff', 'threatens_mate', 'is_forced_move']
-    print(f"🎯 Tactical features: {[f for f in tactical_features if f in df.columns]}")
-    
-    # Prepare features and target
-    feature_cols = [col for col in df.columns if col != 'error_label']
-    X = df[feature_cols]
-    y = df['error_label']
+    print(f"🎯 Tactical features: {[f for f in tactical_features if f in feature_cols]}")
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -79,12 +91,16 @@ def main():
     # Start MLflow experiment
     with mlflow.start_run(run_name="Chess_Tactical_Test"):
         # Log parameters
-        mlflow.log_param("n_samples", len(df))
+        mlflow.log_param("n_samples", len(X))
         mlflow.log_param("n_features", len(feature_cols))
         mlflow.log_param("tactical_features", tactical_features)
+        mlflow.log_param("model_type", MODEL_TYPE)
         
-        # Train model
-        model = RandomForestClassifier(n_estimators=50, random_state=42)
+        # Train model (both use every core)
+        if MODEL_TYPE == "random_forest":
+            model = RandomForestClassifier(n_estimators=50, random_state=42, n_jobs=-1)
+        else:
+            model = HistGradientBoostingClassifier(max_iter=50, random_state=42)
         model.fit(X_train, y_train)
         
         # Make predictions
@@ -103,20 +119,25 @@ def main():
         print(f"📊 Accuracy: {accuracy:.3f}")
         print(f"🎯 Features used: {len(feature_cols)} (including {len(tactical_features)} tactical)")
         
-        # Feature importance (focusing on tactical features)
-        feature_importance = model.feature_importances_
-        feature_names = feature_cols
-        
-        tactical_importance = {}
-        for feature in tactical_features:
-            if feature in feature_names:
-                idx = feature_names.index(feature)
-                tactical_importance[feature] = feature_importance[idx]
+        # Feature importance (focusing on tactical features);
+        # HistGradientBoosting has no impurity importances, so use permutation
+        if hasattr(model, "feature_importances_"):
+            feature_importance = model.feature_importances_
+        else:
+            feature_importance = permutation_importance(
+                model, X_test, y_test, n_repeats=5, random_state=42, n_jobs=-1
+            ).importances_mean
+        name_to_idx = {name: i for i, name in enumerate(feature_cols)}
+        tactical_importance = {
+            feature: float(feature_importance[name_to_idx[feature]])
+            for feature in tactical_features if feature in name_to_idx
+        }
         
         print("\n🎯 Tactical Feature Importance:")
         for feature, importance in tactical_importance.items():
             print(f"   {feature}: {importance:.4f}")
-            mlflow.log_metric(f"importance_{feature}", importance)
+        mlflow.log_metrics(
+            {f"importance_{feature}": importance for feature, importance in tactical_importance.items()})
         
         # Log run info
         run = mlflow.active_run()
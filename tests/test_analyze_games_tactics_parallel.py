@@ -69,11 +69,11 @@ def mock_repositories():
     features_repo = Mock()
     games_repo = Mock()
 
-    # Mock the get_all method to return some analyzed games
-    analyzed_tacticals_repo.get_all.return_value = [
-        Mock(game_id="analyzed_game_1"),
-        Mock(game_id="analyzed_game_2")
-    ]
+    # Mock the get_game_ids method to return some analyzed games
+    analyzed_tacticals_repo.get_game_ids.return_value = {
+        "analyzed_game_1",
+        "analyzed_game_2"
+    }
 
     return analyzed_tacticals_repo, features_repo, games_repo
 
@@ -120,7 +120,7 @@ class TestRunParallelAnalysisFromDb:
         mock_games_repo_class.return_value = mock_games_repo
 
         # Mock analyzed games (empty set)
-        mock_analyzed_repo.get_all.return_value = []
+        mock_analyzed_repo.get_game_ids.return_value = set()
 
         # Mock games data
         mock_games_repo.get_games_by_pagination_not_analyzed.side_effect = [
@@ -157,10 +157,11 @@ class TestRunParallelAnalysisFromDb:
             run_parallel_analysis_from_db(max_games=10)
 
             # Verify repository calls
-            mock_analyzed_repo.get_all.assert_called_once()
+            mock_analyzed_repo.get_game_ids.assert_called_once()
             assert mock_games_repo.get_games_by_pagination_not_analyzed.call_count >= 1
             mock_features_repo.update_features_tags_and_score_diff.assert_called_once()
-            mock_analyzed_repo.save_analyzed_tactical_hash.assert_called()
+            mock_analyzed_repo.save_analyzed_tactical_hashes.assert_called_once_with(
+                ["game_id_1", "game_id_2"])
 
     @patch('scripts.analyze_games_tactics_parallel.Analyzed_tacticalsRepository')
     @patch('scripts.analyze_games_tactics_parallel.FeaturesRepository')
@@ -183,7 +184,7 @@ class TestRunParallelAnalysisFromDb:
         mock_games_repo_class.return_value = mock_games_repo
 
         # Mock no analyzed games
-        mock_analyzed_repo.get_all.return_value = []
+        mock_analyzed_repo.get_game_ids.return_value = set()
 
         # Mock no games available
         mock_games_repo.get_games_by_pagination_not_analyzed.return_value = []
@@ -224,7 +225,7 @@ class TestRunParallelAnalysisFromDb:
         mock_games_repo_class.return_value = mock_games_repo
 
         # Mock analyzed games
-        mock_analyzed_repo.get_all.return_value = []
+        mock_analyzed_repo.get_game_ids.return_value = set()
 
         # Mock games data
         mock_games_repo.get_games_by_pagination_not_analyzed.side_effect = [
@@ -262,8 +263,8 @@ class TestRunParallelAnalysisFromDb:
 
             # Verify rollback was called
             mock_features_repo.session.rollback.assert_called_once()
-            mock_analyzed_repo.save_analyzed_tactical_hash.assert_called_with(
-                "game_id_1")
+            mock_analyzed_repo.save_analyzed_tactical_hashes.assert_called_with(
+                ["game_id_1"])
 
 
 class TestAnalyzeGameParallel:
@@ -319,7 +320,8 @@ class TestAnalyzeGameParallel:
         # Verify function calls
         mock_games_repo.get_pgn_text_by_id.assert_called_once_with(game_id)
         mock_read_game.assert_called_once()
-        mock_detect_tactics.assert_called_once_with(sample_pgn_game, 8)
+        mock_detect_tactics.assert_called_once_with(
+            sample_pgn_game, 8, engine=None)
 
     @patch('scripts.analyze_games_tactics_parallel.GamesRepository')
     @patch('scripts.analyze_games_tactics_parallel.Analyzed_tacticalsRepository')
@@ -540,7 +542,7 @@ def test_max_games_parameter(max_games, expected_calls, mock_env_vars):
         mock_games_repo_class.return_value = mock_games_repo
 
         # Mock no analyzed games
-        mock_analyzed_repo.get_all.return_value = []
+        mock_analyzed_repo.get_game_ids.return_value = set()
 
         # Mock games data based on max_games
         if max_games > 0:
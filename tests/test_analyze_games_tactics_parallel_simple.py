@@ -257,7 +257,7 @@ class TestRunParallelAnalysisFromDbFunction:
         mock_games_repo_class.return_value = mock_games_repo
 
         # Setup no analyzed games initially
-        mock_analyzed_repo.get_all.return_value = []
+        mock_analyzed_repo.get_game_ids.return_value = set()
 
         # Setup no games to analyze
         mock_games_repo.get_games_by_pagination_not_analyzed.return_value = []
@@ -291,12 +291,8 @@ class TestRunParallelAnalysisFromDbFunction:
         mock_games_repo_class.return_value = mock_games_repo
 
         # Setup some already analyzed games
-        analyzed_game_1 = Mock()
-        analyzed_game_1.game_id = "already_analyzed_1"
-        analyzed_game_2 = Mock()
-        analyzed_game_2.game_id = "already_analyzed_2"
-        mock_analyzed_repo.get_all.return_value = [
-            analyzed_game_1, analyzed_game_2]
+        mock_analyzed_repo.get_game_ids.return_value = {
+            "already_analyzed_1", "already_analyzed_2"}
 
         # Setup no new games to analyze
         mock_games_repo.get_games_by_pagination_not_analyzed.return_value = []
@@ -305,7 +301,7 @@ class TestRunParallelAnalysisFromDbFunction:
         run_parallel_analysis_from_db(max_games=10)
 
         # Verify that analyzed games were properly excluded
-        mock_analyzed_repo.get_all.assert_called_once()
+        mock_analyzed_repo.get_game_ids.assert_called_once()
         call_args = mock_games_repo.get_games_by_pagination_not_analyzed.call_args
         # First positional argument should be the analyzed set
         analyzed_set = call_args[0][0]
@@ -0,0 +1,162 @@
+from modules.feature_engineering import (
+    add_score_labels,
+    is_center_controlled,
+    is_pawn_endgame,
+    score_to_label,
+)
+from modules.features_generator import (
+    extract_features_from_position,
+    generate_features_frame,
+    generate_features_from_game,
+    generate_features_to_parquet,
+    summarize_features_by_game,
+)
+import io
+import pandas as pd
+import chess.pgn
+import pytest
+import sys
+sys.path.insert(0, '/app/src')
+
+simple_pgn = """[Event "Test"]
+[Site "https://lichess.org/abcdefgh"]
+[Date "2023.01.01"]
+[Round "-"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0"""
+
+
+@pytest.fixture
+def game():
+    return chess.pgn.read_game(io.StringIO(simple_pgn))
+
+
+def test_generate_features_from_game_rows(game):
+    rows = generate_features_from_game(game, game_id="g1")
+    assert len(rows) == 7
+    first = rows[0]
+    assert first["move_uci"] == "e2e4"
+    assert first["material_balance"] == 0
+    assert first["material_total"] == 78
+    assert first["num_pieces"] == 14
+    assert first["self_mobility"] == 20
+    assert first["opponent_mobility"] == 20
+    assert first["phase"] == "opening"
+    assert all(row["game_id"] == "g1" and row["num_moves"] == 4 for row in rows)
+
+
+def test_generate_features_frame_matches_rows(game):
+    rows = generate_features_from_game(game, game_id="g1")
+    df = generate_features_frame(game, game_id="g1")
+    assert len(df) == len(rows)
+    for column in ("move_uci", "material_balance", "self_mobility",
+                   "opponent_mobility", "is_pawn_endgame", "num_moves"):
+        assert df[column].tolist() == [row[column] for row in rows]
+
+
+def test_generate_features_rejects_invalid_fen(game):
+    game.headers["SetUp"] = "1"
+    game.headers["FEN"] = "not a fen"
+    assert generate_features_from_game(game) == []
+    assert generate_features_frame(game).empty
+
+
+def test_generate_features_without_san(game):
+    rows = generate_features_from_game(game, game_id="g1", compute_san=False)
+    assert all(row["move_san"] is None for row in rows)
+    assert rows[0]["move_uci"] == "e2e4"
+
+
+def test_transposed_positions_share_cached_features():
+    board_a = chess.Board()
+    for san in ("Nf3", "Nf6", "Nc3"):
+        board_a.push_san(san)
+    board_b = chess.Board()
+    for san in ("Nc3", "Nf6", "Nf3"):
+        board_b.push_san(san)
+
+    move = chess.Move.from_uci("e7e5")
+    features_a = extract_features_from_position(board_a, move)
+    features_b = extract_features_from_position(board_b, move)
+    features_a["self_mobility"] = -1  # rows are independent copies
+    assert features_b["self_mobility"] != -1
+    for column in ("material_balance", "num_pieces", "phase",
+                   "opponent_mobility", "move_number"):
+        assert features_a[column] == features_b[column]
+    assert board_a.fen() == board_b.fen()
+
+
+@pytest.mark.parametrize("fen, expected", [
+    (chess.STARTING_FEN, 0),
+    ("8/5k2/4p3/3pP3/3P4/8/5K2/8 w - - 0 1", 1),
+    ("8/5k2/4p3/3pP3/3P4/8/5K2/7R w - - 0 1", 0),
+])
+def test_is_pawn_endgame(fen, expected):
+    assert is_pawn_endgame(chess.Board(fen)) == expected
+
+
+def test_is_center_controlled():
+    board = chess.Board()
+    assert not is_center_controlled(board, chess.WHITE)
+    board.push_san("e4")
+    board.push_san("a6")
+    board.push_san("d4")
+    # e4/d4 pawns attack d5 and e5; the d1 queen defends d4
+    assert is_center_controlled(board, chess.WHITE)
+
+
+def test_generate_features_to_parquet(tmp_path):
+    out_path = tmp_path / "features.parquet"
+    written = generate_features_to_parquet(
+        [simple_pgn, simple_pgn, "not a pgn"], out_path, batch_size=10)
+    df = pd.read_parquet(out_path)
+    assert written == len(df) == 14
+    assert df["move_uci"].iloc[0] == "e2e4"
+
+
+def test_repetition_counted_incrementally():
+    pgn = """[Event "Test"]
+[Site "?"]
+[Date "2023.01.01"]
+[Round "-"]
+[White "A"]
+[Black "B"]
+[Result "*"]
+
+1. Nf3 Nf6 2. Ng1 Ng8 3. Nf3 Nf6 4. Ng1 Ng8 5. Nf3 *"""
+    game = chess.pgn.read_game(io.StringIO(pgn))
+    rows = generate_features_from_game(game, game_id="rep")
+    # The starting position occurs for the third time before 5. Nf3
+    assert [row["is_repetition"] for row in rows] == [0] * 8 + [1]
+
+
+def test_summarize_features_by_game(game):
+    frame = pd.concat([
+        generate_features_frame(game, game_id="a"),
+        generate_features_frame(game, game_id="b").iloc[:3],
+    ], ignore_index=True)
+    summary = summarize_features_by_game(frame).to_pandas().set_index("game_id")
+    expected = frame.groupby("game_id")["material_balance"].agg(["mean", "std"])
+    assert summary.loc["a", "move_number_max"] == frame.loc[frame.game_id == "a", "move_number"].max()
+    assert summary.loc["b", "material_total_min"] == frame.loc[frame.game_id == "b", "material_total"].min()
+    assert summary["material_balance_mean"].tolist() == pytest.approx(expected["mean"].tolist())
+    assert summary["material_balance_stddev"].tolist() == pytest.approx(expected["std"].tolist())
+
+
+def test_summarize_features_by_game_from_parquet(tmp_path):
+    out_path = tmp_path / "features.parquet"
+    generate_features_to_parquet([simple_pgn], out_path)
+    summary = summarize_features_by_game(out_path).to_pandas()
+    frame = pd.read_parquet(out_path)
+    assert len(summary) == 1
+    assert summary["move_number_max"].iloc[0] == frame["move_number"].max()
+    assert summary["num_pieces_min"].iloc[0] == frame["num_pieces"].min()
+
+
+def test_add_score_labels_matches_score_to_label():
+    scores = [-500, -200, -150, -100, -75, -50, 0, 120, float("nan")]
+    df = add_score_labels(pd.DataFrame({"score_diff": scores}))
+    assert df["score_label"].tolist() == [score_to_label(s) for s in scores]
@@ -126,59 +126,51 @@ class TestGenerateFeaturesPipeline:
     @patch('scripts.generate_features_parallel.ProcessedFeaturesRepository')
     def test_load_processed_hashes(self, mock_processed_repo):
         """Test loading processed game hashes."""
-        # Mock the repository to return sample processed features
+        # Mock the repository to return sample processed game ids
         mock_instance = Mock()
         mock_processed_repo.return_value = mock_instance
-
-        mock_processed_features = [
-            Mock(game_id="hash1"),
-            Mock(game_id="hash2"),
-            Mock(game_id="hash3")
-        ]
-        mock_instance.get_all.return_value = mock_processed_features
+        mock_instance.get_game_ids.return_value = {"hash1", "hash2", "hash3"}
 
         processed_hashes = load_processed_hashes()
 
-        # The function returns set(processed_hashes) which creates a set of objects, not game_ids
-        # So we need to check that it's a set and has the right length
         assert isinstance(processed_hashes, set)
-        assert len(processed_hashes) == 3
-        mock_instance.get_all.assert_called_once()
+        assert processed_hashes == {"hash1", "hash2", "hash3"}
+        mock_instance.get_game_ids.assert_called_once()
 
     @patch('scripts.generate_features_parallel.ProcessedFeaturesRepository')
     def test_load_processed_hashes_empty(self, mock_processed_repo):
         """Test loading processed hashes when none exist."""
         mock_instance = Mock()
         mock_processed_repo.return_value = mock_instance
-        mock_instance.get_all.return_value = []
+        mock_instance.get_game_ids.return_value = set()
 
         processed_hashes = load_processed_hashes()
 
         assert processed_hashes == set()
 
+    @staticmethod
+    def features_frame(game_ids, rows_per_game=2):
+        """Features DataFrame as returned by generate_features_batch."""
+        return pd.DataFrame({
+            "game_id": [game_id for game_id in game_ids for _ in range(rows_per_game)],
+            "move_number": [n for _ in game_ids for n in range(1, rows_per_game + 1)],
+            "player_color": [1] * (len(game_ids) * rows_per_game),
+        })
+
     @patch('scripts.generate_features_parallel.sessionmaker')
     @patch('scripts.generate_features_parallel.engine')
     @patch('scripts.generate_features_parallel.load_processed_hashes')
     @patch('scripts.generate_features_parallel.FeaturesRepository')
     @patch('scripts.generate_features_parallel.ProcessedFeaturesRepository')
-    @patch('scripts.generate_features_parallel.is_valid_pgn')
-    @patch('scripts.generate_features_parallel.get_game_id')
-    @patch('scripts.generate_features_parallel.generate_features_from_game')
-    def test_process_chunk_success(self, mock_generate_features, mock_get_game_id,
-                                   mock_is_valid_pgn, mock_processed_repo,
+    @patch('scripts.generate_features_parallel.generate_features_batch')
+    def test_process_chunk_success(self, mock_generate_batch, mock_processed_repo,
                                    mock_features_repo, mock_load_hashes,
                                    mock_engine, mock_sessionmaker, sample_pgn_games):
         """Test successful processing of a chunk of games."""
         # Setup mocks
         mock_load_hashes.return_value = set()
-        mock_is_valid_pgn.side_effect = [
-            (True, Mock()) for _ in sample_pgn_games]
-        mock_get_game_id.side_effect = [
-            f"game_id_{i}" for i in range(len(sample_pgn_games))]
-        mock_generate_features.return_value = [
-            {"feature1": 1.0, "feature2": 2.0},
-            {"feature1": 1.5, "feature2": 2.5}
-        ]
+        game_ids = [f"game_id_{i}" for i in range(len(sample_pgn_games))]
+        mock_generate_batch.return_value = self.features_frame(game_ids)
 
         # Mock session and repositories
         mock_session = Mock()
@@ -192,26 +184,30 @@ class TestGenerateFeaturesPipeline:
         # Process the chunk
         processed_count = process_chunk(sample_pgn_games)
 
-        # Verify results
+        # Verify results: every game goes to the workers in a single batch
         assert processed_count == len(sample_pgn_games)
-        assert mock_generate_features.call_count == len(sample_pgn_games)
-        assert mock_features_instance.save_many_features.call_count == len(
-            sample_pgn_games)
-        assert mock_processed_instance.save_processed_hash.call_count == len(
-            sample_pgn_games)
+        mock_generate_batch.assert_called_once()
+        assert mock_generate_batch.call_args[0][0] == sample_pgn_games
+        mock_features_instance.save_many_features.assert_called_once()
+        saved_rows = mock_features_instance.save_many_features.call_args[0][0]
+        assert len(saved_rows) == 2 * len(sample_pgn_games)
+        assert {row["game_id"] for row in saved_rows} == set(game_ids)
+        mock_processed_instance.save_many_processed_features.assert_called_once_with(
+            game_ids)
 
     @patch('scripts.generate_features_parallel.sessionmaker')
     @patch('scripts.generate_features_parallel.engine')
     @patch('scripts.generate_features_parallel.load_processed_hashes')
     @patch('scripts.generate_features_parallel.FeaturesRepository')
     @patch('scripts.generate_features_parallel.ProcessedFeaturesRepository')
-    @patch('scripts.generate_features_parallel.is_valid_pgn')
-    def test_process_chunk_invalid_pgn(self, mock_is_valid_pgn, mock_processed_repo,
+    @patch('scripts.generate_features_parallel.generate_features_batch')
+    def test_process_chunk_invalid_pgn(self, mock_generate_batch, mock_processed_repo,
                                        mock_features_repo, mock_load_hashes,
                                        mock_engine, mock_sessionmaker):
         """Test processing chunk with invalid PGN."""
         mock_load_hashes.return_value = set()
-        mock_is_valid_pgn.return_value = (False, None)
+        # Invalid games produce no rows
+        mock_generate_batch.return_value = pd.DataFrame()
 
         mock_session = Mock()
         mock_sessionmaker.return_value.return_value = mock_session
@@ -219,34 +215,86 @@ class TestGenerateFeaturesPipeline:
         processed_count = process_chunk(["invalid pgn"])
 
         assert processed_count == 0
+        mock_features_repo.return_value.save_many_features.assert_not_called()
+        mock_processed_repo.return_value.save_many_processed_features.assert_called_once_with([])
 
     @patch('scripts.generate_features_parallel.sessionmaker')
     @patch('scripts.generate_features_parallel.engine')
     @patch('scripts.generate_features_parallel.load_processed_hashes')
     @patch('scripts.generate_features_parallel.FeaturesRepository')
     @patch('scripts.generate_features_parallel.ProcessedFeaturesRepository')
-    @patch('scripts.generate_features_parallel.is_valid_pgn')
-    @patch('scripts.generate_features_parallel.get_game_id')
-    def test_process_chunk_already_processed(self, mock_get_game_id, mock_is_valid_pgn,
+    @patch('scripts.generate_features_parallel.generate_features_batch')
+    def test_process_chunk_already_processed(self, mock_generate_batch,
                                              mock_processed_repo, mock_features_repo,
-                                             mock_load_hashes, mock_engine, mock_sessionmaker):
+                                             mock_load_hashes, mock_engine, mock_sessionmaker,
+                                             sample_pgn_games):
         """Test processing chunk with already processed games."""
+        # Without a header id the game is only known to be processed once parsed
         mock_load_hashes.return_value = {"already_processed_id"}
-        mock_is_valid_pgn.return_value = (True, Mock())
-        mock_get_game_id.return_value = "already_processed_id"
+        mock_generate_batch.return_value = self.features_frame(["already_processed_id"])
 
         mock_session = Mock()
         mock_sessionmaker.return_value.return_value = mock_session
 
-        processed_count = process_chunk(["some pgn"])
+        processed_count = process_chunk(sample_pgn_games[:1])
 
         assert processed_count == 0
+        mock_features_repo.return_value.save_many_features.assert_not_called()
+        mock_processed_repo.return_value.save_many_processed_features.assert_called_once_with([])
+
+    @patch('scripts.generate_features_parallel.sessionmaker')
+    @patch('scripts.generate_features_parallel.engine')
+    @patch('scripts.generate_features_parallel.load_processed_hashes')
+    @patch('scripts.generate_features_parallel.FeaturesRepository')
+    @patch('scripts.generate_features_parallel.ProcessedFeaturesRepository')
+    @patch('scripts.generate_features_parallel.generate_features_batch')
+    def test_process_chunk_skips_processed_game_by_headers(self, mock_generate_batch,
+                                                           mock_processed_repo, mock_features_repo,
+                                                           mock_load_hashes, mock_engine, mock_sessionmaker):
+        """Games with a header-only id are skipped before their moves are parsed."""
+        from modules.pgn_utils import get_header_game_id
+
+        pgn_text = """[Event "Rated Blitz game"]
+[Site "https://lichess.org/abcdefgh"]
+[UTCDate "2024.01.01"]
+[UTCTime "12:00:00"]
+[White "Player1"]
+[Black "Player2"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0"""
+        headers = chess.pgn.read_headers(io.StringIO(pgn_text))
+        mock_load_hashes.return_value = {get_header_game_id(headers)}
+
+        processed_count = process_chunk([pgn_text])
+
+        assert processed_count == 0
+        mock_generate_batch.assert_not_called()
+        mock_features_repo.return_value.save_many_features.assert_not_called()
+
+    @patch('scripts.generate_features_parallel.load_processed_hashes')
+    @patch('scripts.generate_features_parallel.FeaturesRepository')
+    @patch('scripts.generate_features_parallel.ProcessedFeaturesRepository')
+    @patch('scripts.generate_features_parallel.generate_features_batch')
+    def test_process_chunk_reuses_given_processed_hashes(self, mock_generate_batch,
+                                                         mock_processed_repo, mock_features_repo,
+                                                         mock_load_hashes, sample_pgn_games):
+        """A set passed by main() is used instead of reloading it, and gets the new ids."""
+        game_ids = [f"game_id_{i}" for i in range(len(sample_pgn_games))]
+        mock_generate_batch.return_value = self.features_frame(game_ids, rows_per_game=1)
+        processed_hashes = {"old_id"}
+
+        process_chunk(sample_pgn_games, processed_hashes=processed_hashes)
+
+        mock_load_hashes.assert_not_called()
+        mock_processed_repo.return_value.save_many_processed_features.assert_called_once_with(
+            game_ids)
+        assert processed_hashes == {"old_id"} | set(game_ids)
 
     @patch('scripts.generate_features_parallel.GamesRepository')
     @patch('scripts.generate_features_parallel.load_processed_hashes')
     @patch('scripts.generate_features_parallel.process_chunk')
-    @patch('scripts.generate_features_parallel.ProcessPoolExecutor')
-    def test_main_function_with_source_filter(self, mock_executor, mock_process_chunk,
+    def test_main_function_with_source_filter(self, mock_process_chunk,
                                               mock_load_hashes, mock_games_repo, sample_pgn_games):
         """Test main function with source filtering."""
         # Setup mocks
@@ -257,14 +305,6 @@ class TestGenerateFeaturesPipeline:
         mock_load_hashes.return_value = set()
         mock_process_chunk.return_value = len(sample_pgn_games)
 
-        # Mock executor
-        mock_executor_instance = Mock()
-        mock_executor.return_value.__enter__.return_value = mock_executor_instance
-
-        mock_future = Mock()
-        mock_future.result.return_value = len(sample_pgn_games)
-        mock_executor_instance.submit.return_value = mock_future
-
         # Run main function
         main(max_games=5, source="lichess", start_offset=0)
 
@@ -276,8 +316,7 @@ class TestGenerateFeaturesPipeline:
     @patch('scripts.generate_features_parallel.GamesRepository')
     @patch('scripts.generate_features_parallel.load_processed_hashes')
     @patch('scripts.generate_features_parallel.process_chunk')
-    @patch('scripts.generate_features_parallel.ProcessPoolExecutor')
-    def test_main_function_without_source_filter(self, mock_executor, mock_process_chunk,
+    def test_main_function_without_source_filter(self, mock_process_chunk,
                                                  mock_load_hashes, mock_games_repo, sample_pgn_games):
         """Test main function without source filtering."""
         # Setup mocks
@@ -288,14 +327,6 @@ class TestGenerateFeaturesPipeline:
         mock_load_hashes.return_value = set()
         mock_process_chunk.return_value = len(sample_pgn_games)
 
-        # Mock executor
-        mock_executor_instance = Mock()
-        mock_executor.return_value.__enter__.return_value = mock_executor_instance
-
-        mock_future = Mock()
-        mock_future.result.return_value = len(sample_pgn_games)
-        mock_executor_instance.submit.return_value = mock_future
-
         # Run main function
         main(max_games=5, source=None, start_offset=0)
 
@@ -345,34 +376,31 @@ class TestGenerateFeaturesPipeline:
         # Verify main was called for processing
         assert mock_main.call_count > 0
 
-    @patch('scripts.generate_features_parallel.generate_features_from_game')
-    def test_feature_generation_error_handling(self, mock_generate_features):
+    @patch('scripts.generate_features_parallel.generate_features_batch')
+    def test_feature_generation_error_handling(self, mock_generate_batch):
         """Test error handling during feature generation."""
-        mock_generate_features.side_effect = Exception(
+        mock_generate_batch.side_effect = Exception(
             "Feature generation failed")
 
         with patch('scripts.generate_features_parallel.sessionmaker'), \
                 patch('scripts.generate_features_parallel.engine'), \
                 patch('scripts.generate_features_parallel.load_processed_hashes') as mock_load_hashes, \
-                patch('scripts.generate_features_parallel.FeaturesRepository'), \
-                patch('scripts.generate_features_parallel.ProcessedFeaturesRepository'), \
-                patch('scripts.generate_features_parallel.is_valid_pgn') as mock_is_valid_pgn, \
-                patch('scripts.generate_features_parallel.get_game_id') as mock_get_game_id:
+                patch('scripts.generate_features_parallel.FeaturesRepository') as mock_features_repo, \
+                patch('scripts.generate_features_parallel.ProcessedFeaturesRepository') as mock_processed_repo:
 
             mock_load_hashes.return_value = set()
-            mock_is_valid_pgn.return_value = (True, Mock())
-            mock_get_game_id.return_value = "test_game_id"
 
             # Should handle errors gracefully
             processed_count = process_chunk(["test pgn"])
             assert processed_count == 0
+            mock_features_repo.return_value.save_many_features.assert_not_called()
+            mock_processed_repo.return_value.save_many_processed_features.assert_not_called()
 
     def test_max_games_limit_respected(self):
         """Test that the max_games limit is respected."""
         with patch('scripts.generate_features_parallel.GamesRepository') as mock_games_repo, \
                 patch('scripts.generate_features_parallel.load_processed_hashes') as mock_load_hashes, \
-                patch('scripts.generate_features_parallel.process_chunk') as mock_process_chunk, \
-                patch('scripts.generate_features_parallel.ProcessPoolExecutor'):
+                patch('scripts.generate_features_parallel.process_chunk') as mock_process_chunk:
 
             mock_games_repo_instance = Mock()
             mock_games_repo.return_value = mock_games_repo_instance
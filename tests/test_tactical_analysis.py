@@ -40,10 +40,14 @@ def patch_globals(monkeypatch):
                         lambda best, alternatives, threshold_cp=100: "alt_tag")
 
     # Patch get_evaluation to return a dummy evaluation dict
-    def dummy_get_evaluation(fen, depth, multipv=1):
+    def dummy_get_evaluation(fen, depth, multipv=1, engine=None, game=None):
         return {"best": {"value": 50}, "alternatives": []}
     monkeypatch.setattr(
         "modules.analyze_games_tactics.get_evaluation", dummy_get_evaluation)
+    # detect_tactics_from_game opens one engine per game; no real Stockfish here
+    monkeypatch.setattr(
+        "modules.analyze_games_tactics.chess.engine.SimpleEngine.popen_uci",
+        lambda path: MagicMock())
 
 
 def make_pgn_game(moves):